@@ -0,0 +1,82 @@
+import threading
+import uuid
+from contextlib import contextmanager
+
+import psycopg2
+from psycopg2.extensions import cursor as base_cursor, make_dsn, parse_dsn
+
+from scripts.common.schema import migrate
+
+
+class StatementCounter:
+    """
+    Counts the statements sent to the database, across all threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def add(self, n=1):
+        with self._lock:
+            self.count += n
+
+    def reset(self):
+        with self._lock:
+            self.count = 0
+
+
+statements = StatementCounter()
+
+
+class CountingCursor(base_cursor):
+    """
+    A cursor that counts every statement it sends in the module's StatementCounter.
+
+    execute_values sends one statement per page, so it is counted per page.
+    """
+
+    def execute(self, query, vars=None):
+        statements.add()
+        return super().execute(query, vars)
+
+    def executemany(self, query, vars_list):
+        vars_list = list(vars_list)
+        statements.add(len(vars_list))
+        return super().executemany(query, vars_list)
+
+    def copy_expert(self, sql, file, size=8192):
+        statements.add()
+        return super().copy_expert(sql, file, size)
+
+
+@contextmanager
+def throwaway_database(dsn, keep=False):
+    """
+    Creates an empty database at the latest schema version, and drops it when the block exits.
+
+    Args:
+        dsn (str): A connection string to a PostgreSQL server the user may create databases on.
+        keep (bool): Whether to leave the database in place for inspection.
+
+    Yields:
+        str: The connection string of the new database.
+    """
+    name = f'club_benchmark_{uuid.uuid4().hex[:12]}'
+    admin = psycopg2.connect(dsn)
+    admin.autocommit = True
+    try:
+        with admin.cursor() as cur:
+            cur.execute(f'CREATE DATABASE {name};')
+
+        database_dsn = make_dsn(**dict(parse_dsn(dsn), dbname=name))
+        with psycopg2.connect(database_dsn) as conn, conn.cursor() as cur:
+            migrate(cur)
+        conn.close()
+
+        yield database_dsn
+    finally:
+        if not keep:
+            with admin.cursor() as cur:
+                cur.execute(f'DROP DATABASE IF EXISTS {name} WITH (FORCE);')
+        admin.close()
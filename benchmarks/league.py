@@ -0,0 +1,243 @@
+import copy
+import json
+import os
+import random
+import string
+from datetime import date, timedelta
+
+# Sample Stats API responses and synthetic 300 Club page templates the league is rendered into
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+# The MLB roster the picks are drawn from
+ROSTER_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '../scripts/daily/players.json'))
+
+# contest_id -> (contest name, number of picks per member)
+CONTESTS = {
+    2: ('Batters', 10),
+    5: ('Alternates', 5),
+    3: ('Pitchers', 4),
+    6: ('Home Run Hitters', 4),
+    7: ('RBI Champion', 1),
+    8: ('Stolen Base Champion', 1),
+    9: ('DiMaggio Prize', 1),
+}
+
+# Regular season games every team has played, for the standings and the game logs
+GAMES_PLAYED = 150
+
+# Number of finished games on each day of the schedule
+GAMES_PER_DAY = 15
+
+def _load_json(name):
+    with open(os.path.join(FIXTURES_DIR, 'statsapi', name), 'r') as f:
+        return json.load(f)
+
+def _load_template(name):
+    with open(os.path.join(FIXTURES_DIR, '300club', name), 'r') as f:
+        return string.Template(f.read())
+
+
+class League:
+    """
+    A deterministic synthetic league, rendered into the 300 Club page templates and sample MLB Stats API responses.
+
+    Members draw their picks from a pool of roster players that grows with the league, as larger
+    leagues pick more distinct players. The same size and seed always give the same league.
+
+    Args:
+        size (int): The number of members.
+        seed (int): The seed of the league's random choices.
+    """
+
+    def __init__(self, size, seed=0):
+        self.size = size
+        self.seed = seed
+        with open(ROSTER_PATH, 'r') as f:
+            self.roster = json.load(f)
+
+        hitters = [person for person in self.roster if person['primaryPosition']['code'] != '1']
+        pitchers = [person for person in self.roster if person['primaryPosition']['code'] == '1']
+        self.hitter_pool = hitters[:min(len(hitters), max(60, 2 * size))]
+        self.pitcher_pool = pitchers[:min(len(pitchers), max(40, size))]
+        self.members = [(1000 + n, f'Member {n}') for n in range(size)]
+
+        self.templates = {
+            'ranking': _load_template('CntstRanking.html'),
+            'batters': _load_template('RankingPerMember_batters.html'),
+            'member': _load_template('RankingPerMember.html'),
+        }
+        self.responses = {
+            'hitting': _load_json('people_season_hitting.json'),
+            'pitching': _load_json('people_season_pitching.json'),
+            'game_log': _load_json('people_game_log.json'),
+            'standings': _load_json('standings.json'),
+            'schedule_game': _load_json('schedule_game.json'),
+            'boxscore_batter': _load_json('game_boxscore_batter.json'),
+        }
+
+    def _random(self, *key):
+        return random.Random(':'.join(str(part) for part in (self.seed,) + key))
+
+    def picks(self, mbr_id, contest_id):
+        """
+        Returns the players a member picked in a contest, drawn from the league's player pools.
+        """
+        pool = self.pitcher_pool if contest_id == 3 else self.hitter_pool
+        return self._random('picks', mbr_id, contest_id).sample(pool, CONTESTS[contest_id][1])
+
+    def ranking_page(self):
+        """
+        Renders CntstRanking.asp: every member but the last is qualified.
+        """
+        qualified = ''.join(
+            f'<tr><td>{rank}</td><td><a href="RankingPerMember.asp?mbr_id={mbr_id}&contest_id=2">{name}</a></td>'
+            f'<td>.{280 + rank % 40}</td><td>10</td></tr>\n'
+            for rank, (mbr_id, name) in enumerate(self.members[:-1], 1)
+        )
+        disqualified = ''.join(
+            f'<tr><td><a href="RankingPerMember.asp?mbr_id={mbr_id}&contest_id=2">{name}</a></td></tr>\n'
+            for mbr_id, name in self.members[-1:]
+        )
+        return self.templates['ranking'].substitute(qualified_rows=qualified, disqualified_rows=disqualified)
+
+    def member_page(self, mbr_id, contest_id):
+        """
+        Renders RankingPerMember.asp for one member and contest, with the columns the scraper reads.
+        """
+        r = self._random('page', mbr_id, contest_id)
+        name = dict(self.members).get(mbr_id, f'Member {mbr_id}')
+        contest_name = CONTESTS[contest_id][0]
+
+        if contest_id == 9:
+            rows = f'<tr><td>{r.randint(30, 45)}</td><td>{r.randint(25, 56)}</td></tr>'
+        else:
+            rows = []
+            for number, person in enumerate(self.picks(mbr_id, contest_id), 1):
+                team = person.get('currentTeam', {}).get('id', '')
+                if contest_id == 2:
+                    cells = [number, person['fullName'], team, f'.{r.randint(220, 330)}', r.randint(300, 700),
+                             f'.{r.randint(650, 999)}', '' if r.random() > 0.1 else 'DQ']
+                elif contest_id == 5:
+                    cells = [person['fullName'], team, f'.{r.randint(220, 330)}', r.randint(300, 700),
+                             f'.{r.randint(650, 999)}', '' if r.random() > 0.1 else 'DQ']
+                elif contest_id in (7, 8):
+                    cells = [person['fullName'], team, r.randint(10, 140), r.randint(10, 140)]
+                else:
+                    cells = [person['fullName'], team, r.randint(0, 50)]
+                rows.append('<tr>' + ''.join(f'<td>{cell}</td>' for cell in cells) + '</tr>')
+            rows = '\n'.join(rows)
+
+        template = self.templates['batters' if contest_id == 2 else 'member']
+        return template.substitute(contest_name=contest_name, member_name=name,
+                                   rank=r.randint(1, self.size), selection_rows=rows)
+
+    def people(self, person_ids, hydrate):
+        """
+        Answers a 'people' request with season stats or game logs for each requested player.
+        """
+        if 'gameLog' in hydrate:
+            return self._game_logs(person_ids)
+
+        group = 'pitching' if 'pitching' in hydrate else 'hitting'
+        template = self.responses[group]
+        response = {'copyright': template['copyright'], 'people': []}
+        for person_id in person_ids:
+            person = copy.deepcopy(template['people'][0])
+            person['id'] = person_id
+            person['stats'][0]['splits'][0]['stat'].update(self._season_stats(person_id, group))
+            response['people'].append(person)
+        return response
+
+    def _season_stats(self, person_id, group):
+        r = self._random('stats', person_id)
+        if group == 'hitting':
+            return dict(avg=f'.{r.randint(200, 340)}', ops=f'.{r.randint(600, 999)}',
+                        plateAppearances=r.randint(100, 700), homeRuns=r.randint(0, 55),
+                        rbi=r.randint(10, 140), stolenBases=r.randint(0, 60))
+        return dict(wins=r.randint(0, 20), losses=r.randint(0, 15), era=f'{r.uniform(2, 6):.2f}',
+                    strikeOuts=r.randint(20, 280))
+
+    def stat_leaders(self, sort_stat, limit):
+        """
+        Answers a 'stats' request sorted by a hitting stat with the roster hitters' season stats, best first.
+        """
+        hitters = [person for person in self.roster if person['primaryPosition']['code'] != '1']
+        splits = [{'player': {'id': person['id'], 'fullName': person['fullName']},
+                   'stat': self._season_stats(person['id'], 'hitting')} for person in hitters]
+        splits.sort(key=lambda split: split['stat'][sort_stat], reverse=True)
+        splits = splits[:limit]
+        for rank, split in enumerate(splits, 1):
+            split['rank'] = rank
+        return {'stats': [{'type': {'displayName': 'season'}, 'group': {'displayName': 'hitting'},
+                           'totalSplits': len(hitters), 'splits': splits}]}
+
+    def _game_logs(self, person_ids):
+        template = self.responses['game_log']
+        split_template = template['people'][0]['stats'][0]['splits'][0]
+        opening_day = date.today() - timedelta(days=GAMES_PLAYED + 10)
+        response = {'copyright': template['copyright'], 'people': []}
+        for person_id in person_ids:
+            r = self._random('games', person_id)
+            person = copy.deepcopy(template['people'][0])
+            person['id'] = person_id
+            splits = []
+            for game in range(r.randint(0, GAMES_PLAYED)):
+                at_bats = r.randint(0, 5)
+                # Shallow copies keep large game logs cheap to render
+                splits.append(dict(
+                    split_template,
+                    stat=dict(split_template['stat'], atBats=at_bats, hits=min(at_bats, r.choice((0, 0, 1, 1, 2, 3)))),
+                    date=(opening_day + timedelta(days=game)).isoformat(),
+                    game=dict(split_template['game'], gamePk=700000 + game),
+                ))
+            person['stats'][0]['splits'] = splits
+            response['people'].append(person)
+        return response
+
+    def sports_players(self):
+        """
+        Answers a 'sports_players' request with the roster.
+        """
+        return {'people': self.roster}
+
+    def standings(self):
+        """
+        Answers a 'standings' request: every team has played GAMES_PLAYED games.
+        """
+        return copy.deepcopy(self.responses['standings'])
+
+    def schedule(self, start_date, end_date):
+        """
+        Answers a 'schedule' request with GAMES_PER_DAY finished games on every day.
+        """
+        dates = []
+        day = start_date
+        while day <= end_date:
+            games = []
+            for n in range(GAMES_PER_DAY):
+                game = copy.deepcopy(self.responses['schedule_game'])
+                game['gamePk'] = int(day.strftime('%y%m%d')) * 100 + n
+                game['officialDate'] = day.isoformat()
+                games.append(game)
+            dates.append({'date': day.isoformat(), 'games': games})
+            day += timedelta(days=1)
+        return {'dates': dates}
+
+    def boxscore(self, game_pk):
+        """
+        Answers a 'game_boxscore' request with nine batters per side drawn from the hitter pool.
+        """
+        r = self._random('boxscore', game_pk)
+        batters = r.sample(self.hitter_pool, 18)
+        teams = {}
+        for side, lineup in (('away', batters[:9]), ('home', batters[9:])):
+            players = {}
+            for person in lineup:
+                entry = copy.deepcopy(self.responses['boxscore_batter'])
+                entry['person']['id'] = person['id']
+                entry['person']['fullName'] = person['fullName']
+                at_bats = r.randint(2, 5)
+                entry['stats']['batting'].update(atBats=at_bats, hits=r.randint(0, min(3, at_bats)))
+                players[f"ID{person['id']}"] = entry
+            teams[side] = {'batters': [person['id'] for person in lineup], 'pitchers': [], 'players': players}
+        return {'teams': teams}
@@ -0,0 +1,217 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+# Add the project root and this directory to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from database import CountingCursor, statements, throwaway_database
+from league import League
+from stub_server import StubServer, redirect_statsapi
+
+from scripts.common import db
+from scripts.common.statsapi_cache import StatsApiCache
+from scripts.common.upstream import configure_statsapi
+from scripts.common.watermarks import set_watermark
+from scripts.daily import stat_collection
+from scripts.daily.hitting_streaks import STREAKS_WATERMARK
+from scripts.yearly import player_name_index, populate_players, user_selections_scraper
+
+# League sizes (number of members) benchmarked by default
+DEFAULT_SIZES = (25, 100, 400)
+
+# Days of games the incremental stats run catches up on
+INCREMENTAL_DAYS = 3
+
+# Pipelines in the order they run; each one works on the data the previous ones stored
+DB_PIPELINES = ('scrape', 'populate', 'stats', 'stats_incremental')
+OFFLINE_PIPELINES = ('scrape', 'stats_fetch')
+
+
+def measure(stub, run, verbose=False):
+    """
+    Runs one pipeline and measures it.
+
+    Peak memory is the peak of Python allocations traced while the pipeline runs. Tracing slows
+    the pipeline down by the same factor in every run, so wall times stay comparable between runs.
+
+    Args:
+        stub (StubServer): The stub server the pipeline talks to.
+        run (callable): The pipeline.
+        verbose (bool): Whether to show the pipeline's own output.
+
+    Returns:
+        dict: The wall time, requests per endpoint, database statements, peak memory and error lines.
+    """
+    stub.reset_counts()
+    statements.reset()
+    output = io.StringIO()
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(sys.stdout if verbose else output):
+        run()
+    wall_seconds = time.perf_counter() - start
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    requests = stub.requests()
+
+    return {
+        'wall_seconds': round(wall_seconds, 3),
+        'requests': sum(requests.values()),
+        'requests_by_endpoint': requests,
+        'statements': statements.count,
+        'peak_memory_bytes': peak_memory,
+        'errors': [line for line in output.getvalue().splitlines() if 'Error' in line or 'error' in line],
+    }
+
+
+def pipelines(args, league, work_dir, store):
+    """
+    Returns the (name, callable) pairs of the pipelines benchmarked for one league.
+
+    The pipelines share one MLB Stats API response cache in the work directory, like runs on the same day.
+    """
+    statsapi_cache = StatsApiCache(os.path.join(work_dir, 'statsapi'))
+    configure_statsapi(args.workers, args.api_rps, cache=statsapi_cache)
+
+    def scrape():
+        user_selections_scraper.configure_page_cache(
+            args.workers, requests_per_second=args.scrape_rps, directory=os.path.join(work_dir, 'http'))
+        user_selections_scraper.scrape_and_store_user_selections(args.workers, store=store)
+
+    def populate():
+        populate_players.populate_player_tables()
+
+    def stats():
+        stat_collection.update_player_stats(args.workers, args.api_rps, statsapi_cache=statsapi_cache)
+
+    def stats_incremental():
+        synced_through = date.today() - timedelta(days=INCREMENTAL_DAYS + 1)
+        with db.transaction() as cur:
+            set_watermark(cur, stat_collection.STATS_WATERMARK, synced_through)
+            set_watermark(cur, STREAKS_WATERMARK, synced_through)
+        stat_collection.update_player_stats(args.workers, args.api_rps, incremental=True,
+                                            statsapi_cache=statsapi_cache)
+
+    def stats_fetch():
+        player_ids = {
+            'hitting': [person['id'] for person in league.hitter_pool],
+            'pitching': [person['id'] for person in league.pitcher_pool],
+        }
+        configure_statsapi(args.workers, args.api_rps, cache=statsapi_cache)
+        for _ in stat_collection.iter_season_stats(player_ids, args.workers):
+            pass
+
+    if store:
+        return [('scrape', scrape), ('populate', populate), ('stats', stats), ('stats_incremental', stats_incremental)]
+    return [('scrape', scrape), ('stats_fetch', stats_fetch)]
+
+
+def benchmark_size(args, size):
+    """
+    Runs every pipeline against a fresh league of one size, and a fresh database when a DSN is given.
+
+    Returns:
+        dict: The measurements of each pipeline.
+    """
+    league = League(size, args.seed)
+    stub = StubServer(size, args.seed, args.latency_ms / 1000).start()
+    redirect_statsapi(stub.base_url)
+    user_selections_scraper.BASE_URL = stub.base_url
+
+    results = {}
+    try:
+        with tempfile.TemporaryDirectory() as work_dir, contextlib.ExitStack() as stack:
+            player_name_index.CACHE_ROOT = work_dir
+
+            store = args.dsn is not None
+            if store:
+                dsn = stack.enter_context(throwaway_database(args.dsn, args.keep_database))
+                db.configure_pool(dsn=dsn, cursor_factory=CountingCursor)
+                stack.callback(db.close_pool)
+
+            for name, run in pipelines(args, league, work_dir, store):
+                if args.pipelines and name not in args.pipelines:
+                    continue
+                results[name] = measure(stub, run, args.verbose)
+                print_row(size, name, results[name])
+    finally:
+        stub.stop()
+
+    return results
+
+
+def print_row(size, name, result, baseline=None):
+    row = (f"{size:>6}  {name:<18} {result['wall_seconds']:>9.3f}s {result['requests']:>8} "
+           f"{result['statements']:>10} {result['peak_memory_bytes'] / 2**20:>9.1f}MB")
+    if baseline is not None:
+        row += f"  ({change(result['wall_seconds'], baseline['wall_seconds'])} time, "
+        row += f"{change(result['requests'], baseline['requests'])} requests, "
+        row += f"{change(result['statements'], baseline['statements'])} statements, "
+        row += f"{change(result['peak_memory_bytes'], baseline['peak_memory_bytes'])} memory)"
+    print(row)
+    for error in result['errors']:
+        print(f"        ! {error}")
+
+
+def change(value, baseline):
+    if not baseline:
+        return 'n/a'
+    return f'{(value - baseline) / baseline:+.1%}'
+
+
+def compare(results, baseline):
+    """
+    Prints every measurement next to its change from a baseline run with the same league sizes.
+    """
+    print('\nCompared with the baseline:')
+    for size, pipeline_results in results.items():
+        for name, result in pipeline_results.items():
+            print_row(size, name, result, baseline.get(size, {}).get(name))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Benchmarks the scraping, player and stats pipelines offline, against a stub server '
+                    'serving synthetic fixtures and a throwaway PostgreSQL database.')
+    parser.add_argument('--sizes', type=lambda value: [int(size) for size in value.split(',')],
+                        default=list(DEFAULT_SIZES), help='comma-separated league sizes (default: 25,100,400)')
+    parser.add_argument('--latency-ms', type=float, default=20, help='latency injected in every stub response')
+    parser.add_argument('--dsn', help='PostgreSQL server to create throwaway databases on; '
+                                      'without it only the network and parsing work is benchmarked')
+    parser.add_argument('--keep-database', action='store_true', help='keep the throwaway databases')
+    parser.add_argument('--pipelines', type=lambda value: value.split(','),
+                        help=f"comma-separated pipelines to measure (default: all of {', '.join(DB_PIPELINES)} "
+                             f"with --dsn, {', '.join(OFFLINE_PIPELINES)} without)")
+    parser.add_argument('--workers', type=int, default=user_selections_scraper.DEFAULT_SCRAPE_WORKERS,
+                        help='workers of the scraper and the stats fetch')
+    parser.add_argument('--scrape-rps', type=float, default=0,
+                        help='per-host request rate of the scraper (default: 0, no limit against the stub)')
+    parser.add_argument('--api-rps', type=float, default=0,
+                        help='MLB Stats API request rate (default: 0, no limit against the stub)')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the synthetic leagues')
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    parser.add_argument('--baseline', help='compare with the JSON results of an earlier run')
+    parser.add_argument('--verbose', action='store_true', help="show the pipelines' own output")
+    args = parser.parse_args()
+
+    print(f"{'size':>6}  {'pipeline':<18} {'wall':>10} {'requests':>8} {'statements':>10} {'peak mem':>11}")
+    results = {str(size): benchmark_size(args, size) for size in args.sizes}
+
+    if args.output:
+        settings = {key: value for key, value in vars(args).items() if key not in ('output', 'baseline', 'dsn')}
+        with open(args.output, 'w') as f:
+            json.dump({'settings': settings, 'results': results}, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            compare(results, json.load(f)['results'])
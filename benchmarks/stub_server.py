@@ -0,0 +1,175 @@
+import json
+import multiprocessing
+import re
+import threading
+import time
+from collections import Counter
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+from urllib.request import urlopen
+
+import statsapi.endpoints
+
+from league import League
+
+# Prefix of every MLB Stats API endpoint URL, and the URLs as shipped with the statsapi package
+STATSAPI_BASE_URL = statsapi.endpoints.BASE_URL
+STATSAPI_URLS = {name: endpoint['url'] for name, endpoint in statsapi.endpoints.ENDPOINTS.items()}
+
+# MLB Stats API paths the stub answers, relative to /api/v1
+STATSAPI_ROUTES = [
+    (re.compile(r'^/api/v1/people$'), 'people'),
+    (re.compile(r'^/api/v1/sports/\d+/players$'), 'sports_players'),
+    (re.compile(r'^/api/v1/standings$'), 'standings'),
+    (re.compile(r'^/api/v1/stats$'), 'stats'),
+    (re.compile(r'^/api/v1/schedule$'), 'schedule'),
+    (re.compile(r'^/api/v1/game/(\d+)/boxscore$'), 'game_boxscore'),
+]
+
+
+class StubServer:
+    """
+    A local HTTP server standing in for both 300club.org and the MLB Stats API.
+
+    Every request is answered from a League after an injected delay, and counted per endpoint.
+    The server runs in its own process, so rendering responses takes no CPU time or traced
+    memory from the pipeline being measured.
+
+    Args:
+        size (int): The number of members of the league served.
+        seed (int): The seed of the league.
+        latency (float): The delay in seconds added to every request.
+    """
+
+    def __init__(self, size, seed=0, latency=0.0):
+        self.size = size
+        self.seed = seed
+        self.latency = latency
+        self.port = None
+        self._process = None
+
+    @property
+    def base_url(self):
+        return f'http://127.0.0.1:{self.port}/'
+
+    def start(self):
+        parent, child = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(target=_serve, args=(self.size, self.seed, self.latency, child),
+                                                daemon=True)
+        self._process.start()
+        self.port = parent.recv()
+        return self
+
+    def stop(self):
+        self._process.terminate()
+        self._process.join()
+
+    def requests(self):
+        """
+        Returns the number of requests answered per endpoint since the last reset.
+        """
+        with urlopen(f'{self.base_url}{CONTROL_PATH}requests') as response:
+            return json.load(response)
+
+    def reset_counts(self):
+        urlopen(f'{self.base_url}{CONTROL_PATH}reset').close()
+
+
+# Path prefix of the requests the benchmark sends to the stub itself
+CONTROL_PATH = '__stub__/'
+
+
+def respond(league, path, query):
+    """
+    Returns the (endpoint, content_type, body) answering one request, or None for an unknown path.
+    """
+    if path == '/CntstRanking.asp':
+        return 'CntstRanking.asp', 'text/html; charset=utf-8', league.ranking_page()
+    if path == '/RankingPerMember.asp':
+        page = league.member_page(int(query['mbr_id']), int(query['contest_id']))
+        return 'RankingPerMember.asp', 'text/html; charset=utf-8', page
+
+    for pattern, endpoint in STATSAPI_ROUTES:
+        match = pattern.match(path)
+        if not match:
+            continue
+        if endpoint == 'people':
+            person_ids = [int(person_id) for person_id in query['personIds'].split(',')]
+            data = league.people(person_ids, query.get('hydrate', ''))
+        elif endpoint == 'sports_players':
+            data = league.sports_players()
+        elif endpoint == 'standings':
+            data = league.standings()
+        elif endpoint == 'stats':
+            data = league.stat_leaders(query['sortStat'], int(query.get('limit', 50)))
+        elif endpoint == 'schedule':
+            data = league.schedule(date.fromisoformat(query['startDate']), date.fromisoformat(query['endDate']))
+        else:
+            data = league.boxscore(int(match.group(1)))
+        return endpoint, 'application/json', json.dumps(data)
+
+    return None
+
+
+def _serve(size, seed, latency, pipe):
+    """
+    Serves a league until the process is terminated, after sending the server's port through the pipe.
+    """
+    league = League(size, seed)
+    requests = Counter()
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            if url.path.startswith(f'/{CONTROL_PATH}'):
+                with lock:
+                    body = json.dumps(requests)
+                    if url.path.endswith('/reset'):
+                        requests.clear()
+                self._send('application/json', body)
+                return
+
+            query = {key: values[0] for key, values in parse_qs(url.query).items()}
+            if latency:
+                time.sleep(latency)
+
+            response = respond(league, url.path, query)
+            endpoint = response[0] if response else 'not_found'
+            with lock:
+                requests[endpoint] += 1
+
+            if response is None:
+                self.send_error(404)
+            else:
+                self._send(*response[1:])
+
+        def _send(self, content_type, body):
+            body = body.encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    pipe.send(server.server_port)
+    server.serve_forever()
+
+
+def redirect_statsapi(base_url):
+    """
+    Points every MLB Stats API endpoint of the statsapi package at another server.
+
+    Args:
+        base_url (str): The server's root URL, such as the stub's base_url.
+    """
+    for name, endpoint in statsapi.endpoints.ENDPOINTS.items():
+        endpoint['url'] = STATSAPI_URLS[name].replace(STATSAPI_BASE_URL, f'{base_url}api/')
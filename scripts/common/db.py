@@ -0,0 +1,187 @@
+import threading
+import uuid
+from contextlib import contextmanager
+
+import psycopg2
+from psycopg2.pool import ThreadedConnectionPool
+
+from scripts.common.metrics import timer
+
+# Import the database configuration from config.py
+from config.config import DATABASE
+
+# Pool sizes used when config.DATABASE does not set 'pool_minconn' / 'pool_maxconn'
+DEFAULT_POOL_MINCONN = 1
+DEFAULT_POOL_MAXCONN = 4
+
+# Channel notified when jobs commit changes to the data readers cache, such as the leaderboards
+DATA_CHANGED_CHANNEL = 'club_data_changed'
+
+_pool = None
+_pool_slots = None
+_connect_kwargs = None
+_pool_lock = threading.Lock()
+
+
+def configure_pool(minconn=None, maxconn=None, **connect_kwargs):
+    """
+    Creates the shared connection pool, replacing any existing one.
+
+    Sizes default to 'pool_minconn' / 'pool_maxconn' in config.DATABASE, then to
+    DEFAULT_POOL_MINCONN / DEFAULT_POOL_MAXCONN. Threads borrowing a connection while all
+    maxconn are in use wait for one to be returned.
+
+    Args:
+        minconn (int, optional): The number of connections opened up front and kept open.
+        maxconn (int, optional): The maximum number of connections the pool hands out at once.
+        **connect_kwargs: Extra keyword arguments for psycopg2.connect, such as cursor_factory.
+                          When a 'dsn' is given, it replaces the connection settings of config.DATABASE.
+
+    Returns:
+        psycopg2.pool.ThreadedConnectionPool: The new pool.
+    """
+    global _pool, _pool_slots, _connect_kwargs
+
+    if minconn is None:
+        minconn = DATABASE.get('pool_minconn', DEFAULT_POOL_MINCONN)
+    if maxconn is None:
+        maxconn = DATABASE.get('pool_maxconn', DEFAULT_POOL_MAXCONN)
+
+    if 'dsn' not in connect_kwargs:
+        connect_kwargs = dict(
+            dbname=DATABASE['dbname'],
+            user=DATABASE['user'],
+            password=DATABASE['password'],
+            host=DATABASE['host'],
+            **connect_kwargs
+        )
+
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+        _pool = ThreadedConnectionPool(minconn, maxconn, **connect_kwargs)
+        # psycopg2's pool raises instead of waiting once every connection is in use
+        _pool_slots = threading.BoundedSemaphore(maxconn)
+        _connect_kwargs = connect_kwargs
+    return _pool
+
+
+def get_pool():
+    """
+    Returns the shared connection pool, creating it with the configured sizes on first use.
+
+    Returns:
+        psycopg2.pool.ThreadedConnectionPool: The shared pool.
+    """
+    if _pool is None:
+        configure_pool()
+    return _pool
+
+
+def connect():
+    """
+    Opens a dedicated connection with the shared pool's settings, for long-lived uses such as LISTEN.
+
+    Returns:
+        psycopg2.extensions.connection: The new connection. The caller closes it.
+    """
+    get_pool()
+    return psycopg2.connect(**_connect_kwargs)
+
+
+def close_pool():
+    """
+    Closes every connection in the shared pool.
+    """
+    global _pool
+
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
+
+
+@contextmanager
+def connection():
+    """
+    Borrows a connection from the shared pool and returns it when the block exits.
+
+    Waits while every connection of the pool is in use. Connections that are returned with an
+    open transaction are rolled back first.
+
+    Yields:
+        psycopg2.extensions.connection: A pooled database connection.
+    """
+    pool = get_pool()
+    slots = _pool_slots
+    with timer('db_pool_wait'):
+        slots.acquire()
+    try:
+        conn = pool.getconn()
+        try:
+            yield conn
+        finally:
+            if not conn.closed:
+                conn.rollback()
+            pool.putconn(conn)
+    finally:
+        slots.release()
+
+
+@contextmanager
+def transaction():
+    """
+    Runs a block in one database transaction on a pooled connection.
+
+    The transaction is committed when the block exits normally and rolled back if it raises.
+
+    Yields:
+        psycopg2.extensions.cursor: A cursor on the transaction's connection.
+    """
+    with connection() as conn:
+        cur = conn.cursor()
+        try:
+            yield cur
+            with timer('db_commit'):
+                conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cur.close()
+
+
+@contextmanager
+def server_cursor(cur, itersize=2000):
+    """
+    Opens a named, server-side cursor in the same transaction as cur.
+
+    Rows are streamed from the server itersize at a time while iterating, so large
+    result sets never have to fit in memory.
+
+    Args:
+        cur (psycopg2.extensions.cursor): A cursor of the open transaction, as yielded by transaction().
+        itersize (int): The number of rows fetched per round trip.
+
+    Yields:
+        psycopg2.extensions.cursor: The server-side cursor.
+    """
+    named = cur.connection.cursor(name=f'server_cursor_{uuid.uuid4().hex}')
+    named.itersize = itersize
+    try:
+        yield named
+    finally:
+        named.close()
+
+
+def notify_data_changed(cur, source):
+    """
+    Tells the listeners of DATA_CHANGED_CHANNEL that some data changed.
+
+    The notification is sent when the transaction of cur commits, and not at all if it rolls back.
+
+    Args:
+        cur (psycopg2.extensions.cursor): The cursor of the open transaction.
+        source (str): What changed, such as 'leaderboards', sent as the payload.
+    """
+    cur.execute("SELECT pg_notify(%s, %s);", (DATA_CHANGED_CHANNEL, source))
@@ -0,0 +1,178 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Directory for all on-disk caches, at the project root
+CACHE_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../.cache'))
+
+
+class DiskCache:
+    """
+    A persistent key/value store of byte bodies with JSON metadata, bounded in total size.
+
+    Each entry is stored as two files named after the SHA-256 of its key: the body and a
+    metadata file. Reading an entry refreshes its metadata file's modification time, and once
+    the bodies exceed max_bytes the least recently used entries are removed first.
+    Freshness is left to the caller, which can keep timestamps in the metadata.
+
+    The entries' sizes and recency are read from disk once, when the cache is created, and then
+    kept in memory, so reads and writes do not list the directory. Entries written by other
+    processes in the meantime are only counted by caches created after them.
+
+    Args:
+        directory (str): The directory holding the cache files. It is created if needed.
+        max_bytes (int): The maximum total size of the stored bodies.
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+        # Body size of every entry by base path, least recently used first
+        self._entries = OrderedDict()
+        self._total = 0
+        entries = []
+        for name in os.listdir(directory):
+            if not name.endswith('.json'):
+                continue
+            base = os.path.join(directory, name[:-len('.json')])
+            try:
+                entries.append((os.path.getmtime(base + '.json'), base, os.path.getsize(base + '.body')))
+            except OSError:
+                continue
+        for _, base, size in sorted(entries):
+            self._entries[base] = size
+            self._total += size
+
+    def _base(self, key):
+        return os.path.join(self.directory, hashlib.sha256(key.encode('utf-8')).hexdigest())
+
+    def _paths(self, key):
+        base = self._base(key)
+        return base + '.body', base + '.json'
+
+    def get(self, key):
+        """
+        Reads an entry and marks it as recently used.
+
+        Args:
+            key (str): The entry's key.
+
+        Returns:
+            tuple: A (body, meta) pair, or None if the entry is missing.
+        """
+        body_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                body = f.read()
+            os.utime(meta_path)
+        except (OSError, ValueError):
+            return None
+        with self._lock:
+            if meta_path[:-len('.json')] in self._entries:
+                self._entries.move_to_end(meta_path[:-len('.json')])
+        return body, meta
+
+    def set(self, key, body, meta):
+        """
+        Stores an entry, replacing any previous one, and evicts old entries if the cache is full.
+
+        Args:
+            key (str): The entry's key.
+            body (bytes): The entry's body.
+            meta (dict): JSON-serializable metadata stored alongside the body.
+        """
+        body_path, meta_path = self._paths(key)
+        meta = dict(meta, key=key, size=len(body))
+        _write_atomic(body_path, body)
+        _write_atomic(meta_path, json.dumps(meta).encode('utf-8'))
+
+        base = meta_path[:-len('.json')]
+        with self._lock:
+            self._total += len(body) - self._entries.pop(base, 0)
+            self._entries[base] = len(body)
+            full = self._total > self.max_bytes
+        if full:
+            self.evict()
+
+    def update_meta(self, key, meta):
+        """
+        Replaces an entry's metadata without rewriting its body.
+
+        Args:
+            key (str): The entry's key.
+            meta (dict): The new metadata.
+        """
+        body_path, meta_path = self._paths(key)
+        meta = dict(meta, key=key, size=os.path.getsize(body_path))
+        _write_atomic(meta_path, json.dumps(meta).encode('utf-8'))
+
+    def keys(self):
+        """
+        Lists the keys of all stored entries.
+
+        Returns:
+            list: The keys, in no particular order.
+        """
+        keys = []
+        for name in os.listdir(self.directory):
+            if name.endswith('.json'):
+                try:
+                    with open(os.path.join(self.directory, name), 'r') as f:
+                        keys.append(json.load(f)['key'])
+                except (OSError, ValueError, KeyError):
+                    continue
+        return keys
+
+    def delete(self, key):
+        """
+        Removes an entry if it exists.
+
+        Args:
+            key (str): The entry's key.
+        """
+        base = self._base(key)
+        with self._lock:
+            self._total -= self._entries.pop(base, 0)
+        _remove_entry(base)
+
+    def evict(self):
+        """
+        Removes the least recently used entries until the bodies fit in max_bytes.
+        """
+        with self._lock:
+            evicted = []
+            while self._total > self.max_bytes and self._entries:
+                base, size = self._entries.popitem(last=False)
+                self._total -= size
+                evicted.append(base)
+        for base in evicted:
+            _remove_entry(base)
+
+
+def _remove_entry(base):
+    """
+    Removes an entry's files, metadata first so readers never find metadata without a body.
+    """
+    for path in (base + '.json', base + '.body'):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def _write_atomic(path, data):
+    """
+    Writes a file through a temporary file so readers never see a partial write.
+    """
+    tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.{time.monotonic_ns()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
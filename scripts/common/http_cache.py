@@ -0,0 +1,127 @@
+import os
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from scripts.common.disk_cache import CACHE_ROOT, DiskCache
+from scripts.common.metrics import count, timer
+
+# Defaults for cached page fetches
+DEFAULT_HTTP_CACHE_DIR = os.path.join(CACHE_ROOT, 'http')
+DEFAULT_HTTP_CACHE_TTL = 6 * 60 * 60
+DEFAULT_HTTP_CACHE_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_HTTP_TIMEOUT = 30
+
+
+def create_session(pool_size):
+    """
+    Creates a requests session that keeps connections alive and can be shared by threads.
+
+    Args:
+        pool_size (int): The number of connections kept open per host.
+
+    Returns:
+        requests.Session: The session.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+class ResponseCache:
+    """
+    Fetches pages over HTTP through a persistent cache keyed by URL.
+
+    Pages fetched less than ttl seconds ago are served from disk without a request. Older
+    pages are revalidated with If-None-Match / If-Modified-Since when the server sent an
+    ETag or Last-Modified header, and a 304 response serves the cached copy again.
+
+    Args:
+        directory (str): The directory holding the cached pages.
+        ttl (float): The number of seconds a cached page is used without revalidation.
+        max_bytes (int): The maximum total size of the cached pages.
+        timeout (float): The timeout in seconds of each request.
+        session (requests.Session, optional): The session requests are sent on. Defaults to a new keep-alive session.
+        upstream (Upstream, optional): The upstream every request goes through, for retries, adaptive
+                                       limits and a circuit breaker. Without one, each request is sent once.
+    """
+
+    def __init__(self, directory=DEFAULT_HTTP_CACHE_DIR, ttl=DEFAULT_HTTP_CACHE_TTL,
+                 max_bytes=DEFAULT_HTTP_CACHE_MAX_BYTES, timeout=DEFAULT_HTTP_TIMEOUT,
+                 session=None, upstream=None):
+        self.store = DiskCache(directory, max_bytes)
+        self.ttl = ttl
+        self.timeout = timeout
+        self.session = session if session is not None else create_session(1)
+        self.upstream = upstream
+
+    def get_text(self, url):
+        """
+        Returns the decoded body of a page, from the cache when possible.
+
+        Args:
+            url (str): The page's URL.
+
+        Returns:
+            str: The page's text.
+
+        Raises:
+            requests.HTTPError: If the server answers with an error status.
+        """
+        cached = self.store.get(url)
+        now = time.time()
+
+        if cached is not None:
+            body, meta = cached
+            if now - meta['fetched_at'] < self.ttl:
+                count('http_cache_hits')
+                return _decode(body, meta)
+
+        headers = {}
+        if cached is not None:
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+
+        response = self._request(url, headers)
+
+        if response.status_code == 304 and cached is not None:
+            count('http_not_modified')
+            meta['fetched_at'] = now
+            self.store.update_meta(url, meta)
+            return _decode(body, meta)
+
+        response.raise_for_status()
+        meta = {
+            'url': url,
+            'fetched_at': now,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'encoding': response.encoding or response.apparent_encoding,
+        }
+        self.store.set(url, response.content, meta)
+        return _decode(response.content, meta)
+
+    def _request(self, url, headers):
+        if self.upstream is None:
+            with timer('http_fetch'):
+                return self._get(url, headers)
+        return self.upstream.call(self._get, url, headers)
+
+    def _get(self, url, headers):
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        # Throttled and failed responses are raised here so the upstream can retry them
+        if response.status_code == 429 or response.status_code >= 500:
+            response.raise_for_status()
+        return response
+
+
+def _decode(body, meta):
+    """
+    Decodes a cached body with the encoding recorded when it was fetched.
+    """
+    return body.decode(meta.get('encoding') or 'utf-8', errors='replace')
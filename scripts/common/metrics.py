@@ -0,0 +1,228 @@
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Directory the run summaries and Prometheus textfiles are written to by default, at the project root
+DEFAULT_METRICS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../metrics'))
+
+# Prefix of every exported Prometheus metric
+METRIC_PREFIX = 'club'
+
+# Quantiles reported for each stage's latencies
+QUANTILES = (0.5, 0.95)
+
+
+class Metrics:
+    """
+    Collects the timings, errors and counters of one job run, across all threads.
+
+    Each stage (such as 'http_fetch' or 'db_commit') keeps the duration of every timed call,
+    so its latency quantiles can be computed at the end of the run.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self.durations = {}
+        self.errors = {}
+        self.counters = {}
+
+    @contextmanager
+    def timer(self, stage):
+        """
+        Times the block as one call of a stage. A block that raises is also counted as an error of the stage.
+
+        Args:
+            stage (str): The stage's name.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.observe(stage, time.perf_counter() - start, error=True)
+            raise
+        self.observe(stage, time.perf_counter() - start)
+
+    def observe(self, stage, seconds, error=False):
+        """
+        Records one call of a stage.
+
+        Args:
+            stage (str): The stage's name.
+            seconds (float): The call's duration.
+            error (bool): Whether the call failed.
+        """
+        with self._lock:
+            self.durations.setdefault(stage, []).append(seconds)
+            self.errors[stage] = self.errors.get(stage, 0) + (1 if error else 0)
+
+    def count(self, name, n=1):
+        """
+        Adds to a counter, such as the number of cache hits.
+
+        Args:
+            name (str): The counter's name.
+            n (int): The amount added.
+        """
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def summary(self):
+        """
+        Summarizes the run so far.
+
+        Returns:
+            dict: The run's start and duration, and per stage the number of calls, errors, error rate,
+                  total, maximum and quantile durations in seconds, and the counters.
+        """
+        with self._lock:
+            durations = {stage: sorted(samples) for stage, samples in self.durations.items()}
+            errors = dict(self.errors)
+            counters = dict(self.counters)
+
+        stages = {}
+        for stage, samples in durations.items():
+            stages[stage] = {
+                'count': len(samples),
+                'errors': errors[stage],
+                'error_rate': errors[stage] / len(samples),
+                'total_seconds': sum(samples),
+                'max_seconds': samples[-1],
+                **{f'p{round(q * 100)}_seconds': _quantile(samples, q) for q in QUANTILES},
+            }
+
+        return {
+            'started_at': self.started_at,
+            'duration_seconds': time.time() - self.started_at,
+            'stages': stages,
+            'counters': counters,
+        }
+
+
+def _quantile(samples, q):
+    """
+    Returns the nearest-rank quantile of sorted samples.
+    """
+    return samples[max(0, math.ceil(q * len(samples)) - 1)]
+
+
+def prometheus_text(job, summary):
+    """
+    Renders a run summary in the Prometheus text exposition format.
+
+    Args:
+        job (str): The job's name, exported as the 'job' label.
+        summary (dict): A summary returned by Metrics.summary. Its 'last_success_at', if set, is exported
+                        as the time of the last successful run.
+
+    Returns:
+        str: The metrics, for the node exporter's textfile collector.
+    """
+    lines = []
+
+    def metric(name, kind, help_text, samples):
+        lines.append(f'# HELP {METRIC_PREFIX}_{name} {help_text}')
+        lines.append(f'# TYPE {METRIC_PREFIX}_{name} {kind}')
+        for suffix, labels, value in samples:
+            label_text = ','.join(f'{key}="{value}"' for key, value in {'job': job, **labels}.items())
+            lines.append(f'{METRIC_PREFIX}_{name}{suffix}{{{label_text}}} {value}')
+
+    stages = summary['stages']
+    metric('stage_duration_seconds', 'summary', 'Duration of each call of a job stage.', [
+        sample
+        for stage, stats in sorted(stages.items())
+        for sample in (
+            [('', {'stage': stage, 'quantile': q}, stats[f'p{round(q * 100)}_seconds']) for q in QUANTILES]
+            + [('_sum', {'stage': stage}, stats['total_seconds']), ('_count', {'stage': stage}, stats['count'])]
+        )
+    ])
+    metric('stage_errors_total', 'counter', 'Failed calls of a job stage.',
+           [('', {'stage': stage}, stats['errors']) for stage, stats in sorted(stages.items())])
+    metric('stage_error_ratio', 'gauge', 'Share of the calls of a job stage that failed.',
+           [('', {'stage': stage}, stats['error_rate']) for stage, stats in sorted(stages.items())])
+    metric('events_total', 'counter', 'Events counted during the run.',
+           [('', {'name': name}, value) for name, value in sorted(summary['counters'].items())])
+    metric('run_duration_seconds', 'gauge', 'Duration of the last run.', [('', {}, summary['duration_seconds'])])
+    if summary.get('last_success_at') is not None:
+        metric('last_success_timestamp_seconds', 'gauge', 'End of the last successful run.',
+               [('', {}, summary['last_success_at'])])
+
+    return '\n'.join(lines) + '\n'
+
+
+_metrics = Metrics()
+
+
+def get_metrics():
+    """
+    Returns the metrics of the current run.
+    """
+    return _metrics
+
+
+def reset_metrics():
+    """
+    Starts collecting the metrics of a new run.
+    """
+    global _metrics
+    _metrics = Metrics()
+
+
+def timer(stage):
+    """
+    Times a block as one call of a stage of the current run. See Metrics.timer.
+    """
+    return _metrics.timer(stage)
+
+
+def count(name, n=1):
+    """
+    Adds to a counter of the current run. See Metrics.count.
+    """
+    _metrics.count(name, n)
+
+
+def _last_success_at(job, directory):
+    """
+    Reads when the job last succeeded from the summary it wrote last, or None if it never did.
+    """
+    try:
+        with open(os.path.join(directory, f'{job}.json'), 'r') as f:
+            return json.load(f).get('last_success_at')
+    except (OSError, ValueError):
+        return None
+
+
+def write_run_metrics(job, directory=DEFAULT_METRICS_DIR, succeeded=True):
+    """
+    Writes the current run's summary as <job>.json and its Prometheus textfile as <job>.prom.
+
+    Both files are replaced atomically, as the textfile collector may read them at any time. The
+    end of the last successful run is kept in the summary, and a failed run carries the previous
+    one forward, so the textfile always exports it and staleness alerts keep firing on failures.
+
+    Args:
+        job (str): The job's name, such as 'stat_collection'.
+        directory (str): The directory the files are written to. It is created if needed.
+        succeeded (bool): Whether the run completed.
+
+    Returns:
+        dict: The run summary.
+    """
+    summary = dict(_metrics.summary(), job=job, succeeded=succeeded)
+    if succeeded:
+        summary['last_success_at'] = summary['started_at'] + summary['duration_seconds']
+    else:
+        summary['last_success_at'] = _last_success_at(job, directory)
+    os.makedirs(directory, exist_ok=True)
+    for name, content in ((f'{job}.json', json.dumps(summary, indent=2)),
+                          (f'{job}.prom', prometheus_text(job, summary))):
+        path = os.path.join(directory, name)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    return summary
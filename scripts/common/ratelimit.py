@@ -0,0 +1,53 @@
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Spaces out calls so that no more than `rate` of them start per second, across all threads.
+
+    Each caller reserves the next free slot under a lock and then sleeps outside of it
+    until its slot comes up, so waiting threads do not block each other.
+
+    Args:
+        rate (float): The maximum number of calls per second. None or 0 disables the limit.
+    """
+
+    def __init__(self, rate):
+        self._lock = threading.Lock()
+        self._next_slot = time.monotonic()
+        self.set_rate(rate)
+
+    def set_rate(self, rate):
+        """
+        Changes the limit for calls that have not reserved a slot yet.
+
+        Args:
+            rate (float): The maximum number of calls per second. None or 0 disables the limit.
+        """
+        with self._lock:
+            self.rate = rate
+            self._interval = 1.0 / rate if rate else 0.0
+
+    def wait(self):
+        """
+        Blocks until the caller may start its call.
+        """
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self._interval
+
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+    def pause(self, seconds):
+        """
+        Holds back every call that has not reserved a slot yet for a number of seconds, such as a Retry-After.
+
+        Args:
+            seconds (float): The number of seconds from now before the next call may start.
+        """
+        with self._lock:
+            self._next_slot = max(self._next_slot, time.monotonic() + seconds)
@@ -0,0 +1,83 @@
+from psycopg2.extras import execute_values
+
+from scripts.common.schema import ensure_schema
+
+
+def start_run(cur, job, run_id, resume=False):
+    """
+    Starts a run of a job, or resumes the interrupted one.
+
+    Entries of the job's other runs are discarded either way: a run can only be resumed while its
+    run_id, such as the date it syncs through, still describes the work to do. Starting the same
+    run over redoes every unit but keeps the units its earlier attempts changed: their data is
+    already stored, so redoing them changes nothing, and changed_units still has to report them.
+
+    Args:
+        cur (psycopg2.extensions.cursor): The cursor of the open transaction.
+        job (str): The name of the job.
+        run_id (str): The identity of the run.
+        resume (bool): Whether to skip the units the same run has already completed. Otherwise it starts over.
+
+    Returns:
+        dict: A dictionary mapping each unit the run has already completed to whether it changed any data.
+    """
+    ensure_schema(cur)
+    cur.execute("DELETE FROM run_journal WHERE job = %s AND run_id <> %s;", (job, run_id))
+    if not resume:
+        cur.execute("DELETE FROM run_journal WHERE job = %s AND run_id = %s AND NOT changed;", (job, run_id))
+        return {}
+
+    cur.execute("SELECT unit, changed FROM run_journal WHERE job = %s AND run_id = %s;", (job, run_id))
+    return dict(cur.fetchall())
+
+
+def record_units(cur, job, run_id, units, changed=()):
+    """
+    Records completed units of work in the journal.
+
+    The entries are written on the caller's cursor, so a unit only counts as completed if the
+    transaction that stores its results commits.
+
+    Args:
+        cur (psycopg2.extensions.cursor): The cursor of the open transaction.
+        job (str): The name of the job.
+        run_id (str): The identity of the run.
+        units (iterable): The completed units, as strings such as a player or member ID.
+        changed (iterable): The units among them whose work changed stored data.
+    """
+    changed = set(changed)
+    rows = [(job, run_id, unit, unit in changed) for unit in units]
+    if not rows:
+        return
+    execute_values(cur, """
+        INSERT INTO run_journal (job, run_id, unit, changed) VALUES %s
+        ON CONFLICT (job, run_id, unit) DO UPDATE
+        SET changed = run_journal.changed OR EXCLUDED.changed, completed_at = now();
+    """, rows, page_size=len(rows))
+
+
+def changed_units(cur, job, run_id):
+    """
+    Reads the units of a run whose work changed stored data, including those of the run's earlier attempts.
+
+    Args:
+        cur (psycopg2.extensions.cursor): A database cursor.
+        job (str): The name of the job.
+        run_id (str): The identity of the run.
+
+    Returns:
+        list: The units.
+    """
+    cur.execute("SELECT unit FROM run_journal WHERE job = %s AND run_id = %s AND changed;", (job, run_id))
+    return [unit for unit, in cur.fetchall()]
+
+
+def finish_run(cur, job):
+    """
+    Clears the journal of a job whose run has completed, so the next run starts over.
+
+    Args:
+        cur (psycopg2.extensions.cursor): The cursor of the open transaction.
+        job (str): The name of the job.
+    """
+    cur.execute("DELETE FROM run_journal WHERE job = %s;", (job,))
@@ -0,0 +1,263 @@
+import argparse
+import sys
+import os
+
+# Add the project root directory to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from scripts.common.db import transaction
+
+# Advisory lock key held while migrating, so two jobs starting at once do not both apply a migration
+MIGRATION_LOCK_KEY = 300
+
+# Schema versions, applied in order. A migration is never edited once released: later changes are
+# new migrations. Every statement of the first one is idempotent, so it adopts databases whose
+# tables were created by hand or by earlier versions of the jobs, adding the keys they lack.
+MIGRATIONS = [
+    (1, 'base tables', """
+        CREATE TABLE IF NOT EXISTS users (
+            mbr_id INTEGER PRIMARY KEY,
+            name TEXT
+        );
+
+        CREATE TABLE IF NOT EXISTS categories (
+            id SERIAL PRIMARY KEY,
+            name TEXT UNIQUE
+        );
+
+        CREATE TABLE IF NOT EXISTS picks (
+            id SERIAL PRIMARY KEY,
+            user_id INTEGER REFERENCES users (mbr_id),
+            category_id INTEGER REFERENCES categories (id),
+            player_name TEXT,
+            pick_order INTEGER,
+            pick_value INTEGER,
+            is_alternate BOOLEAN DEFAULT false,
+            UNIQUE (user_id, category_id, pick_order)
+        );
+
+        CREATE TABLE IF NOT EXISTS players (
+            id SERIAL PRIMARY KEY,
+            player_name TEXT UNIQUE,
+            player_type TEXT,
+            api_player_id INTEGER
+        );
+
+        -- The upserts of the scraper and populate_players infer their conflict targets from these keys,
+        -- and hitters and pitchers reference players (id). Tables created by hand may lack them; the
+        -- index names are those the constraints above get, so nothing is created twice.
+        CREATE UNIQUE INDEX IF NOT EXISTS users_pkey ON users (mbr_id);
+        CREATE UNIQUE INDEX IF NOT EXISTS categories_pkey ON categories (id);
+        CREATE UNIQUE INDEX IF NOT EXISTS categories_name_key ON categories (name);
+        CREATE UNIQUE INDEX IF NOT EXISTS picks_user_id_category_id_pick_order_key
+            ON picks (user_id, category_id, pick_order);
+        CREATE UNIQUE INDEX IF NOT EXISTS players_pkey ON players (id);
+        CREATE UNIQUE INDEX IF NOT EXISTS players_player_name_key ON players (player_name);
+
+        CREATE TABLE IF NOT EXISTS hitters (
+            id SERIAL PRIMARY KEY,
+            player_id INTEGER UNIQUE REFERENCES players (id),
+            average VARCHAR(10),
+            ops VARCHAR(10),
+            plate_appearances INTEGER,
+            home_runs INTEGER,
+            rbis INTEGER,
+            stolen_bases INTEGER
+        );
+
+        CREATE TABLE IF NOT EXISTS pitchers (
+            id SERIAL PRIMARY KEY,
+            player_id INTEGER UNIQUE REFERENCES players (id),
+            wins INTEGER,
+            losses INTEGER,
+            era VARCHAR(10),
+            strikeouts INTEGER
+        );
+
+        -- The stats writers and populate_players rely on one row per player
+        CREATE UNIQUE INDEX IF NOT EXISTS hitters_player_id_key ON hitters (player_id);
+        CREATE UNIQUE INDEX IF NOT EXISTS pitchers_player_id_key ON pitchers (player_id);
+
+        CREATE TABLE IF NOT EXISTS sync_watermarks (
+            job TEXT PRIMARY KEY,
+            synced_through DATE NOT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS run_journal (
+            job TEXT NOT NULL,
+            run_id TEXT NOT NULL,
+            unit TEXT NOT NULL,
+            changed BOOLEAN NOT NULL DEFAULT FALSE,
+            completed_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+            PRIMARY KEY (job, run_id, unit)
+        );
+
+        CREATE TABLE IF NOT EXISTS hitting_streaks (
+            api_player_id INTEGER PRIMARY KEY,
+            current_streak INTEGER NOT NULL DEFAULT 0,
+            longest_streak INTEGER NOT NULL DEFAULT 0,
+            last_game_date DATE
+        );
+
+        CREATE TABLE IF NOT EXISTS leaderboards (
+            category_id INTEGER,
+            user_id INTEGER,
+            score NUMERIC,
+            tiebreak NUMERIC,
+            rank INTEGER
+        );
+        CREATE UNIQUE INDEX IF NOT EXISTS leaderboards_category_user_idx ON leaderboards (category_id, user_id);
+        CREATE INDEX IF NOT EXISTS leaderboards_category_rank_idx ON leaderboards (category_id, rank);
+        CREATE INDEX IF NOT EXISTS leaderboards_user_idx ON leaderboards (user_id);
+        CREATE INDEX IF NOT EXISTS picks_player_name_idx ON picks (player_name);
+
+        CREATE TABLE IF NOT EXISTS leaderboard_refreshes (
+            refreshed_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+            qualifying_pa INTEGER NOT NULL,
+            rows_written INTEGER NOT NULL,
+            full_refresh BOOLEAN NOT NULL
+        );
+
+        -- Partitioned by month of stat_date; record_stats_history creates the partitions
+        CREATE TABLE IF NOT EXISTS hitter_stats_history (
+            player_id INTEGER NOT NULL,
+            stat_date DATE NOT NULL,
+            average NUMERIC(4, 3),
+            ops NUMERIC(5, 3),
+            plate_appearances SMALLINT,
+            home_runs SMALLINT,
+            rbis SMALLINT,
+            stolen_bases SMALLINT,
+            PRIMARY KEY (player_id, stat_date)
+        ) PARTITION BY RANGE (stat_date);
+
+        CREATE TABLE IF NOT EXISTS pitcher_stats_history (
+            player_id INTEGER NOT NULL,
+            stat_date DATE NOT NULL,
+            wins SMALLINT,
+            losses SMALLINT,
+            era NUMERIC(6, 2),
+            strikeouts SMALLINT,
+            PRIMARY KEY (player_id, stat_date)
+        ) PARTITION BY RANGE (stat_date);
+    """),
+    (2, 'indexes for the job queries', """
+        -- load_player_ids: the players of one type with an api_player_id, read from the index alone
+        CREATE INDEX players_type_api_player_id_idx ON players (player_type)
+            INCLUDE (id, api_player_id) WHERE api_player_id IS NOT NULL;
+
+        -- populate_players reads the distinct (player_name, category_id) of the picks, and rescoring
+        -- looks up the members who picked a player; both are answered from the index alone
+        DROP INDEX IF EXISTS picks_player_name_idx;
+        CREATE INDEX picks_player_name_category_idx ON picks (player_name, category_id) INCLUDE (user_id);
+
+        -- get_leaderboard reads a contest in (rank, user_id) order without sorting
+        DROP INDEX IF EXISTS leaderboards_category_rank_idx;
+        CREATE INDEX leaderboards_category_rank_idx ON leaderboards (category_id, rank, user_id)
+            INCLUDE (score, tiebreak);
+    """),
+    (3, 'numeric rate stats', """
+        -- The API sends rates as strings such as '.312', and '.---' or '-.--' before a player has any
+        ALTER TABLE hitters
+            ALTER COLUMN average TYPE NUMERIC(4, 3)
+                USING CASE WHEN average ~ '^-?[0-9]*\\.?[0-9]+$' THEN average::numeric END,
+            ALTER COLUMN ops TYPE NUMERIC(5, 3)
+                USING CASE WHEN ops ~ '^-?[0-9]*\\.?[0-9]+$' THEN ops::numeric END;
+        ALTER TABLE pitchers
+            ALTER COLUMN era TYPE NUMERIC(6, 2)
+                USING CASE WHEN era ~ '^-?[0-9]*\\.?[0-9]+$' THEN era::numeric END;
+    """),
+    (4, 'league leaders', """
+        -- The season's MLB leaders the closeness contests are measured against, by hitters column
+        CREATE TABLE league_leaders (
+            stat TEXT PRIMARY KEY,
+            total INTEGER NOT NULL,
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        );
+    """),
+    (5, 'integer api_player_id', """
+        -- Earlier versions of populate_players stored 'NOT_FOUND' in a text api_player_id for names
+        -- they could not resolve; unresolved players now have none
+        UPDATE players SET api_player_id = NULL WHERE api_player_id::text !~ '^[0-9]+$';
+        ALTER TABLE players ALTER COLUMN api_player_id TYPE INTEGER USING api_player_id::text::integer;
+    """),
+]
+
+# The connections (by DSN) already known to be at the latest version
+_migrated = set()
+
+
+def schema_version(cur):
+    """
+    Reads the version of the database's schema.
+
+    Args:
+        cur (psycopg2.extensions.cursor): A database cursor.
+
+    Returns:
+        int: The version of the last migration applied, or 0 if none has been.
+    """
+    cur.execute("SELECT to_regclass('schema_migrations') IS NOT NULL;")
+    if not cur.fetchone()[0]:
+        return 0
+    cur.execute("SELECT COALESCE(max(version), 0) FROM schema_migrations;")
+    return cur.fetchone()[0]
+
+
+def migrate(cur):
+    """
+    Applies the migrations the database does not have yet, in order.
+
+    The migrations run on the caller's cursor, so they are committed with the caller's transaction
+    and none of them is recorded if it rolls back. Concurrent callers wait for each other.
+
+    Args:
+        cur (psycopg2.extensions.cursor): The cursor of the open transaction.
+
+    Returns:
+        list: The versions applied.
+    """
+    cur.execute("SELECT pg_advisory_xact_lock(%s);", (MIGRATION_LOCK_KEY,))
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        );
+    """)
+    current = schema_version(cur)
+
+    applied = []
+    for version, description, statements in MIGRATIONS:
+        if version <= current:
+            continue
+        cur.execute(statements)
+        cur.execute("INSERT INTO schema_migrations (version, description) VALUES (%s, %s);", (version, description))
+        applied.append(version)
+    return applied
+
+
+def ensure_schema(cur):
+    """
+    Brings the database's schema to the latest version, if it is not there yet.
+
+    Once a database is known to be up to date, later calls of the process return without a query.
+
+    Args:
+        cur (psycopg2.extensions.cursor): The cursor of the open transaction.
+    """
+    dsn = cur.connection.dsn
+    if dsn in _migrated:
+        return
+    if schema_version(cur) < MIGRATIONS[-1][0]:
+        migrate(cur)
+    _migrated.add(dsn)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Migrates the database schema to the latest version.')
+    parser.parse_args()
+
+    with transaction() as cur:
+        applied = migrate(cur)
+        print(f"Applied migrations {applied}." if applied else "The schema is up to date.")
@@ -0,0 +1,154 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future
+from urllib.parse import urlencode
+
+from scripts.common.disk_cache import CACHE_ROOT, DiskCache
+from scripts.common.metrics import count
+
+# Defaults for cached MLB Stats API responses
+DEFAULT_STATSAPI_CACHE_DIR = os.path.join(CACHE_ROOT, 'statsapi')
+DEFAULT_STATSAPI_CACHE_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_STATSAPI_CACHE_TTL = 6 * 60 * 60
+
+# Seconds a cached response of an endpoint is reused. Rosters change a few times a day at most,
+# and the box scores the jobs read are of finished games, which do not change.
+STATSAPI_CACHE_TTLS = {
+    'sports_players': 24 * 60 * 60,
+    'game_boxscore': 7 * 24 * 60 * 60,
+    'schedule': DEFAULT_STATSAPI_CACHE_TTL,
+    'standings': DEFAULT_STATSAPI_CACHE_TTL,
+    'people': DEFAULT_STATSAPI_CACHE_TTL,
+}
+
+# 'live' serves fresh cached responses and fetches the rest, 'record' fetches every response and
+# keeps it, and 'replay' serves recorded responses only, so a recorded run can be reproduced offline.
+CACHE_MODES = ('live', 'record', 'replay')
+
+# Recordings are kept whole, whatever their size
+RECORDING_MAX_BYTES = float('inf')
+
+
+class ReplayMissError(KeyError):
+    """
+    Raised in replay mode for a call that was not recorded.
+    """
+
+
+def cache_key(endpoint, params):
+    """
+    Builds the cache key of a call from its endpoint and parameters, independent of their order and types.
+
+    Args:
+        endpoint (str): The statsapi endpoint or function name.
+        params (dict): The call's parameters.
+
+    Returns:
+        str: The key, such as 'people?hydrate=...&personIds=1,2'.
+    """
+    return f"{endpoint}?{urlencode(sorted((str(key), str(value)) for key, value in params.items()))}"
+
+
+class StatsApiCache:
+    """
+    Caches MLB Stats API responses in two tiers.
+
+    The in-memory tier shares each call in flight with every caller asking for the same one, so
+    concurrent callers wait for a single request. The persistent tier is a DiskCache of the JSON
+    responses, reused within each endpoint's TTL and evicted least recently used first, so a
+    call repeated later in the run or by a later run is read from disk. Without a persistent
+    tier, completed responses stay in memory for the life of the cache, normally one run.
+
+    Responses shared between callers must not be modified.
+
+    Args:
+        directory (str): The directory of the persistent tier, or None to only keep the in-memory tier.
+        mode (str): One of CACHE_MODES.
+        ttls (dict, optional): Seconds a cached response is reused, per endpoint. Defaults to STATSAPI_CACHE_TTLS.
+        default_ttl (float): The TTL of endpoints missing from ttls.
+        max_bytes (int): The maximum total size of the persistent tier in live mode. Recordings are not evicted.
+    """
+
+    def __init__(self, directory=DEFAULT_STATSAPI_CACHE_DIR, mode='live', ttls=None,
+                 default_ttl=DEFAULT_STATSAPI_CACHE_TTL, max_bytes=DEFAULT_STATSAPI_CACHE_MAX_BYTES):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"unknown cache mode {mode!r}, expected one of {', '.join(CACHE_MODES)}")
+        if mode != 'live' and directory is None:
+            raise ValueError(f"{mode} mode needs a directory")
+
+        self.mode = mode
+        self.ttls = STATSAPI_CACHE_TTLS if ttls is None else ttls
+        self.default_ttl = default_ttl
+        self.store = None
+        if directory is not None:
+            self.store = DiskCache(directory, max_bytes if mode == 'live' else RECORDING_MAX_BYTES)
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._created_at = time.time()
+
+    def get(self, endpoint, params, fetch):
+        """
+        Returns the response of a call, from the cache when possible.
+
+        Args:
+            endpoint (str): The statsapi endpoint or function name.
+            params (dict): The call's parameters.
+            fetch (callable): A function without arguments that makes the call, for a cache miss.
+
+        Returns:
+            The response.
+
+        Raises:
+            ReplayMissError: In replay mode, if the call was not recorded.
+        """
+        key = cache_key(endpoint, params)
+        with self._lock:
+            call = self._calls.get(key)
+            owner = call is None
+            if owner:
+                call = self._calls[key] = Future()
+
+        if not owner:
+            count('statsapi_cache_shared')
+            return call.result()
+
+        try:
+            response = self._load(key, endpoint, fetch)
+        except BaseException as e:
+            # Failures are not kept, so a later caller tries again
+            with self._lock:
+                del self._calls[key]
+            call.set_exception(e)
+            raise
+        call.set_result(response)
+        if self.store is not None:
+            # Later callers read the response from disk instead of keeping it in memory
+            with self._lock:
+                del self._calls[key]
+        return response
+
+    def _fresh(self, endpoint, meta):
+        if self.mode == 'replay':
+            return True
+        if self.mode == 'record':
+            # Only responses recorded by this run are reused, older recordings are replaced
+            return meta['fetched_at'] >= self._created_at
+        return time.time() - meta['fetched_at'] < self.ttls.get(endpoint, self.default_ttl)
+
+    def _load(self, key, endpoint, fetch):
+        if self.store is not None:
+            cached = self.store.get(key)
+            if cached is not None and self._fresh(endpoint, cached[1]):
+                count('statsapi_cache_hits')
+                return json.loads(cached[0])
+
+        if self.mode == 'replay':
+            raise ReplayMissError(key)
+
+        count('statsapi_cache_misses')
+        response = fetch()
+        if self.store is not None:
+            self.store.set(key, json.dumps(response).encode('utf-8'), {'endpoint': endpoint, 'fetched_at': time.time()})
+        return response
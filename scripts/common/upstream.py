@@ -0,0 +1,310 @@
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+import requests
+import statsapi
+
+from scripts.common.metrics import count, timer
+from scripts.common.ratelimit import RateLimiter
+from scripts.common.statsapi_cache import StatsApiCache
+
+# Defaults for calls to the MLB Stats API
+STATSAPI_TIMEOUT = 30
+STATSAPI_MAX_CONCURRENCY = 4
+STATSAPI_REQUESTS_PER_SECOND = 10
+
+# Defaults of every upstream's retries and circuit breaker
+DEFAULT_MAX_ATTEMPTS = 4
+DEFAULT_BASE_DELAY = 0.5
+DEFAULT_MAX_DELAY = 30.0
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RESET_TIMEOUT = 30.0
+
+# HTTP statuses by which a server asks its clients to slow down
+THROTTLE_STATUSES = (429, 503)
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of calling an upstream whose circuit breaker is open.
+    """
+
+
+class AdaptiveLimiter:
+    """
+    Limits the calls in flight and the calls started per second to an upstream, adapting both AIMD-style.
+
+    Every successful call raises each limit by about one unit per round of calls (additive increase),
+    up to the configured maximum. A throttled or failed call halves both limits (multiplicative decrease),
+    at most once per cooldown so that a burst of failures from one overload counts once.
+
+    Args:
+        max_concurrency (int): The maximum number of calls in flight.
+        requests_per_second (float): The maximum number of calls started per second. None or 0 disables the rate limit.
+        min_concurrency (int): The lowest the concurrency limit goes.
+        min_rate (float): The lowest the rate limit goes.
+        decrease_factor (float): The factor limits are multiplied by on a throttled or failed call.
+        cooldown (float): The minimum number of seconds between two decreases.
+    """
+
+    def __init__(self, max_concurrency, requests_per_second=None, min_concurrency=1, min_rate=0.5,
+                 decrease_factor=0.5, cooldown=1.0):
+        self.max_concurrency = max_concurrency
+        self.max_rate = requests_per_second or None
+        self.min_concurrency = min_concurrency
+        self.min_rate = min_rate
+        self.decrease_factor = decrease_factor
+        self.cooldown = cooldown
+
+        self.concurrency = float(max_concurrency)
+        self.rate = self.max_rate
+        self._rate_limiter = RateLimiter(self.rate)
+        self._in_flight = 0
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    @contextmanager
+    def slot(self):
+        """
+        Holds one of the call slots for the duration of the block, waiting for the rate limit first.
+        """
+        with self._condition:
+            while self._in_flight >= int(self.concurrency):
+                self._condition.wait()
+            self._in_flight += 1
+        try:
+            self._rate_limiter.wait()
+            yield
+        finally:
+            with self._condition:
+                self._in_flight -= 1
+                self._condition.notify()
+
+    def on_success(self):
+        """
+        Raises the limits after a healthy response.
+        """
+        with self._condition:
+            self.concurrency = min(self.max_concurrency, self.concurrency + 1 / self.concurrency)
+            if self.rate is not None and self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + 1 / self.rate)
+                self._rate_limiter.set_rate(self.rate)
+            self._condition.notify_all()
+
+    def on_throttle(self, retry_after=None):
+        """
+        Lowers the limits after a throttled or failed call.
+
+        Args:
+            retry_after (float, optional): The number of seconds the upstream asked to wait before the next call.
+        """
+        now = time.monotonic()
+        with self._condition:
+            if now - self._last_decrease >= self.cooldown:
+                self._last_decrease = now
+                self.concurrency = max(self.min_concurrency, self.concurrency * self.decrease_factor)
+                if self.rate is not None:
+                    self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+                    self._rate_limiter.set_rate(self.rate)
+        if retry_after:
+            self._rate_limiter.pause(retry_after)
+
+
+class CircuitBreaker:
+    """
+    Fails calls fast while an upstream is down.
+
+    After failure_threshold consecutive failures the circuit opens and calls are refused. Once
+    reset_timeout seconds have passed, a single trial call is let through (half-open): its success
+    closes the circuit again and its failure reopens it.
+
+    Args:
+        failure_threshold (int): The number of consecutive failures that opens the circuit.
+        reset_timeout (float): The number of seconds the circuit stays open before a trial call.
+    """
+
+    def __init__(self, failure_threshold=DEFAULT_FAILURE_THRESHOLD, reset_timeout=DEFAULT_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """
+        Checks that a call may be made.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with a trial call already in flight.
+        """
+        with self._lock:
+            if self.state == 'open' and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = 'half_open'
+                return
+            if self.state != 'closed':
+                raise CircuitOpenError(f"circuit open after {self.failures} consecutive failures")
+
+    def record_success(self):
+        with self._lock:
+            self.state = 'closed'
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == 'half_open' or self.failures >= self.failure_threshold:
+                self.state = 'open'
+                self._opened_at = time.monotonic()
+
+
+class Upstream:
+    """
+    Calls one upstream service with retries, adaptive limits and a circuit breaker.
+
+    Timeouts, connection errors, 429 and 5xx responses are retried with jittered exponential
+    backoff, honoring Retry-After, and lower the adaptive limits. Other errors, such as a 404 or
+    an unexpected response, are raised at once.
+
+    Args:
+        stage (str): The metrics stage every attempt is timed as, such as 'statsapi_request'.
+        max_concurrency (int): The maximum number of calls in flight.
+        requests_per_second (float): The maximum number of calls started per second. None or 0 disables the rate limit.
+        max_attempts (int): The number of attempts of each call.
+        base_delay (float): The maximum delay in seconds before the first retry, doubled for each further retry.
+        max_delay (float): The cap of the retry delays.
+        breaker (CircuitBreaker, optional): The circuit breaker. Defaults to one with the default thresholds.
+    """
+
+    def __init__(self, stage, max_concurrency, requests_per_second=None, max_attempts=DEFAULT_MAX_ATTEMPTS,
+                 base_delay=DEFAULT_BASE_DELAY, max_delay=DEFAULT_MAX_DELAY, breaker=None):
+        self.stage = stage
+        self.limiter = AdaptiveLimiter(max_concurrency, requests_per_second)
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def call(self, function, *args, **kwargs):
+        """
+        Calls a function that talks to the upstream, retrying it when the upstream is throttling or failing.
+
+        Args:
+            function (callable): The function. HTTP errors must be raised as requests.HTTPError.
+            *args: Its positional arguments.
+            **kwargs: Its keyword arguments.
+
+        Returns:
+            The function's result.
+
+        Raises:
+            CircuitOpenError: If the upstream's circuit is open.
+            Exception: The last error, once every attempt failed or for errors that are not retried.
+        """
+        for attempt in range(1, self.max_attempts + 1):
+            self.breaker.allow()
+            try:
+                with self.limiter.slot(), timer(self.stage):
+                    result = function(*args, **kwargs)
+            except Exception as e:
+                if not is_retryable(e):
+                    # The upstream answered, so it is up
+                    self.breaker.record_success()
+                    raise
+
+                retry_after = _retry_after(e)
+                self.breaker.record_failure()
+                self.limiter.on_throttle(retry_after)
+                count(f'{self.stage}_throttled' if _status(e) in THROTTLE_STATUSES else f'{self.stage}_failed')
+                if attempt == self.max_attempts:
+                    raise
+
+                count(f'{self.stage}_retries')
+                delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+                time.sleep(max(delay, retry_after or 0))
+            else:
+                self.breaker.record_success()
+                self.limiter.on_success()
+                return result
+
+
+def _status(error):
+    response = getattr(error, 'response', None)
+    return response.status_code if response is not None else None
+
+
+def is_retryable(error):
+    """
+    Tells whether an error is worth retrying: a timeout, a connection error, a 429 or a 5xx response.
+    """
+    if isinstance(error, requests.HTTPError):
+        status = _status(error)
+        return status is not None and (status in THROTTLE_STATUSES or status >= 500)
+    return isinstance(error, (requests.Timeout, requests.ConnectionError))
+
+
+def _retry_after(error):
+    """
+    Returns the seconds of a response's Retry-After header, or None if it has none in seconds.
+    """
+    response = getattr(error, 'response', None)
+    try:
+        return float(response.headers['Retry-After'])
+    except (AttributeError, KeyError, TypeError, ValueError):
+        return None
+
+
+_statsapi = None
+_statsapi_cache = None
+_statsapi_timeout = STATSAPI_TIMEOUT
+_statsapi_lock = threading.Lock()
+
+
+def configure_statsapi(max_concurrency=STATSAPI_MAX_CONCURRENCY, requests_per_second=STATSAPI_REQUESTS_PER_SECOND,
+                       timeout=STATSAPI_TIMEOUT, cache=None, **kwargs):
+    """
+    Replaces the upstream and the response cache every MLB Stats API call goes through.
+
+    Jobs call this once per run, so the cache's in-memory tier only shares responses within a run.
+
+    Args:
+        max_concurrency (int): The maximum number of requests in flight.
+        requests_per_second (float): The maximum number of requests started per second. None or 0 disables the limit.
+        timeout (float): The timeout in seconds of each request.
+        cache (StatsApiCache, optional): The response cache. Defaults to a live cache in the default directory.
+        **kwargs: Keyword arguments for Upstream, such as max_attempts.
+
+    Returns:
+        Upstream: The new upstream.
+    """
+    global _statsapi, _statsapi_cache, _statsapi_timeout
+    with _statsapi_lock:
+        _statsapi = Upstream('statsapi_request', max_concurrency, requests_per_second, **kwargs)
+        _statsapi_cache = cache if cache is not None else StatsApiCache()
+        _statsapi_timeout = timeout
+    return _statsapi
+
+
+def statsapi_get(endpoint, params, cache=True):
+    """
+    Calls statsapi.get through the shared MLB Stats API response cache and upstream.
+
+    Args:
+        endpoint (str): The statsapi endpoint, such as 'people'.
+        params (dict): The endpoint's parameters.
+        cache (bool): Whether to go through the response cache, for calls worth keeping.
+
+    Returns:
+        dict: The decoded response, possibly shared with other callers. It must not be modified.
+    """
+    if _statsapi is None:
+        configure_statsapi()
+    upstream, response_cache, timeout = _statsapi, _statsapi_cache, _statsapi_timeout
+
+    def fetch():
+        return upstream.call(statsapi.get, endpoint, params, request_kwargs={'timeout': timeout})
+
+    return response_cache.get(endpoint, params, fetch) if cache else fetch()
+
@@ -0,0 +1,37 @@
+from scripts.common.schema import ensure_schema
+
+
+def get_watermark(cur, job):
+    """
+    Reads the last date a job has been synced through.
+
+    Args:
+        cur (psycopg2.extensions.cursor): A database cursor.
+        job (str): The name of the job.
+
+    Returns:
+        datetime.date: The last synced date, or None if the job has never completed.
+    """
+    ensure_schema(cur)
+    cur.execute("SELECT synced_through FROM sync_watermarks WHERE job = %s;", (job,))
+    row = cur.fetchone()
+    return row[0] if row else None
+
+
+def set_watermark(cur, job, synced_through):
+    """
+    Records the last date a job has been synced through.
+
+    The watermark is written on the caller's cursor, so it only moves forward if the
+    caller's transaction commits.
+
+    Args:
+        cur (psycopg2.extensions.cursor): The cursor of the open transaction.
+        job (str): The name of the job.
+        synced_through (datetime.date): The last date whose data the job has processed.
+    """
+    cur.execute("""
+        INSERT INTO sync_watermarks (job, synced_through)
+        VALUES (%s, %s)
+        ON CONFLICT (job) DO UPDATE SET synced_through = EXCLUDED.synced_through;
+    """, (job, synced_through))
@@ -0,0 +1,143 @@
+import sys
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+# Add the project root directory to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from scripts.common.upstream import statsapi_get
+
+# Coded game states of games that are over: 'F' (Final) and 'O' (Game Over).
+# Postponed and cancelled games are also reported as abstract state 'Final', so the coded state is used.
+FINAL_GAME_STATES = ('F', 'O')
+
+# Coded game states of games that will not be played to the end today: postponed, cancelled and suspended
+STOPPED_GAME_STATES = ('D', 'C', 'T', 'U')
+
+def fetch_final_games(start_date, end_date):
+    """
+    Fetches the regular season MLB games that finished between two dates.
+
+    Args:
+        start_date (datetime.date): The first date to include.
+        end_date (datetime.date): The last date to include.
+
+    Returns:
+        list: A list of (official_date, game_pk) tuples ordered by date, where official_date is an ISO date string.
+    """
+    schedule = statsapi_get('schedule', {
+        'sportId': 1,
+        'startDate': start_date.isoformat(),
+        'endDate': end_date.isoformat(),
+    })
+
+    games = []
+    for schedule_date in schedule.get('dates', []):
+        for game in schedule_date.get('games', []):
+            if game.get('gameType') == 'R' and game['status'].get('codedGameState') in FINAL_GAME_STATES:
+                games.append((game.get('officialDate', schedule_date['date']), game['gamePk']))
+
+    return sorted(games)
+
+def fetch_day_games(day):
+    """
+    Fetches the current state of every regular season MLB game scheduled on a date.
+
+    The schedule is not cached, as the states change while the games are played.
+
+    Args:
+        day (datetime.date): The date.
+
+    Returns:
+        list: A list of (game_pk, coded_game_state, first_pitch) tuples, where first_pitch is the scheduled
+              start as a timezone-aware datetime.
+    """
+    schedule = statsapi_get('schedule', {'sportId': 1, 'date': day.isoformat()}, cache=False)
+
+    games = []
+    for schedule_date in schedule.get('dates', []):
+        for game in schedule_date.get('games', []):
+            if game.get('gameType') == 'R':
+                first_pitch = datetime.fromisoformat(game['gameDate'].replace('Z', '+00:00'))
+                games.append((game['gamePk'], game['status'].get('codedGameState'), first_pitch))
+
+    return games
+
+def fetch_box_score(game_pk):
+    """
+    Fetches the box score of a game.
+
+    Args:
+        game_pk (int): The game's ID in the MLB Stats API.
+
+    Returns:
+        dict: The box score, with 'away' and 'home' team entries.
+    """
+    return statsapi_get('game_boxscore', {'gamePk': game_pk})['teams']
+
+def appeared_players(box_score):
+    """
+    Collects the players who batted or pitched in a game.
+
+    Args:
+        box_score (dict): A box score as returned by fetch_box_score.
+
+    Returns:
+        set: The api_player_ids of the players who appeared.
+    """
+    players = set()
+    for side in ('away', 'home'):
+        players.update(box_score[side].get('batters', []))
+        players.update(box_score[side].get('pitchers', []))
+    return players
+
+def batting_lines(box_score):
+    """
+    Collects the batting line of every player who batted in a game.
+
+    Args:
+        box_score (dict): A box score as returned by fetch_box_score.
+
+    Returns:
+        dict: A dictionary mapping each api_player_id to a (hits, at_bats, sac_flies) tuple.
+    """
+    lines = {}
+    for side in ('away', 'home'):
+        players = box_score[side].get('players', {})
+        for api_player_id in box_score[side].get('batters', []):
+            batting = players.get(f'ID{api_player_id}', {}).get('stats', {}).get('batting', {})
+            lines[api_player_id] = (batting.get('hits', 0), batting.get('atBats', 0), batting.get('sacFlies', 0))
+    return lines
+
+def fetch_players_who_appeared(start_date, end_date, workers=4):
+    """
+    Collects every player who batted or pitched in a finished game between two dates.
+
+    Args:
+        start_date (datetime.date): The first date to include.
+        end_date (datetime.date): The last date to include.
+        workers (int): The maximum number of box score requests in flight at once.
+
+    Returns:
+        set: The api_player_ids of the players who appeared.
+    """
+    return fetch_players_in_games([game_pk for _, game_pk in fetch_final_games(start_date, end_date)], workers)
+
+def fetch_players_in_games(game_pks, workers=4):
+    """
+    Collects every player who batted or pitched in some games, from their box scores.
+
+    Args:
+        game_pks (list): The games' IDs in the MLB Stats API.
+        workers (int): The maximum number of box score requests in flight at once.
+
+    Returns:
+        set: The api_player_ids of the players who appeared.
+    """
+    players = set()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for box_score in executor.map(fetch_box_score, game_pks):
+            players.update(appeared_players(box_score))
+
+    return players
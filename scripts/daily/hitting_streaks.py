@@ -0,0 +1,228 @@
+import argparse
+import sys
+import os
+from datetime import date, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from psycopg2.extras import execute_values
+
+# Add the project root directory to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from scripts.common.db import transaction
+from scripts.common.schema import ensure_schema
+from scripts.common.upstream import configure_statsapi, statsapi_get
+from scripts.common.watermarks import get_watermark, set_watermark
+from scripts.daily.box_scores import batting_lines, fetch_box_score, fetch_final_games
+
+# Watermark job name for the last date whose games are reflected in the hitting_streaks table
+STREAKS_WATERMARK = 'hitting_streaks'
+
+# Number of players whose game logs are requested per call to the 'people' endpoint during a backfill
+GAME_LOG_BATCH_SIZE = 50
+
+# Concurrency and rate limit for MLB Stats API requests
+DEFAULT_FETCH_WORKERS = 4
+DEFAULT_REQUESTS_PER_SECOND = 10
+
+# The stored streaks of some batters, by api_player_id
+STREAKS_QUERY = """
+    SELECT api_player_id, current_streak, longest_streak, last_game_date
+    FROM hitting_streaks
+    WHERE api_player_id = ANY(%s);
+"""
+
+def advance_streak(streak, hits, at_bats, sac_flies):
+    """
+    Advances a player's hitting streak by one game.
+
+    As for the official record, a game with a hit extends the streak, and a game without an
+    official at bat (only walks, hit by pitches or sacrifice bunts) neither extends nor ends it.
+    A sacrifice fly without a hit ends it.
+
+    Args:
+        streak (list): The player's [current_streak, longest_streak], updated in place.
+        hits (int): The player's hits in the game.
+        at_bats (int): The player's official at bats in the game.
+        sac_flies (int): The player's sacrifice flies in the game.
+    """
+    if hits > 0:
+        streak[0] += 1
+        streak[1] = max(streak[1], streak[0])
+    elif at_bats > 0 or sac_flies > 0:
+        streak[0] = 0
+
+def fetch_game_logs(api_player_ids, season):
+    """
+    Fetches the regular season batting game logs of one batch of players with a single 'people' request.
+
+    Args:
+        api_player_ids (list): The players' IDs in the MLB Stats API.
+        season (int): The season.
+
+    Returns:
+        dict: A dictionary mapping each api_player_id to a list of (game_date, game_pk, hits, at_bats, sac_flies)
+              tuples in game order.
+
+    Raises:
+        Exception: If the request still fails after the upstream's retries.
+    """
+    # A backfill runs once a season, so its large game logs are not worth caching
+    response = statsapi_get('people', {
+        'personIds': ','.join(str(api_player_id) for api_player_id in api_player_ids),
+        'hydrate': f'stats(group=[hitting],type=[gameLog],season={season},sportId=1)',
+    }, cache=False)
+
+    game_logs = {}
+    for person in response.get('people', []):
+        games = []
+        for stat_group in person.get('stats', []):
+            for split in stat_group.get('splits', []):
+                if split.get('gameType', 'R') != 'R':
+                    continue
+                stat = split['stat']
+                games.append((date.fromisoformat(split['date']), split['game']['gamePk'],
+                              stat.get('hits', 0), stat.get('atBats', 0), stat.get('sacFlies', 0)))
+        game_logs[person['id']] = sorted(games)
+
+    return game_logs
+
+def backfill_streaks(season, through, workers=DEFAULT_FETCH_WORKERS, batch_size=GAME_LOG_BATCH_SIZE):
+    """
+    Computes every batter's streaks for a season from full game logs.
+
+    This is only needed once, before any daily box scores have been applied.
+
+    Args:
+        season (int): The season.
+        through (datetime.date): The last date whose games are counted.
+        workers (int): The number of threads sending requests.
+        batch_size (int): The maximum number of players per request.
+
+    Returns:
+        dict: A dictionary mapping each api_player_id to its [current_streak, longest_streak, last_game_date].
+    """
+    roster = statsapi_get('sports_players', {'season': season, 'sportId': 1})['people']
+    # Pitchers only bat in rare cases, so they are left out of the backfill
+    batters = [person['id'] for person in roster if person.get('primaryPosition', {}).get('code') != '1']
+    batches = [batters[start:start + batch_size] for start in range(0, len(batters), batch_size)]
+
+    streaks = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for game_logs in executor.map(lambda batch: fetch_game_logs(batch, season), batches):
+            for api_player_id, games in game_logs.items():
+                streak = [0, 0, None]
+                for game_date, _, hits, at_bats, sac_flies in games:
+                    if game_date <= through:
+                        advance_streak(streak, hits, at_bats, sac_flies)
+                        streak[2] = game_date
+                if streak[2] is not None:
+                    streaks[api_player_id] = streak
+
+    return streaks
+
+def advance_streaks_from_box_scores(cur, start_date, end_date, workers=DEFAULT_FETCH_WORKERS):
+    """
+    Advances the stored streaks of every batter who played between two dates, from the games' box scores.
+
+    Games are applied in date order, so doubleheaders and missed days are handled like any other game.
+
+    Args:
+        cur (psycopg2.extensions.cursor): The cursor of the open transaction.
+        start_date (datetime.date): The first date to apply.
+        end_date (datetime.date): The last date to apply.
+        workers (int): The maximum number of box score requests in flight at once.
+
+    Returns:
+        dict: A dictionary mapping each api_player_id who batted to its [current_streak, longest_streak, last_game_date].
+    """
+    games = fetch_final_games(start_date, end_date)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        box_scores = list(executor.map(fetch_box_score, [game_pk for _, game_pk in games]))
+
+    lines_by_game = [(date.fromisoformat(game_date), batting_lines(box_score))
+                     for (game_date, _), box_score in zip(games, box_scores)]
+    batters = list({api_player_id for _, lines in lines_by_game for api_player_id in lines})
+
+    cur.execute(STREAKS_QUERY, (batters,))
+    streaks = {api_player_id: [current, longest, last_game_date]
+               for api_player_id, current, longest, last_game_date in cur.fetchall()}
+
+    for game_date, lines in lines_by_game:
+        for api_player_id, (hits, at_bats, sac_flies) in lines.items():
+            streak = streaks.setdefault(api_player_id, [0, 0, None])
+            advance_streak(streak, hits, at_bats, sac_flies)
+            streak[2] = game_date
+
+    return streaks
+
+def write_streaks(cur, streaks):
+    """
+    Upserts streaks into the hitting_streaks table.
+
+    Args:
+        cur (psycopg2.extensions.cursor): The cursor of the open transaction.
+        streaks (dict): A dictionary mapping each api_player_id to its [current_streak, longest_streak, last_game_date].
+    """
+    execute_values(cur, """
+        INSERT INTO hitting_streaks (api_player_id, current_streak, longest_streak, last_game_date)
+        VALUES %s
+        ON CONFLICT (api_player_id) DO UPDATE
+        SET current_streak = EXCLUDED.current_streak,
+            longest_streak = EXCLUDED.longest_streak,
+            last_game_date = EXCLUDED.last_game_date;
+    """, [(api_player_id, *streak) for api_player_id, streak in streaks.items()])
+
+def update_hitting_streaks(workers=DEFAULT_FETCH_WORKERS, through=None):
+    """
+    Brings every batter's current and longest hitting streak up to date through yesterday, or another date.
+
+    The first run of a season backfills the streaks from full game logs. Later runs only apply the
+    box scores of the games finished since the last synced date, and the watermark moves forward in
+    the same transaction as the streaks, so no game is applied twice.
+
+    Args:
+        workers (int): The number of threads sending MLB Stats API requests. Their concurrency and
+                       rate are limited by the shared upstream (see configure_statsapi).
+        through (datetime.date, optional): The last date whose games are applied, once they are all over.
+                                           Defaults to yesterday.
+
+    Returns:
+        bool: True if any streak was updated.
+    """
+    through = through or date.today() - timedelta(days=1)
+
+    try:
+        with transaction() as cur:
+            ensure_schema(cur)
+            synced_through = get_watermark(cur, STREAKS_WATERMARK)
+
+            if synced_through is None or synced_through.year != through.year:
+                cur.execute("DELETE FROM hitting_streaks;")
+                streaks = backfill_streaks(through.year, through, workers)
+                print(f"Backfilled the hitting streaks of {len(streaks)} batters from game logs.")
+            elif synced_through >= through:
+                print(f"Hitting streaks are already synced through {synced_through}.")
+                return False
+            else:
+                streaks = advance_streaks_from_box_scores(cur, synced_through + timedelta(days=1), through, workers)
+                print(f"Advanced the hitting streaks of {len(streaks)} batters since {synced_through}.")
+
+            if streaks:
+                write_streaks(cur, streaks)
+            set_watermark(cur, STREAKS_WATERMARK, through)
+    except Exception as e:
+        print(f"Error updating hitting streaks: {e}")
+        return False
+
+    return bool(streaks)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Updates every batter's hitting streaks from the latest box scores.")
+    parser.add_argument('--workers', type=int, default=DEFAULT_FETCH_WORKERS,
+                        help='maximum number of MLB Stats API requests in flight at once')
+    parser.add_argument('--requests-per-second', type=float, default=DEFAULT_REQUESTS_PER_SECOND,
+                        help='maximum number of MLB Stats API requests started per second (0 for no limit)')
+    args = parser.parse_args()
+
+    configure_statsapi(args.workers, args.requests_per_second)
+    update_hitting_streaks(args.workers)
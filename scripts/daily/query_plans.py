@@ -0,0 +1,93 @@
+import argparse
+import sys
+import os
+
+# Add the project root directory to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from scripts.common.db import transaction
+from scripts.common.schema import ensure_schema
+from scripts.daily.hitting_streaks import STREAKS_QUERY
+from scripts.daily.scoring import AFFECTED_MEMBERS_QUERY, LEADERBOARD_PAGE_QUERY, MEMBER_STANDINGS_QUERY
+from scripts.daily.stat_collection import (APPLY_HITTER_STATS_QUERY, APPLY_PITCHER_STATS_QUERY, HITTER_STATS_STAGE,
+                                           PITCHER_STATS_STAGE, PLAYER_IDS_QUERY)
+from scripts.service.leaderboard_service import MEMBER_PICKS_QUERY
+from scripts.yearly.populate_players import INSERT_PICKED_PLAYERS_QUERY
+
+# Plan nodes that read a table through an index
+INDEX_SCANS = ('Index Scan', 'Index Only Scan', 'Bitmap Heap Scan')
+
+# Plan node that reads the rows from the index alone, for queries that read a whole table
+INDEX_ONLY_SCANS = ('Index Only Scan',)
+
+# Hot queries of the jobs, as the jobs run them: (name, setup, query, parameters, the plan nodes each
+# table may be read with). The setup statement, if any, creates what the query reads besides the schema.
+PLAN_CHECKS = [
+    ('load_player_ids', None, PLAYER_IDS_QUERY, ('hitter',), {'players': INDEX_SCANS}),
+    ('populate_players', None, INSERT_PICKED_PLAYERS_QUERY, None, {'picks': INDEX_ONLY_SCANS}),
+    ('write_hitter_stats', HITTER_STATS_STAGE, APPLY_HITTER_STATS_QUERY, None, {'hitters': INDEX_SCANS}),
+    ('write_pitcher_stats', PITCHER_STATS_STAGE, APPLY_PITCHER_STATS_QUERY, None, {'pitchers': INDEX_SCANS}),
+    ('affected_members', None, AFFECTED_MEMBERS_QUERY, ([1, 2],), {'players': INDEX_SCANS, 'picks': INDEX_SCANS}),
+    ('backfill_streaks', None, STREAKS_QUERY, ([1, 2],), {'hitting_streaks': INDEX_SCANS}),
+    ('get_leaderboard', None, LEADERBOARD_PAGE_QUERY, ('batters', 10), {'leaderboards': INDEX_SCANS}),
+    ('get_member_standings', None, MEMBER_STANDINGS_QUERY, (1,), {'leaderboards': INDEX_SCANS}),
+    ('member_picks', None, MEMBER_PICKS_QUERY, (1,), {'picks': INDEX_SCANS}),
+]
+
+
+def _scans(plan):
+    """
+    Yields the (table, node type, conditioned) of every plan node that reads a table, including nested
+    plans. Conditioned is whether the node only reads the rows matching a condition on the index,
+    rather than the whole index; index-only scans count, as they never read the table.
+    """
+    if 'Relation Name' in plan and plan['Node Type'] != 'ModifyTable':
+        conditioned = plan['Node Type'] == 'Index Only Scan' or 'Index Cond' in plan or 'Recheck Cond' in plan
+        yield plan['Relation Name'], plan['Node Type'], conditioned
+    for child in plan.get('Plans', []):
+        yield from _scans(child)
+
+
+def check_query_plans(cur):
+    """
+    Checks that every query of PLAN_CHECKS reads its tables with the plan nodes the check accepts.
+
+    Sequential scans, hash joins and merge joins are disabled while planning, so the check does not
+    depend on the size of the tables: a table is only read sequentially, or through a whole index, if
+    no index can serve the query or its joins. The queries are explained, not run.
+
+    Args:
+        cur (psycopg2.extensions.cursor): The cursor of the open transaction.
+
+    Returns:
+        list: A (name, table, node_type) tuple per table read otherwise. Empty if every query reads its tables
+            as expected.
+    """
+    cur.execute("SET LOCAL enable_seqscan = off; SET LOCAL enable_hashjoin = off; SET LOCAL enable_mergejoin = off;")
+    failures = []
+    for name, setup, query, params, accepted in PLAN_CHECKS:
+        if setup is not None:
+            cur.execute(setup)
+        cur.execute(f"EXPLAIN (FORMAT JSON) {query}", params)
+        plan = cur.fetchone()[0][0]['Plan']
+        for table, node_type, conditioned in _scans(plan):
+            if table in accepted and (node_type not in accepted[table] or not conditioned):
+                failures.append((name, table, node_type if conditioned else f'unconditioned {node_type}'))
+    cur.execute("RESET enable_seqscan; RESET enable_hashjoin; RESET enable_mergejoin;")
+    return failures
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Checks that the hot job queries read their tables through an index, after migrating the schema.')
+    parser.parse_args()
+
+    with transaction() as cur:
+        ensure_schema(cur)
+        failures = check_query_plans(cur)
+
+    for name, table, node_type in failures:
+        print(f"{name} reads {table} with a {node_type}.")
+    if failures:
+        sys.exit(1)
+    print(f"All {len(PLAN_CHECKS)} job queries use an index.")
@@ -0,0 +1,592 @@
+import argparse
+import bisect
+import math
+import sys
+import os
+from datetime import date
+
+from psycopg2.extras import execute_values
+
+# Add the project root directory to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from scripts.common.db import notify_data_changed, transaction
+from scripts.common.metrics import timer
+from scripts.common.schema import ensure_schema
+from scripts.common.upstream import statsapi_get
+from scripts.daily.stats_history import HITTERS_AS_OF, PITCHERS_AS_OF
+
+# Plate appearances per team game a batter needs to qualify, as for the MLB batting title
+PLATE_APPEARANCES_PER_TEAM_GAME = 3.1
+
+# Whether a higher score ranks first, for each contest (category name)
+CONTEST_DESCENDING = {
+    'batters': True,
+    'alternate_batters': True,
+    'pitchers': True,
+    'home_run_hitters': True,
+    'rbi_champion': False,
+    'stolen_base_champion': False,
+    'dimaggio': False,
+}
+
+def _numeric(expression):
+    """
+    Casts a stat column to numeric, turning values the API sends for "no stat yet" (such as ".---") into NULL.
+    """
+    return f"CASE WHEN ({expression})::text ~ '^-?[0-9]*\\.?[0-9]+$' THEN ({expression})::numeric END"
+
+def pick_stats_query(hitters, pitchers):
+    """
+    Returns the stats of every pick, one row per pick. Picks of players we have no stats for have NULL stats.
+
+    Args:
+        hitters (str): The table or subquery hitter stats are read from.
+        pitchers (str): The table or subquery pitcher stats are read from.
+    """
+    return f"""
+    SELECT
+        pk.user_id,
+        pk.category_id,
+        c.name AS category,
+        pk.pick_order::integer AS pick_order,
+        {_numeric('pk.pick_value')} AS pick_value,
+        {_numeric('h.average')} AS average,
+        COALESCE({_numeric('h.plate_appearances')} >= %(qualifying_pa)s, false) AS qualified,
+        {_numeric('h.home_runs')} AS home_runs,
+        {_numeric('h.rbis')} AS rbis,
+        {_numeric('h.stolen_bases')} AS stolen_bases,
+        {_numeric('pt.wins')} AS wins
+    FROM picks pk
+    JOIN categories c ON c.id = pk.category_id
+    LEFT JOIN players p ON p.player_name = pk.player_name
+    LEFT JOIN {hitters} h ON h.player_id = p.id
+    LEFT JOIN {pitchers} pt ON pt.player_id = p.id
+    WHERE %(user_ids)s IS NULL OR pk.user_id = ANY(%(user_ids)s)
+"""
+
+def leaders_query(hitters, league_leaders=True):
+    """
+    Returns the actual season totals the closeness contests are measured against.
+
+    The RBI and stolen base leaders are the MLB leaders stored by store_league_leaders, or the
+    best of the hitters we track if one of them has a higher total, as before the first fetch.
+
+    Args:
+        hitters (str): The table or subquery hitter stats are read from.
+        league_leaders (bool): Whether to read the stored MLB leaders. Without them, the leaders are
+                               taken among the hitters we track only.
+    """
+    def leader(stat):
+        tracked = f"(SELECT max({_numeric(stat)}) FROM {hitters} h)"
+        if not league_leaders:
+            return tracked
+        return f"GREATEST((SELECT total FROM league_leaders WHERE stat = '{stat}'), {tracked})"
+
+    return f"""
+    SELECT
+        {leader('rbis')} AS rbis,
+        {leader('stolen_bases')} AS stolen_bases,
+        (SELECT max(longest_streak) FROM hitting_streaks) AS longest_streak
+"""
+
+# One row per (contest, member): score, tiebreak and rank within the contest.
+# With user_ids set, only those members are scored, and their ranks are only relative to each other.
+#  - batters: average batting average of the ten batters; batters short of the plate appearance
+#    qualification are replaced by the member's qualified alternates, in pick order
+#  - alternate_batters: average batting average of the qualified alternates
+#  - pitchers: total wins
+#  - home_run_hitters: total home runs
+#  - rbi_champion / stolen_base_champion: distance between the ballot number and the league leader's
+#    total, ties broken by the picked player's own total
+#  - dimaggio: distance between the ballot number and the season's longest hitting streak
+def leaderboard_query(hitters='hitters', pitchers='pitchers', league_leaders=True):
+    """
+    Returns the leaderboard query, reading player stats from the given tables or subqueries.
+
+    League leaders are used as in leaders_query.
+    """
+    return f"""
+    WITH pick_stats AS ({pick_stats_query(hitters, pitchers)}),
+    leaders AS ({leaders_query(hitters, league_leaders)}),
+    substitutes_needed AS (
+        SELECT user_id, count(*) FILTER (WHERE NOT qualified) AS needed
+        FROM pick_stats
+        WHERE category = 'batters'
+        GROUP BY user_id
+    ),
+    qualified_alternates AS (
+        SELECT user_id, average, row_number() OVER (PARTITION BY user_id ORDER BY pick_order) AS n
+        FROM pick_stats
+        WHERE category = 'alternate_batters' AND qualified
+    ),
+    counting_batters AS (
+        SELECT user_id, average FROM pick_stats WHERE category = 'batters' AND qualified
+        UNION ALL
+        SELECT a.user_id, a.average
+        FROM qualified_alternates a
+        JOIN substitutes_needed s ON s.user_id = a.user_id
+        WHERE a.n <= s.needed
+    ),
+    scores AS (
+        SELECT c.id AS category_id, s.user_id, avg(b.average) AS score, NULL::numeric AS tiebreak
+        FROM substitutes_needed s
+        JOIN categories c ON c.name = 'batters'
+        LEFT JOIN counting_batters b ON b.user_id = s.user_id
+        GROUP BY c.id, s.user_id
+
+        UNION ALL
+        SELECT category_id, user_id, avg(average) FILTER (WHERE qualified), NULL
+        FROM pick_stats WHERE category = 'alternate_batters'
+        GROUP BY category_id, user_id
+
+        UNION ALL
+        SELECT category_id, user_id, sum(wins), NULL
+        FROM pick_stats WHERE category = 'pitchers'
+        GROUP BY category_id, user_id
+
+        UNION ALL
+        SELECT category_id, user_id, sum(home_runs), NULL
+        FROM pick_stats WHERE category = 'home_run_hitters'
+        GROUP BY category_id, user_id
+
+        UNION ALL
+        SELECT p.category_id, p.user_id, min(abs(p.pick_value - l.rbis)), max(p.rbis)
+        FROM pick_stats p, leaders l WHERE p.category = 'rbi_champion'
+        GROUP BY p.category_id, p.user_id
+
+        UNION ALL
+        SELECT p.category_id, p.user_id, min(abs(p.pick_value - l.stolen_bases)), max(p.stolen_bases)
+        FROM pick_stats p, leaders l WHERE p.category = 'stolen_base_champion'
+        GROUP BY p.category_id, p.user_id
+
+        UNION ALL
+        SELECT p.category_id, p.user_id, min(abs(p.pick_value - l.longest_streak)), NULL
+        FROM pick_stats p, leaders l WHERE p.category = 'dimaggio'
+        GROUP BY p.category_id, p.user_id
+    )
+    SELECT
+        s.category_id,
+        s.user_id,
+        s.score,
+        s.tiebreak,
+        rank() OVER (
+            PARTITION BY s.category_id
+            ORDER BY CASE WHEN c.name = ANY(%(descending)s) THEN -s.score ELSE s.score END ASC NULLS LAST,
+                     s.tiebreak DESC NULLS LAST
+        )::integer AS rank
+    FROM scores s
+    JOIN categories c ON c.id = s.category_id
+    WHERE c.name = ANY(%(categories)s)
+"""
+
+LEADERBOARD_QUERY = leaderboard_query()
+
+# The leaderboard query on the stats recorded in the stats history as of %(as_of)s. Only the current
+# league leaders are stored, so the leaders of that date are taken among the hitters we track.
+LEADERBOARD_AS_OF_QUERY = leaderboard_query(HITTERS_AS_OF, PITCHERS_AS_OF, league_leaders=False)
+
+# MLB Stats API stat of each league leader stored, by hitters column
+LEAGUE_LEADER_STATS = {
+    'rbis': 'rbi',
+    'stolen_bases': 'stolenBases',
+}
+
+# Contests scored against a league-wide total, so a change to any hitter can move every member
+CLOSENESS_CONTESTS = ('rbi_champion', 'stolen_base_champion', 'dimaggio')
+
+# Contests that only count qualified batters, so a change of the plate appearance qualification can move every member
+QUALIFYING_CONTESTS = ('batters', 'alternate_batters')
+
+# Members whose picks include any of the given players, through the picks.player_name index
+AFFECTED_MEMBERS_QUERY = """
+    SELECT DISTINCT pk.user_id
+    FROM players p
+    JOIN picks pk ON pk.player_name = p.player_name
+    WHERE p.id = ANY(%s);
+"""
+
+# The top of one contest's standings, by category name
+LEADERBOARD_PAGE_QUERY = """
+    SELECT l.rank, l.user_id, u.name, l.score, l.tiebreak
+    FROM leaderboards l
+    LEFT JOIN users u ON u.mbr_id = l.user_id
+    WHERE l.category_id = (SELECT id FROM categories WHERE name = %s)
+    ORDER BY l.rank, l.user_id
+    LIMIT %s;
+"""
+
+# A member's standing in every contest
+MEMBER_STANDINGS_QUERY = """
+    SELECT c.name, l.rank, l.score, l.tiebreak
+    FROM leaderboards l
+    JOIN categories c ON c.id = l.category_id
+    WHERE l.user_id = %s
+    ORDER BY c.id;
+"""
+
+def _query_params(qualifying_pa, user_ids=None, categories=None):
+    return {
+        'qualifying_pa': qualifying_pa,
+        'descending': [name for name, descending in CONTEST_DESCENDING.items() if descending],
+        'user_ids': user_ids,
+        'categories': list(categories or CONTEST_DESCENDING),
+    }
+
+def sort_key(score, tiebreak, descending):
+    """
+    Orders leaderboard rows the same way the rank() in LEADERBOARD_QUERY does: best first, NULL scores last.
+    """
+    return (
+        score is None,
+        0 if score is None else (-score if descending else score),
+        tiebreak is None,
+        0 if tiebreak is None else -tiebreak,
+    )
+
+class RankedLeaderboard:
+    """
+    One contest's standings, kept sorted so a member's score can change without re-sorting everyone.
+
+    The sort keys of all members are kept in a sorted list. Changing a score removes the old key and
+    inserts the new one by bisection, and a member's rank is the number of strictly better keys plus one,
+    so tied members share a rank like SQL's rank().
+
+    Args:
+        descending (bool): Whether a higher score ranks first.
+    """
+
+    def __init__(self, descending):
+        self.descending = descending
+        self.entries = {}
+        self.keys = []
+
+    def set_score(self, user_id, score, tiebreak):
+        """
+        Adds a member or changes its score.
+
+        Returns:
+            bool: True if the member's score or tiebreak changed.
+        """
+        key = sort_key(score, tiebreak, self.descending)
+        previous = self.entries.get(user_id)
+        if previous is not None:
+            if previous == (score, tiebreak):
+                return False
+            old_key = sort_key(*previous, self.descending)
+            del self.keys[bisect.bisect_left(self.keys, old_key)]
+
+        self.entries[user_id] = (score, tiebreak)
+        bisect.insort(self.keys, key)
+        return True
+
+    def rank(self, user_id):
+        """
+        Returns a member's current rank.
+        """
+        return bisect.bisect_left(self.keys, sort_key(*self.entries[user_id], self.descending)) + 1
+
+
+def fetch_qualifying_plate_appearances(season=None, as_of=None):
+    """
+    Computes the plate appearances a batter needs to qualify so far this season.
+
+    Args:
+        season (int, optional): The season. Defaults to the year of as_of, or the current year.
+        as_of (datetime.date, optional): The date of the standings used. Defaults to today.
+
+    Returns:
+        int: PLATE_APPEARANCES_PER_TEAM_GAME times the most games any MLB team has played, rounded down.
+    """
+    params = {'leagueId': '103,104', 'season': season or (as_of or date.today()).year}
+    if as_of is not None:
+        params['date'] = as_of.strftime('%m/%d/%Y')
+    standings = statsapi_get('standings', params)
+    games_played = [team['gamesPlayed'] for record in standings.get('records', []) for team in record['teamRecords']]
+    return math.floor(PLATE_APPEARANCES_PER_TEAM_GAME * max(games_played, default=0))
+
+def fetch_league_leaders(season=None):
+    """
+    Fetches the totals of the season's MLB leaders in the stats of LEAGUE_LEADER_STATS.
+
+    Each leader is one 'stats' request sorted by the stat, among every player rather than the
+    qualified ones only. Responses are not cached, as the leaders change with every game.
+
+    Args:
+        season (int, optional): The season. Defaults to the current year.
+
+    Returns:
+        dict: A dictionary mapping each hitters column of LEAGUE_LEADER_STATS to the leader's total,
+              or to None before any player has one.
+    """
+    leaders = {}
+    for stat, api_stat in LEAGUE_LEADER_STATS.items():
+        response = statsapi_get('stats', {
+            'stats': 'season',
+            'group': 'hitting',
+            'season': season or date.today().year,
+            'sportIds': 1,
+            'playerPool': 'ALL',
+            'sortStat': api_stat,
+            'order': 'desc',
+            'limit': 1,
+        }, cache=False)
+        splits = [split for stats in response.get('stats', []) for split in stats.get('splits', [])]
+        leaders[stat] = splits[0]['stat'].get(api_stat) if splits else None
+    return leaders
+
+def store_league_leaders(cur, leaders):
+    """
+    Stores the league leaders the closeness contests are measured against.
+
+    Args:
+        cur (psycopg2.extensions.cursor): The cursor of the open transaction.
+        leaders (dict): The totals returned by fetch_league_leaders. Stats without a leader keep their stored total.
+    """
+    ensure_schema(cur)
+    rows = [(stat, total) for stat, total in leaders.items() if total is not None]
+    if rows:
+        execute_values(cur, """
+            INSERT INTO league_leaders (stat, total) VALUES %s
+            ON CONFLICT (stat) DO UPDATE SET total = EXCLUDED.total, updated_at = now();
+        """, rows)
+
+def refresh_leaderboards(cur, qualifying_pa):
+    """
+    Recomputes every member's score and rank in every contest.
+
+    The leaderboards table is replaced on the caller's cursor, so readers keep seeing the previous
+    standings until the caller's transaction commits.
+
+    Args:
+        cur (psycopg2.extensions.cursor): The cursor of the open transaction.
+        qualifying_pa (int): The plate appearances a batter needs to count in the batters contests.
+
+    Returns:
+        int: The number of leaderboard rows written.
+    """
+    ensure_schema(cur)
+    cur.execute("DELETE FROM leaderboards;")
+    cur.execute(f"""
+        INSERT INTO leaderboards (category_id, user_id, score, tiebreak, rank)
+        {LEADERBOARD_QUERY};
+    """, _query_params(qualifying_pa))
+    rows = cur.rowcount
+    _log_refresh(cur, qualifying_pa, rows, True)
+    return rows
+
+def _log_refresh(cur, qualifying_pa, rows, full_refresh):
+    cur.execute("""
+        INSERT INTO leaderboard_refreshes (qualifying_pa, rows_written, full_refresh)
+        VALUES (%s, %s, %s);
+    """, (qualifying_pa, rows, full_refresh))
+
+def refresh_leaderboards_incrementally(cur, changed_player_ids, qualifying_pa):
+    """
+    Recomputes only the leaderboard rows that changed players can affect, and re-ranks incrementally.
+
+    Members who picked a changed player are rescored in every contest. The closeness contests are
+    rescored for everyone, since their target is a league-wide total (such as the longest hitting
+    streak) that can move without any picked player changing, and they hold one pick per member.
+    So are the batters contests when the plate appearance qualification changed since the last
+    refresh, since that can change any batter's standing. Only the contests where a rescored score
+    moved are loaded and re-ranked, in a RankedLeaderboard each, and only rows whose score or rank
+    moved are written.
+
+    A full refresh is done instead when the leaderboards have never been refreshed.
+
+    Args:
+        cur (psycopg2.extensions.cursor): The cursor of the open transaction.
+        changed_player_ids (list): The players.id of every player whose stats changed.
+        qualifying_pa (int): The plate appearances a batter needs to count in the batters contests.
+
+    Returns:
+        int: The number of leaderboard rows written.
+    """
+    ensure_schema(cur)
+    cur.execute("SELECT qualifying_pa FROM leaderboard_refreshes ORDER BY refreshed_at DESC LIMIT 1;")
+    last_refresh = cur.fetchone()
+    if last_refresh is None:
+        return refresh_leaderboards(cur, qualifying_pa)
+
+    # Contests every member is rescored in
+    contests = CLOSENESS_CONTESTS
+    if last_refresh[0] != qualifying_pa:
+        contests += QUALIFYING_CONTESTS
+
+    affected_users = []
+    if changed_player_ids:
+        cur.execute(AFFECTED_MEMBERS_QUERY, (list(changed_player_ids),))
+        affected_users = [user_id for user_id, in cur.fetchall()]
+
+    # Rescore the affected members in every contest, and everyone in those contests
+    rescored = []
+    if affected_users:
+        cur.execute(LEADERBOARD_QUERY, _query_params(qualifying_pa, affected_users))
+        rescored += cur.fetchall()
+    cur.execute(LEADERBOARD_QUERY, _query_params(qualifying_pa, categories=contests))
+    rescored += cur.fetchall()
+
+    # Find the contests where a rescored score moved; the others keep their standings as they are
+    cur.execute("""
+        SELECT l.category_id, l.user_id, l.score, l.tiebreak
+        FROM leaderboards l
+        JOIN categories c ON c.id = l.category_id
+        WHERE c.name = ANY(%s) OR l.user_id = ANY(%s);
+    """, (list(contests), affected_users))
+    previous = {(category_id, user_id): (score, tiebreak) for category_id, user_id, score, tiebreak in cur.fetchall()}
+    moved = sorted({category_id for category_id, user_id, score, tiebreak, _ in rescored
+                    if previous.get((category_id, user_id)) != (score, tiebreak)})
+
+    # Load the current standings of those contests
+    boards = {}
+    stored = {}
+    if moved:
+        cur.execute("SELECT id, name FROM categories WHERE id = ANY(%s);", (moved,))
+        boards = {category_id: RankedLeaderboard(CONTEST_DESCENDING[name]) for category_id, name in cur.fetchall()}
+        cur.execute("""
+            SELECT category_id, user_id, score, tiebreak, rank
+            FROM leaderboards
+            WHERE category_id = ANY(%s);
+        """, (moved,))
+        for category_id, user_id, score, tiebreak, rank in cur.fetchall():
+            boards[category_id].set_score(user_id, score, tiebreak)
+            stored[(category_id, user_id)] = (score, tiebreak, rank)
+
+    for category_id, user_id, score, tiebreak, _ in rescored:
+        if category_id in boards:
+            boards[category_id].set_score(user_id, score, tiebreak)
+
+    # Write the rows whose score or rank moved
+    rows = []
+    for category_id, board in boards.items():
+        for user_id, (score, tiebreak) in board.entries.items():
+            rank = board.rank(user_id)
+            if stored.get((category_id, user_id)) != (score, tiebreak, rank):
+                rows.append((category_id, user_id, score, tiebreak, rank))
+
+    if rows:
+        execute_values(cur, """
+            INSERT INTO leaderboards (category_id, user_id, score, tiebreak, rank)
+            VALUES %s
+            ON CONFLICT (category_id, user_id) DO UPDATE
+            SET score = EXCLUDED.score, tiebreak = EXCLUDED.tiebreak, rank = EXCLUDED.rank;
+        """, rows)
+    _log_refresh(cur, qualifying_pa, len(rows), False)
+    return len(rows)
+
+def update_leaderboards(changed_player_ids=None, qualifying_pa=None):
+    """
+    Recomputes the leaderboards in their own transaction, after the player stats are updated.
+
+    The MLB leaders the RBI and stolen base contests are measured against are fetched and stored first.
+
+    Listeners of DATA_CHANGED_CHANNEL are notified when any row changed.
+
+    Args:
+        changed_player_ids (list, optional): The players.id of every player whose stats changed.
+                                             Only the standings they affect are recomputed.
+                                             Defaults to recomputing every leaderboard.
+        qualifying_pa (int, optional): The plate appearances a batter needs to qualify.
+                                       Defaults to the value for the games played so far this season.
+    """
+    try:
+        if qualifying_pa is None:
+            qualifying_pa = fetch_qualifying_plate_appearances()
+        leaders = fetch_league_leaders()
+        with transaction() as cur, timer('scoring'):
+            store_league_leaders(cur, leaders)
+            if changed_player_ids is None:
+                rows = refresh_leaderboards(cur, qualifying_pa)
+            else:
+                rows = refresh_leaderboards_incrementally(cur, changed_player_ids, qualifying_pa)
+            if rows:
+                notify_data_changed(cur, 'leaderboards')
+        print(f"Refreshed {rows} leaderboard rows (qualifying plate appearances: {qualifying_pa}).")
+    except Exception as e:
+        print(f"Error refreshing leaderboards: {e}")
+
+def get_leaderboard(cur, category, limit=None):
+    """
+    Reads the standings of one contest.
+
+    Args:
+        cur (psycopg2.extensions.cursor): A database cursor.
+        category (str): The contest's category name, such as 'batters'.
+        limit (int, optional): The number of members to return. Defaults to all of them.
+
+    Returns:
+        list: A list of (rank, user_id, name, score, tiebreak) tuples in rank order.
+    """
+    cur.execute(LEADERBOARD_PAGE_QUERY, (category, limit))
+    return cur.fetchall()
+
+def get_leaderboard_as_of(cur, category, as_of, qualifying_pa, limit=None):
+    """
+    Computes the standings of one contest on a past date, from the stats history.
+
+    Hitting streaks have no history, so the DiMaggio contest is always scored on the current streaks,
+    and only the current MLB leaders are stored, so the RBI and stolen base contests are measured
+    against the best totals among the hitters we track on that date.
+
+    Args:
+        cur (psycopg2.extensions.cursor): A database cursor.
+        category (str): The contest's category name, such as 'batters'.
+        as_of (datetime.date): The date whose stats are scored.
+        qualifying_pa (int): The plate appearances a batter needed to qualify on that date.
+        limit (int, optional): The number of members to return. Defaults to all of them.
+
+    Returns:
+        list: A list of (rank, user_id, name, score, tiebreak) tuples in rank order.
+    """
+    ensure_schema(cur)
+    params = _query_params(qualifying_pa, categories=[category])
+    params.update(as_of=as_of, limit=limit)
+    cur.execute(f"""
+        SELECT l.rank, l.user_id, u.name, l.score, l.tiebreak
+        FROM ({LEADERBOARD_AS_OF_QUERY}) l
+        LEFT JOIN users u ON u.mbr_id = l.user_id
+        ORDER BY l.rank, l.user_id
+        LIMIT %(limit)s;
+    """, params)
+    return cur.fetchall()
+
+def get_member_standings(cur, user_id):
+    """
+    Reads a member's score and rank in every contest.
+
+    Args:
+        cur (psycopg2.extensions.cursor): A database cursor.
+        user_id: The member's mbr_id.
+
+    Returns:
+        list: A list of (category, rank, score, tiebreak) tuples.
+    """
+    cur.execute(MEMBER_STANDINGS_QUERY, (user_id,))
+    return cur.fetchall()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Recomputes the contest leaderboards and prints the leaders.')
+    parser.add_argument('--qualifying-pa', type=int,
+                        help='plate appearances a batter needs to qualify (default: from games played this season)')
+    parser.add_argument('--top', type=int, default=10, help='number of members printed per contest')
+    parser.add_argument('--as-of', type=date.fromisoformat,
+                        help='print the leaderboards of a past date from the stats history (YYYY-MM-DD)')
+    args = parser.parse_args()
+
+    if args.as_of is None:
+        update_leaderboards(qualifying_pa=args.qualifying_pa)
+    else:
+        qualifying_pa = args.qualifying_pa
+        if qualifying_pa is None:
+            qualifying_pa = fetch_qualifying_plate_appearances(as_of=args.as_of)
+
+    with transaction() as cur:
+        for category in CONTEST_DESCENDING:
+            print(f"\n{category}")
+            if args.as_of is None:
+                leaderboard = get_leaderboard(cur, category, args.top)
+            else:
+                leaderboard = get_leaderboard_as_of(cur, category, args.as_of, qualifying_pa, args.top)
+            for rank, user_id, name, score, tiebreak in leaderboard:
+                print(f"  {rank:>4}  {name or user_id}  {score}")
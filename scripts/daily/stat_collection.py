@@ -1,168 +1,481 @@
+import argparse
 import sys
 import os
-import psycopg2
-import statsapi
+from datetime import date, timedelta
+from decimal import Decimal, InvalidOperation
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from psycopg2.extras import execute_values
 
 # Add the project root directory to the Python path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
 
-# Import the database configuration from config.py
-from config.config import DATABASE
+from scripts.common.db import notify_data_changed, transaction
+from scripts.common.metrics import DEFAULT_METRICS_DIR, count, timer, write_run_metrics
+from scripts.common.run_journal import changed_units, finish_run, record_units, start_run
+from scripts.common.statsapi_cache import StatsApiCache
+from scripts.common.upstream import configure_statsapi, statsapi_get
+from scripts.common.watermarks import get_watermark, set_watermark
+from scripts.daily.box_scores import fetch_players_who_appeared
+from scripts.daily.hitting_streaks import update_hitting_streaks
+from scripts.daily.scoring import update_leaderboards
+from scripts.daily.stats_history import record_stats_history
 
-def get_db_connection():
+# Number of players requested per call to the 'people' endpoint
+STATS_BATCH_SIZE = 100
+
+# Concurrency and rate limit for MLB Stats API requests
+DEFAULT_FETCH_WORKERS = 4
+DEFAULT_REQUESTS_PER_SECOND = 10
+
+# Watermark job name for the last date whose games are reflected in the stats tables
+STATS_WATERMARK = 'player_stats'
+
+# Run journal job name; each run is identified by the date it syncs through and its units are players.id
+STATS_JOURNAL = 'player_stats'
+
+# The players.id and api_player_id of every player of a type ('hitter' or 'pitcher') with a known api_player_id
+PLAYER_IDS_QUERY = """
+    SELECT id, api_player_id FROM players WHERE player_type = %s AND api_player_id IS NOT NULL;
+"""
+
+# Staging tables the fetched stats are loaded into, emptied for each batch and dropped at commit
+HITTER_STATS_STAGE = """
+    CREATE TEMP TABLE IF NOT EXISTS hitter_stats_stage ON COMMIT DROP AS
+    SELECT player_id, average, ops, plate_appearances, home_runs, rbis, stolen_bases
+    FROM hitters WITH NO DATA;
+    TRUNCATE hitter_stats_stage;
+"""
+PITCHER_STATS_STAGE = """
+    CREATE TEMP TABLE IF NOT EXISTS pitcher_stats_stage ON COMMIT DROP AS
+    SELECT player_id, wins, losses, era, strikeouts
+    FROM pitchers WITH NO DATA;
+    TRUNCATE pitcher_stats_stage;
+"""
+
+# Applies the staged stats, returning the players whose stats changed
+APPLY_HITTER_STATS_QUERY = """
+    UPDATE hitters h
+    SET average = s.average, ops = s.ops, plate_appearances = s.plate_appearances,
+        home_runs = s.home_runs, rbis = s.rbis, stolen_bases = s.stolen_bases
+    FROM hitter_stats_stage s
+    WHERE h.player_id = s.player_id
+      AND (h.average, h.ops, h.plate_appearances, h.home_runs, h.rbis, h.stolen_bases)
+          IS DISTINCT FROM (s.average, s.ops, s.plate_appearances, s.home_runs, s.rbis, s.stolen_bases)
+    RETURNING h.player_id;
+"""
+APPLY_PITCHER_STATS_QUERY = """
+    UPDATE pitchers p
+    SET wins = s.wins, losses = s.losses, era = s.era, strikeouts = s.strikeouts
+    FROM pitcher_stats_stage s
+    WHERE p.player_id = s.player_id
+      AND (p.wins, p.losses, p.era, p.strikeouts)
+          IS DISTINCT FROM (s.wins, s.losses, s.era, s.strikeouts)
+    RETURNING p.player_id;
+"""
+
+def parse_rate(value):
     """
-    Connects to the PostgreSQL database.
+    Converts a rate stat as sent by the API, such as '.312', to a number.
+
+    Args:
+        value: The stat, as a string or a number.
 
     Returns:
-        psycopg2.extensions.connection: The database connection object.
+        decimal.Decimal: The stat, or None for the placeholders the API sends before a player has one, such as '.---'.
     """
-    conn = psycopg2.connect(
-        dbname=DATABASE['dbname'],
-        user=DATABASE['user'],
-        password=DATABASE['password'],
-        host=DATABASE['host']
-    )
-    return conn
+    try:
+        rate = Decimal(str(value))
+    except InvalidOperation:
+        return None
+    return rate if rate.is_finite() else None
 
-def fetch_hitter_stats(api_player_id):
+def extract_hitter_stats(stats):
     """
-    Fetches hitter stats from the MLB Stats API.
+    Extracts the tracked hitter stats from a season stat line.
 
     Args:
-        api_player_id (int): The player's ID in the MLB Stats API.
+        stats (dict): The 'stat' object of a hitting split from the MLB Stats API.
 
     Returns:
         tuple: A tuple containing the player's average, OPS, plate appearances, home runs, RBIs, and stolen bases.
-               If an error occurs, returns None.
     """
-    try:
-        player_stats = statsapi.player_stat_data(api_player_id, group="hitting", type="season")
-        stats = player_stats['stats'][0]['stats']
-        
-        # Extract relevant stats
-        average = stats.get('avg', 0)
-        ops = stats.get('ops', 0)
-        plate_appearances = stats.get('plateAppearances', 0)
-        home_runs = stats.get('homeRuns', 0)
-        rbis = stats.get('rbi', 0)
-        stolen_bases = stats.get('stolenBases', 0)
-        
-        return average, ops, plate_appearances, home_runs, rbis, stolen_bases
-    except Exception as e:
-        print(f"Error fetching hitter stats for player {api_player_id}: {e}")
-        return None
+    average = parse_rate(stats.get('avg', 0))
+    ops = parse_rate(stats.get('ops', 0))
+    plate_appearances = stats.get('plateAppearances', 0)
+    home_runs = stats.get('homeRuns', 0)
+    rbis = stats.get('rbi', 0)
+    stolen_bases = stats.get('stolenBases', 0)
 
-def fetch_pitcher_stats(api_player_id):
+    return average, ops, plate_appearances, home_runs, rbis, stolen_bases
+
+def extract_pitcher_stats(stats):
     """
-    Fetches pitcher stats from the MLB Stats API.
+    Extracts the tracked pitcher stats from a season stat line.
 
     Args:
-        api_player_id (int): The player's ID in the MLB Stats API.
+        stats (dict): The 'stat' object of a pitching split from the MLB Stats API.
 
     Returns:
         tuple: A tuple containing the player's wins, losses, ERA, and strikeouts.
-               If an error occurs, returns None.
     """
-    try:
-        player_stats = statsapi.player_stat_data(api_player_id, group="pitching", type="season")
-        stats = player_stats['stats'][0]['stats']
-        
-        # Extract relevant stats
-        wins = stats.get('wins', 0)
-        losses = stats.get('losses', 0)
-        era = stats.get('era', 0)
-        strikeouts = stats.get('strikeOuts', 0)
-        
-        return wins, losses, era, strikeouts
-    except Exception as e:
-        print(f"Error fetching pitcher stats for player {api_player_id}: {e}")
-        return None
+    wins = stats.get('wins', 0)
+    losses = stats.get('losses', 0)
+    era = parse_rate(stats.get('era', 0))
+    strikeouts = stats.get('strikeOuts', 0)
 
-def update_hitter_stats(player_id, stats):
+    return wins, losses, era, strikeouts
+
+# Stat tuple extractor for each stat group
+STAT_EXTRACTORS = {
+    'hitting': extract_hitter_stats,
+    'pitching': extract_pitcher_stats,
+}
+
+def chunk_player_ids(api_player_ids, batch_size=STATS_BATCH_SIZE):
     """
-    Updates the hitter stats in the database.
+    Splits player IDs into the chunks sent in a single 'people' request.
 
     Args:
-        player_id (int): The ID of the player in the database.
-        stats (tuple): A tuple containing the player's average, OPS, plate appearances, home runs, RBIs, and stolen bases.
+        api_player_ids (iterable): The players' IDs in the MLB Stats API.
+        batch_size (int): The maximum number of players per chunk.
+
+    Returns:
+        list: A list of dictionaries, one per chunk, mapping each ID as sent in the request
+              to the api_player_id as passed in.
     """
-    conn = get_db_connection()
-    cur = conn.cursor()
+    requested = [(str(api_player_id), api_player_id) for api_player_id in api_player_ids]
+    return [dict(requested[start:start + batch_size]) for start in range(0, len(requested), batch_size)]
 
-    try:
-        cur.execute("""
-            UPDATE hitters
-            SET average = %s, ops = %s, plate_appearances = %s, home_runs = %s, rbis = %s, stolen_bases = %s
-            WHERE player_id = %s;
-        """, (stats[0], stats[1], stats[2], stats[3], stats[4], stats[5], player_id))
+def fetch_season_stats_chunk(chunk, group):
+    """
+    Fetches season stats for one chunk of players with a single 'people' request.
 
-        conn.commit()
-    except Exception as e:
-        print(f"Error updating hitter stats for player {player_id}: {e}")
-    finally:
-        cur.close()
-        conn.close()
+    Args:
+        chunk (dict): A chunk as returned by chunk_player_ids.
+        group (str): The stat group to fetch, either 'hitting' or 'pitching'.
 
-def update_pitcher_stats(player_id, stats):
+    Returns:
+        dict: A dictionary mapping each api_player_id, as passed in, to the 'stat' object of its first season split.
+              Players without stats for the group are left out.
+
+    Raises:
+        Exception: If the request still fails after the upstream's retries, so that no player is dropped silently.
     """
-    Updates the pitcher stats in the database.
+    response = statsapi_get('people', {
+        'personIds': ','.join(chunk),
+        'hydrate': f'stats(group=[{group}],type=[season],sportId=1)',
+    })
+
+    season_stats = {}
+    for person in response.get('people', []):
+        for stat_group in person.get('stats', []):
+            # The first season split, as statsapi.player_stat_data reports for a single player
+            if stat_group['group']['displayName'] == group and stat_group['splits']:
+                season_stats[chunk[str(person['id'])]] = stat_group['splits'][0]['stat']
+                break
+
+    return season_stats
+
+def iter_season_stats(player_ids_by_group, workers=DEFAULT_FETCH_WORKERS, batch_size=STATS_BATCH_SIZE):
+    """
+    Fetches season stats for several stat groups concurrently and yields them as chunks complete.
+
+    The chunks of every group share one thread pool, so hitters and pitchers are fetched at the
+    same time. Requests go through the shared MLB Stats API upstream (see configure_statsapi),
+    whose adaptive limits keep the run as fast as the API allows.
 
     Args:
-        player_id (int): The ID of the player in the database.
-        stats (tuple): A tuple containing the player's wins, losses, ERA, and strikeouts.
+        player_ids_by_group (dict): A dictionary mapping 'hitting' and/or 'pitching' to the players' IDs in the MLB Stats API.
+        workers (int): The number of threads sending requests.
+        batch_size (int): The maximum number of players per request.
+
+    Yields:
+        tuple: A (group, stats) pair per completed chunk, where stats maps each api_player_id to the tuple
+               returned by extract_hitter_stats or extract_pitcher_stats.
     """
-    conn = get_db_connection()
-    cur = conn.cursor()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {}
+        for group, api_player_ids in player_ids_by_group.items():
+            for chunk in chunk_player_ids(api_player_ids, batch_size):
+                futures[executor.submit(fetch_season_stats_chunk, chunk, group)] = group
 
-    try:
-        cur.execute("""
-            UPDATE pitchers
-            SET wins = %s, losses = %s, era = %s, strikeouts = %s
-            WHERE player_id = %s;
-        """, (stats[0], stats[1], stats[2], stats[3], player_id))
+        for future in as_completed(futures):
+            group = futures[future]
+            extract = STAT_EXTRACTORS[group]
+            with timer('stat_extraction'):
+                stats = {api_player_id: extract(stats) for api_player_id, stats in future.result().items()}
+            yield group, stats
 
-        conn.commit()
-    except Exception as e:
-        print(f"Error updating pitcher stats for player {player_id}: {e}")
-    finally:
-        cur.close()
-        conn.close()
+def write_hitter_stats(cur, rows):
+    """
+    Writes hitter stats for many players with one set-based update.
+
+    The rows are loaded into a temporary staging table and applied with a single UPDATE ... FROM,
+    on the caller's cursor, so they are committed or rolled back together with the rest of the
+    caller's transaction.
+
+    Args:
+        cur (psycopg2.extensions.cursor): The cursor of the open transaction.
+        rows (list): A list of (player_id, stats) pairs, where stats is the tuple returned by extract_hitter_stats.
+
+    Returns:
+        list: The IDs of the players whose stats changed.
+    """
+    if not rows:
+        return []
+
+    cur.execute(HITTER_STATS_STAGE)
+    execute_values(cur, """
+        INSERT INTO hitter_stats_stage (player_id, average, ops, plate_appearances, home_runs, rbis, stolen_bases)
+        VALUES %s;
+    """, [(player_id, *stats) for player_id, stats in rows], page_size=len(rows))
+    cur.execute(APPLY_HITTER_STATS_QUERY)
+    return [player_id for player_id, in cur.fetchall()]
+
+def write_pitcher_stats(cur, rows):
+    """
+    Writes pitcher stats for many players with one set-based update.
+
+    Works like write_hitter_stats, on the pitchers table.
+
+    Args:
+        cur (psycopg2.extensions.cursor): The cursor of the open transaction.
+        rows (list): A list of (player_id, stats) pairs, where stats is the tuple returned by extract_pitcher_stats.
+
+    Returns:
+        list: The IDs of the players whose stats changed.
+    """
+    if not rows:
+        return []
+
+    cur.execute(PITCHER_STATS_STAGE)
+    execute_values(cur, """
+        INSERT INTO pitcher_stats_stage (player_id, wins, losses, era, strikeouts)
+        VALUES %s;
+    """, [(player_id, *stats) for player_id, stats in rows], page_size=len(rows))
+    cur.execute(APPLY_PITCHER_STATS_QUERY)
+    return [player_id for player_id, in cur.fetchall()]
 
-def update_player_stats():
+def load_player_ids(cur):
+    """
+    Reads the MLB Stats API IDs of every hitter and pitcher.
+
+    Args:
+        cur (psycopg2.extensions.cursor): A database cursor.
+
+    Returns:
+        tuple: A (hitters, pitchers) pair of dictionaries mapping each api_player_id to its players.id.
+    """
+    cur.execute(PLAYER_IDS_QUERY, ('hitter',))
+    hitters = {api_player_id: player_id for player_id, api_player_id in cur.fetchall()}
+
+    cur.execute(PLAYER_IDS_QUERY, ('pitcher',))
+    pitchers = {api_player_id: player_id for player_id, api_player_id in cur.fetchall()}
+
+    return hitters, pitchers
+
+def store_season_stats(hitters, pitchers, workers=DEFAULT_FETCH_WORKERS, batch_size=STATS_BATCH_SIZE, run_id=None):
+    """
+    Fetches the season stats of players and writes each chunk in its own transaction as soon as it arrives.
+
+    Args:
+        hitters (dict): A dictionary mapping the api_player_id of each hitter to refresh to its players.id.
+        pitchers (dict): A dictionary mapping the api_player_id of each pitcher to refresh to its players.id.
+        workers (int): The number of threads sending MLB Stats API requests.
+        batch_size (int): The maximum number of players per MLB Stats API request.
+        run_id (str, optional): The stats run whose journal records each chunk's players, in the chunk's transaction.
+
+    Returns:
+        tuple: A (fetched, changed) pair of dictionaries mapping 'hitting' and 'pitching' to the number of
+               players fetched, and to the players.id of the players whose stats changed.
+    """
+    fetched = {'hitting': 0, 'pitching': 0}
+    changed = {'hitting': [], 'pitching': []}
+    player_ids_by_group = {'hitting': list(hitters), 'pitching': list(pitchers)}
+
+    for group, stats in iter_season_stats(player_ids_by_group, workers, batch_size):
+        player_ids, write = (hitters, write_hitter_stats) if group == 'hitting' else (pitchers, write_pitcher_stats)
+        rows = [(player_ids[api_player_id], player_stats) for api_player_id, player_stats in stats.items()]
+        with transaction() as cur:
+            with timer('db_write'):
+                changed_ids = write(cur, rows)
+            if run_id is not None:
+                record_units(cur, STATS_JOURNAL, run_id, [str(player_id) for player_id, _ in rows],
+                             [str(player_id) for player_id in changed_ids])
+        fetched[group] += len(rows)
+        changed[group] += changed_ids
+        count('players_fetched', len(rows))
+
+    count('players_changed', len(changed['hitting']) + len(changed['pitching']))
+    return fetched, changed
+
+def update_player_stats(workers=DEFAULT_FETCH_WORKERS, requests_per_second=DEFAULT_REQUESTS_PER_SECOND,
+                        batch_size=STATS_BATCH_SIZE, incremental=False, resume=False, statsapi_cache=None):
     """
     Fetches and updates all player stats in the database.
+
+    Stats are fetched concurrently and each completed chunk is written as soon as it arrives, in
+    its own transaction together with a run journal entry for each of its players. A run that dies
+    halfway keeps the chunks it wrote, and with resume the next run only fetches the players left.
+
+    In incremental mode only the players who appeared in a game finished since the last synced
+    date are refreshed. The watermark is advanced to yesterday once every player is written, so
+    days missed by earlier runs are caught up automatically. Without a watermark, all players are refreshed.
+
+    The changed stats of the whole run, earlier attempts included, are then appended to the stats
+    history dated yesterday, the hitting streaks are advanced and the leaderboards of the members
+    who picked a changed player are recomputed.
+
+    Every MLB Stats API request of the run goes through one upstream, retried on timeouts, 429
+    and 5xx responses, with its concurrency and rate adapting below the given maximums. A request
+    that still fails fails the run, rather than leaving its players out. Responses are cached, so
+    calls repeated within the run or by another run the same day are not sent again.
+
+    Args:
+        workers (int): The maximum number of MLB Stats API requests in flight at once.
+        requests_per_second (float): The maximum number of MLB Stats API requests started per second.
+        batch_size (int): The maximum number of players per MLB Stats API request.
+        incremental (bool): Whether to refresh only the players who played since the last run.
+        resume (bool): Whether to skip the players an interrupted run for the same date already refreshed.
+        statsapi_cache (StatsApiCache, optional): The MLB Stats API response cache, such as one recording or
+                                                  replaying the run. Defaults to the live cache.
+
+    Returns:
+        bool: False if the stats could not be updated.
     """
-    conn = get_db_connection()
-    cur = conn.cursor()
+    yesterday = date.today() - timedelta(days=1)
+    run_id = yesterday.isoformat()
+    configure_statsapi(workers, requests_per_second, cache=statsapi_cache)
 
     try:
-        # Fetch all hitters and update their stats
-        cur.execute("""
-            SELECT id, api_player_id FROM players WHERE player_type = 'hitter' AND api_player_id IS NOT NULL;
-        """)
-        hitters = cur.fetchall()
-
-        for player_id, api_player_id in hitters:
-            stats = fetch_hitter_stats(api_player_id)
-            if stats:
-                update_hitter_stats(player_id, stats)
-
-        # Fetch all pitchers and update their stats
-        cur.execute("""
-            SELECT id, api_player_id FROM players WHERE player_type = 'pitcher' AND api_player_id IS NOT NULL;
-        """)
-        pitchers = cur.fetchall()
-
-        for player_id, api_player_id in pitchers:
-            stats = fetch_pitcher_stats(api_player_id)
-            if stats:
-                update_pitcher_stats(player_id, stats)
+        with transaction() as cur:
+            # Fetch all hitters and pitchers to update
+            hitters, pitchers = load_player_ids(cur)
 
+            synced_through = get_watermark(cur, STATS_WATERMARK)
+            if incremental and synced_through is not None:
+                if synced_through >= yesterday:
+                    print(f"Player stats are already synced through {synced_through}.")
+                    return True
+
+                appeared = {str(api_player_id) for api_player_id in
+                            fetch_players_who_appeared(synced_through + timedelta(days=1), yesterday, workers)}
+                hitters = {api_player_id: player_id for api_player_id, player_id in hitters.items()
+                           if str(api_player_id) in appeared}
+                pitchers = {api_player_id: player_id for api_player_id, player_id in pitchers.items()
+                            if str(api_player_id) in appeared}
+                print(f"Refreshing {len(hitters)} hitters and {len(pitchers)} pitchers "
+                      f"who played since {synced_through}.")
+
+            completed = start_run(cur, STATS_JOURNAL, run_id, resume)
+            if completed:
+                hitters = {api_player_id: player_id for api_player_id, player_id in hitters.items()
+                           if str(player_id) not in completed}
+                pitchers = {api_player_id: player_id for api_player_id, player_id in pitchers.items()
+                            if str(player_id) not in completed}
+                count('players_resumed', len(completed))
+                print(f"Resuming: {len(completed)} players were already refreshed, "
+                      f"{len(hitters)} hitters and {len(pitchers)} pitchers are left.")
+
+        # Write each chunk of stats as soon as it is fetched, and journal its players with it
+        fetched, changed = store_season_stats(hitters, pitchers, workers, batch_size, run_id)
+
+        with transaction() as cur:
+            changed_ids = [int(unit) for unit in changed_units(cur, STATS_JOURNAL, run_id)]
+
+            # Keep the day's changes in the stats history
+            with timer('db_write'):
+                record_stats_history(cur, 'hitter_stats_history', changed_ids, yesterday)
+                record_stats_history(cur, 'pitcher_stats_history', changed_ids, yesterday)
+
+            set_watermark(cur, STATS_WATERMARK, yesterday)
+            finish_run(cur, STATS_JOURNAL)
+            if changed_ids:
+                notify_data_changed(cur, 'player_stats')
+
+        print(f"Updated {len(changed['hitting'])} of {fetched['hitting']} hitters "
+              f"and {len(changed['pitching'])} of {fetched['pitching']} pitchers.")
     except Exception as e:
         print(f"Error during the update process: {e}")
-    finally:
-        cur.close()
-        conn.close()
+        print("Run again with --resume to refresh only the players left.")
+        return False
+
+    update_hitting_streaks(workers)
+    update_leaderboards(changed_ids)
+    return True
+
+def refresh_players(api_player_ids, stat_date, workers=DEFAULT_FETCH_WORKERS, batch_size=STATS_BATCH_SIZE):
+    """
+    Refreshes the stats of some players, such as those of games that just ended, and the leaderboards they affect.
+
+    The changed stats are appended to the stats history dated stat_date; refreshing again on the same
+    date replaces those rows. The watermark is left alone, as the day may not be over. Requests go
+    through the MLB Stats API upstream already configured (see configure_statsapi).
+
+    Args:
+        api_player_ids (iterable): The players' IDs in the MLB Stats API. Players not in the players table are ignored.
+        stat_date (datetime.date): The last date whose games the stats reflect.
+        workers (int): The number of threads sending MLB Stats API requests.
+        batch_size (int): The maximum number of players per MLB Stats API request.
+
+    Returns:
+        list: The players.id of the players whose stats changed, or None if the stats could not be refreshed.
+    """
+    wanted = {str(api_player_id) for api_player_id in api_player_ids}
+
+    try:
+        with transaction() as cur:
+            hitters, pitchers = load_player_ids(cur)
+        hitters = {api_player_id: player_id for api_player_id, player_id in hitters.items()
+                   if str(api_player_id) in wanted}
+        pitchers = {api_player_id: player_id for api_player_id, player_id in pitchers.items()
+                    if str(api_player_id) in wanted}
+
+        fetched, changed = store_season_stats(hitters, pitchers, workers, batch_size)
+        changed_ids = changed['hitting'] + changed['pitching']
+
+        with transaction() as cur, timer('db_write'):
+            record_stats_history(cur, 'hitter_stats_history', changed_ids, stat_date)
+            record_stats_history(cur, 'pitcher_stats_history', changed_ids, stat_date)
+            if changed_ids:
+                notify_data_changed(cur, 'player_stats')
+
+        print(f"Updated {len(changed['hitting'])} of {fetched['hitting']} hitters "
+              f"and {len(changed['pitching'])} of {fetched['pitching']} pitchers.")
+    except Exception as e:
+        print(f"Error refreshing player stats: {e}")
+        return None
+
+    update_leaderboards(changed_ids)
+    return changed_ids
 
 if __name__ == '__main__':
-    update_player_stats()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Fetches and updates all player stats in the database.')
+    parser.add_argument('--workers', type=int, default=DEFAULT_FETCH_WORKERS,
+                        help='maximum number of MLB Stats API requests in flight at once')
+    parser.add_argument('--requests-per-second', type=float, default=DEFAULT_REQUESTS_PER_SECOND,
+                        help='maximum number of MLB Stats API requests started per second (0 for no limit)')
+    parser.add_argument('--batch-size', type=int, default=STATS_BATCH_SIZE,
+                        help='maximum number of players per MLB Stats API request')
+    parser.add_argument('--incremental', action='store_true',
+                        help="only refresh players who appeared in games finished since the last synced date")
+    parser.add_argument('--resume', action='store_true',
+                        help='skip the players an interrupted run for the same date already refreshed')
+    recording = parser.add_mutually_exclusive_group()
+    recording.add_argument('--record', metavar='DIR',
+                           help='keep every MLB Stats API response of the run in DIR, to replay it later')
+    recording.add_argument('--replay', metavar='DIR',
+                           help='serve MLB Stats API responses from a run recorded the same day in DIR, offline')
+    parser.add_argument('--metrics-dir', default=DEFAULT_METRICS_DIR,
+                        help='directory the run summary (JSON) and Prometheus textfile are written to')
+    args = parser.parse_args()
+
+    statsapi_cache = None
+    if args.record:
+        statsapi_cache = StatsApiCache(args.record, mode='record')
+    elif args.replay:
+        statsapi_cache = StatsApiCache(args.replay, mode='replay')
+
+    succeeded = update_player_stats(args.workers, args.requests_per_second, args.batch_size, args.incremental,
+                                    args.resume, statsapi_cache)
+    write_run_metrics('stat_collection', args.metrics_dir, succeeded)
\ No newline at end of file
@@ -0,0 +1,167 @@
+import argparse
+import signal
+import sys
+import os
+import threading
+from datetime import date, datetime, time, timedelta, timezone
+
+# Add the project root directory to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from scripts.common.db import transaction
+from scripts.common.metrics import DEFAULT_METRICS_DIR, reset_metrics, write_run_metrics
+from scripts.common.statsapi_cache import STATSAPI_CACHE_TTLS, StatsApiCache
+from scripts.common.upstream import configure_statsapi
+from scripts.common.watermarks import set_watermark
+from scripts.daily.box_scores import FINAL_GAME_STATES, STOPPED_GAME_STATES, fetch_day_games, fetch_players_in_games
+from scripts.daily.hitting_streaks import update_hitting_streaks
+from scripts.daily.scoring import update_leaderboards
+from scripts.daily.stat_collection import (DEFAULT_FETCH_WORKERS, DEFAULT_REQUESTS_PER_SECOND, STATS_WATERMARK,
+                                           refresh_players, update_player_stats)
+
+# Seconds between two looks at the schedule while games are being played
+DEFAULT_POLL_INTERVAL = 5 * 60
+
+# No game ends sooner than this after its first pitch, so the schedule is not read before then
+MIN_GAME_DURATION = timedelta(hours=2)
+
+# Local time at which the schedule of the next day is read, once a day's games are all over
+DAY_START = time(9, 0)
+
+# Seconds to wait before trying again after a failed look at the schedule
+RETRY_INTERVAL = 60
+
+# Cached response TTLs of the daemon. Players' season stats change with every game they finish, and
+# the daemon fetches them right after: a cached response could be that of the game before, such as
+# the first game of a doubleheader, so they are always fetched again.
+DAEMON_STATSAPI_CACHE_TTLS = {**STATSAPI_CACHE_TTLS, 'people': 0}
+
+
+def next_wake_up(games, poll_interval, now):
+    """
+    Picks when to look at the schedule again while some of the day's games are not over.
+
+    Args:
+        games (list): The (game_pk, coded_game_state, first_pitch) tuples of the games not over yet.
+        poll_interval (float): The seconds between two looks while games are being played.
+        now (datetime.datetime): The current time, timezone-aware.
+
+    Returns:
+        datetime.datetime: The time to wake up at.
+    """
+    # Nothing can end before the earliest game has been played for MIN_GAME_DURATION
+    earliest_end = min(first_pitch for _, _, first_pitch in games) + MIN_GAME_DURATION
+    return max(earliest_end, now + timedelta(seconds=poll_interval))
+
+
+def finish_day(day, workers):
+    """
+    Closes a day once all its games are over: advances the hitting streaks through the day, rescores the
+    DiMaggio contest, and moves the stats watermark to the day so the daily run does not sweep it again.
+
+    Args:
+        day (datetime.date): The day.
+        workers (int): The number of threads sending MLB Stats API requests.
+    """
+    update_hitting_streaks(workers, through=day)
+    update_leaderboards([])
+    with transaction() as cur:
+        set_watermark(cur, STATS_WATERMARK, day)
+
+
+def run_stats_daemon(workers=DEFAULT_FETCH_WORKERS, requests_per_second=DEFAULT_REQUESTS_PER_SECOND,
+                     poll_interval=DEFAULT_POLL_INTERVAL, metrics_dir=DEFAULT_METRICS_DIR, stop=None):
+    """
+    Keeps player stats and leaderboards up to date as games end, until stopped.
+
+    Days missed while the daemon was not running are first caught up with an incremental
+    update_player_stats. Then, for each day, the daemon reads the schedule, sleeps until the
+    earliest game can be over, and from then on looks at the schedule every poll_interval.
+    Whenever games have gone final, only the players in them are refreshed, and the leaderboards
+    of the members who picked them are recomputed. Once every game of the day is final, postponed
+    or suspended, the day is closed (see finish_day) and the daemon sleeps until DAY_START the
+    next day; a day that fails to close is closed again on the next look. Between looks it is blocked on a timer, so it uses no CPU and sends no requests.
+
+    Args:
+        workers (int): The maximum number of MLB Stats API requests in flight at once.
+        requests_per_second (float): The maximum number of MLB Stats API requests started per second.
+        poll_interval (float): The seconds between two looks at the schedule while games are being played.
+        metrics_dir (str): The directory the metrics of each refresh are written to.
+        stop (threading.Event, optional): An event that stops the daemon when set.
+    """
+    stop = stop or threading.Event()
+
+    update_player_stats(workers, requests_per_second, incremental=True,
+                        statsapi_cache=StatsApiCache(ttls=DAEMON_STATSAPI_CACHE_TTLS))
+    write_run_metrics('stats_daemon', metrics_dir)
+
+    day = date.today()
+    refreshed = set()
+    while not stop.is_set():
+        reset_metrics()
+        # A new cache per look, so the in-memory tier only lives for one refresh
+        configure_statsapi(workers, requests_per_second, cache=StatsApiCache(ttls=DAEMON_STATSAPI_CACHE_TTLS))
+
+        try:
+            games = fetch_day_games(day)
+        except Exception as e:
+            print(f"Error reading the schedule of {day}: {e}")
+            stop.wait(RETRY_INTERVAL)
+            continue
+
+        final = {game_pk for game_pk, state, _ in games if state in FINAL_GAME_STATES}
+        ended = sorted(final - refreshed)
+        if ended:
+            print(f"{len(ended)} games of {day} went final, refreshing their players.")
+            try:
+                players = fetch_players_in_games(ended, workers)
+            except Exception as e:
+                print(f"Error fetching the box scores of {day}: {e}")
+                players = None
+            succeeded = players is not None and refresh_players(players, day, workers) is not None
+            if succeeded:
+                refreshed.update(ended)
+            write_run_metrics('stats_daemon', metrics_dir, succeeded)
+            if not succeeded:
+                stop.wait(RETRY_INTERVAL)
+                continue
+
+        playing = [game for game in games if game[1] not in FINAL_GAME_STATES + STOPPED_GAME_STATES]
+        if playing:
+            wake_up = next_wake_up(playing, poll_interval, datetime.now(timezone.utc))
+        else:
+            print(f"All {len(games)} games of {day} are over.")
+            try:
+                finish_day(day, workers)
+            except Exception as e:
+                print(f"Error closing {day}: {e}")
+                stop.wait(RETRY_INTERVAL)
+                continue
+            day += timedelta(days=1)
+            refreshed = set()
+            wake_up = datetime.combine(day, DAY_START).astimezone()
+
+        seconds = (wake_up - datetime.now(timezone.utc)).total_seconds()
+        if seconds > 0:
+            print(f"Sleeping until {wake_up.astimezone():%Y-%m-%d %H:%M}.")
+            stop.wait(seconds)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Runs until stopped, refreshing player stats and leaderboards as soon as games end.')
+    parser.add_argument('--workers', type=int, default=DEFAULT_FETCH_WORKERS,
+                        help='maximum number of MLB Stats API requests in flight at once')
+    parser.add_argument('--requests-per-second', type=float, default=DEFAULT_REQUESTS_PER_SECOND,
+                        help='maximum number of MLB Stats API requests started per second (0 for no limit)')
+    parser.add_argument('--poll-interval', type=float, default=DEFAULT_POLL_INTERVAL,
+                        help='seconds between two looks at the schedule while games are being played')
+    parser.add_argument('--metrics-dir', default=DEFAULT_METRICS_DIR,
+                        help='directory the summary (JSON) and Prometheus textfile of each refresh are written to')
+    args = parser.parse_args()
+
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop.set())
+
+    run_stats_daemon(args.workers, args.requests_per_second, args.poll_interval, args.metrics_dir, stop)
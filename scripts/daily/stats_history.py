@@ -0,0 +1,192 @@
+import argparse
+import sys
+import os
+from datetime import date, timedelta
+
+# Add the project root directory to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from scripts.common.db import transaction
+from scripts.common.schema import ensure_schema
+
+# Stat columns kept in each history table, with their storage type in the schema migrations.
+# Rates are stored as numbers, so the API's ".---" for "no stat yet" becomes NULL.
+HISTORY_COLUMNS = {
+    'hitter_stats_history': {
+        'average': 'NUMERIC(4, 3)',
+        'ops': 'NUMERIC(5, 3)',
+        'plate_appearances': 'SMALLINT',
+        'home_runs': 'SMALLINT',
+        'rbis': 'SMALLINT',
+        'stolen_bases': 'SMALLINT',
+    },
+    'pitcher_stats_history': {
+        'wins': 'SMALLINT',
+        'losses': 'SMALLINT',
+        'era': 'NUMERIC(6, 2)',
+        'strikeouts': 'SMALLINT',
+    },
+}
+
+# The current stats table each history table records
+SOURCE_TABLES = {
+    'hitter_stats_history': 'hitters',
+    'pitcher_stats_history': 'pitchers',
+}
+
+# Stats of every player as of %(as_of)s, with the columns of the hitters and pitchers tables.
+# Since a row is only appended when a player's stats change, a player's stats on a date are
+# those of the latest row on or before it.
+HITTERS_AS_OF = """(
+    SELECT DISTINCT ON (player_id) *
+    FROM hitter_stats_history
+    WHERE stat_date <= %(as_of)s
+    ORDER BY player_id, stat_date DESC
+)"""
+PITCHERS_AS_OF = """(
+    SELECT DISTINCT ON (player_id) *
+    FROM pitcher_stats_history
+    WHERE stat_date <= %(as_of)s
+    ORDER BY player_id, stat_date DESC
+)"""
+
+def _cast(column, column_type):
+    """
+    Casts a current stats column to its history type, turning values that are not numbers into NULL.
+    """
+    return f"CASE WHEN s.{column}::text ~ '^-?[0-9]*\\.?[0-9]+$' THEN s.{column}::numeric END::{column_type} AS {column}"
+
+def ensure_history_partition(cur, table, stat_date):
+    """
+    Creates the monthly partition of a history table that holds a date, if it does not exist yet.
+
+    Args:
+        cur (psycopg2.extensions.cursor): The cursor of the open transaction.
+        table (str): The history table.
+        stat_date (datetime.date): A date the partition must hold.
+    """
+    start = stat_date.replace(day=1)
+    end = (start + timedelta(days=32)).replace(day=1)
+    cur.execute(f"""
+        CREATE TABLE IF NOT EXISTS {table}_{start:%Y_%m} PARTITION OF {table}
+        FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}');
+    """)
+
+def record_stats_history(cur, table, player_ids, stat_date):
+    """
+    Appends the current stats of players to a history table, skipping players whose stats did not change.
+
+    A player's current stats are compared with the latest history row before stat_date, and a row is
+    only written when they differ. Players with no history yet are always recorded, so the first run
+    takes a full snapshot and later runs only add the day's changes. Running again on the same date
+    replaces that date's rows.
+
+    Args:
+        cur (psycopg2.extensions.cursor): The cursor of the open transaction.
+        table (str): 'hitter_stats_history' or 'pitcher_stats_history'.
+        player_ids (list): The players.id of the players whose stats changed.
+        stat_date (datetime.date): The last date whose games the stats reflect.
+
+    Returns:
+        int: The number of history rows written.
+    """
+    columns = HISTORY_COLUMNS[table]
+    ensure_schema(cur)
+    ensure_history_partition(cur, table, stat_date)
+
+    column_list = ', '.join(columns)
+    casts = ', '.join(_cast(column, column_type) for column, column_type in columns.items())
+    current_columns = ', '.join(f'c.{column}' for column in columns)
+    previous_columns = ', '.join(f'prev.{column}' for column in columns)
+    updates = ', '.join(f'{column} = EXCLUDED.{column}' for column in columns)
+
+    cur.execute(f"""
+        INSERT INTO {table} (player_id, stat_date, {column_list})
+        SELECT c.player_id, %(stat_date)s, {current_columns}
+        FROM (
+            SELECT s.player_id, {casts}
+            FROM {SOURCE_TABLES[table]} s
+        ) c
+        LEFT JOIN LATERAL (
+            SELECT {column_list}
+            FROM {table} h
+            WHERE h.player_id = c.player_id AND h.stat_date < %(stat_date)s
+            ORDER BY h.stat_date DESC
+            LIMIT 1
+        ) prev ON true
+        WHERE (c.player_id = ANY(%(player_ids)s)
+               OR NOT EXISTS (SELECT 1 FROM {table} h WHERE h.player_id = c.player_id))
+          AND ({current_columns}) IS DISTINCT FROM ({previous_columns})
+        ON CONFLICT (player_id, stat_date) DO UPDATE SET {updates};
+    """, {'stat_date': stat_date, 'player_ids': list(player_ids)})
+    return cur.rowcount
+
+def get_stat_series(cur, player_id, stat, start=None, end=None):
+    """
+    Reads how one stat of a player changed over a date range.
+
+    Args:
+        cur (psycopg2.extensions.cursor): A database cursor.
+        player_id (int): The player's players.id.
+        stat (str): A column of a history table, such as 'average' or 'wins'.
+        start (datetime.date, optional): The first date. Defaults to the first recorded date.
+        end (datetime.date, optional): The last date. Defaults to the last recorded date.
+
+    Returns:
+        list: A list of (stat_date, value) tuples in date order, one per date the stats changed.
+              When start is given, the first tuple holds the value carried into start.
+
+    Raises:
+        ValueError: If stat is not a recorded stat.
+    """
+    table = next((table for table, columns in HISTORY_COLUMNS.items() if stat in columns), None)
+    if table is None:
+        raise ValueError(f"Unknown stat: {stat}")
+
+    cur.execute(f"""
+        (
+            SELECT %(start)s::date, {stat}
+            FROM {table}
+            WHERE player_id = %(player_id)s AND stat_date < %(start)s
+            ORDER BY stat_date DESC
+            LIMIT 1
+        )
+        UNION ALL
+        (
+            SELECT stat_date, {stat}
+            FROM {table}
+            WHERE player_id = %(player_id)s
+              AND stat_date >= COALESCE(%(start)s, '-infinity'::date)
+              AND stat_date <= COALESCE(%(end)s, 'infinity'::date)
+            ORDER BY stat_date
+        );
+    """, {'player_id': player_id, 'start': start, 'end': end})
+    return cur.fetchall()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Records and reads the daily player stats history.')
+    parser.add_argument('--snapshot', action='store_true',
+                        help="record every player's current stats as of yesterday")
+    parser.add_argument('--player', help='name of a player whose stat series is printed')
+    parser.add_argument('--stat', default='average', help='stat printed for --player (default: average)')
+    parser.add_argument('--start', type=date.fromisoformat, help='first date printed (YYYY-MM-DD)')
+    parser.add_argument('--end', type=date.fromisoformat, help='last date printed (YYYY-MM-DD)')
+    args = parser.parse_args()
+
+    with transaction() as cur:
+        if args.snapshot:
+            yesterday = date.today() - timedelta(days=1)
+            for table in HISTORY_COLUMNS:
+                cur.execute(f"SELECT player_id FROM {SOURCE_TABLES[table]};")
+                player_ids = [player_id for player_id, in cur.fetchall()]
+                rows = record_stats_history(cur, table, player_ids, yesterday)
+                print(f"Recorded {rows} rows in {table}.")
+
+        if args.player:
+            cur.execute("SELECT id FROM players WHERE player_name = %s;", (args.player,))
+            row = cur.fetchone()
+            if row is None:
+                print(f"Player {args.player} not found.")
+            else:
+                for stat_date, value in get_stat_series(cur, row[0], args.stat, args.start, args.end):
+                    print(f"{stat_date}  {value}")
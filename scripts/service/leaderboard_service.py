@@ -0,0 +1,414 @@
+import argparse
+import hashlib
+import json
+import select
+import sys
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from datetime import date
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import psycopg2
+
+# Add the project root directory to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from scripts.common.db import DATA_CHANGED_CHANNEL, configure_pool, connect, transaction
+from scripts.common.metrics import count, timer
+from scripts.daily.scoring import CONTEST_DESCENDING, get_leaderboard, get_member_standings
+
+# Address the service listens on by default
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8300
+
+# Members listed per contest when no limit is asked for
+DEFAULT_LEADERBOARD_LIMIT = 10
+
+# Most members listed per contest. The limit is part of the cache key, so it is bounded to keep
+# clients from filling the cache with one entry per limit.
+MAX_LEADERBOARD_LIMIT = 100
+
+# Bounds of the response cache. Entries are dropped on every change notification; the maximum age
+# only matters if a notification is lost, such as while the listener reconnects.
+MAX_CACHE_ENTRIES = 1024
+MAX_CACHE_AGE = 15 * 60
+
+# Seconds the listener waits for a notification before checking whether it should stop,
+# and before reconnecting after losing its connection
+LISTEN_TIMEOUT = 5
+RECONNECT_DELAY = 5
+
+HITTING_STATS = ('average', 'ops', 'plate_appearances', 'home_runs', 'rbis', 'stolen_bases')
+PITCHING_STATS = ('wins', 'losses', 'era', 'strikeouts')
+
+# A member's picks in contest order, with the current stats of each picked player
+MEMBER_PICKS_QUERY = f"""
+    SELECT c.name, pk.pick_order, pk.player_name, pk.is_alternate, pk.pick_value, p.id,
+           {', '.join(f'h.{stat}' for stat in HITTING_STATS)},
+           {', '.join(f'pt.{stat}' for stat in PITCHING_STATS)}
+    FROM picks pk
+    JOIN categories c ON c.id = pk.category_id
+    LEFT JOIN players p ON p.player_name = pk.player_name
+    LEFT JOIN hitters h ON h.player_id = p.id
+    LEFT JOIN pitchers pt ON pt.player_id = p.id
+    WHERE pk.user_id = %s
+    ORDER BY c.id, pk.pick_order;
+"""
+
+
+class NotFound(LookupError):
+    """
+    Raised by a renderer when the requested resource does not exist.
+    """
+
+
+class RenderCache:
+    """
+    Keeps rendered responses in memory until the data they were rendered from changes.
+
+    Each response is rendered once: callers asking for a response while it is being rendered wait
+    for it instead of querying the database too. A response rendered while the cache was
+    invalidated is returned but not kept, as it may predate the change. The least recently used
+    responses are dropped beyond max_entries.
+
+    Args:
+        max_entries (int): The maximum number of responses kept.
+        max_age (float): The maximum number of seconds a response is kept.
+    """
+
+    def __init__(self, max_entries=MAX_CACHE_ENTRIES, max_age=MAX_CACHE_AGE):
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self._entries = OrderedDict()
+        self._calls = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, render):
+        """
+        Returns a response, rendering it on a cache miss.
+
+        Args:
+            key (str): The response's key, such as its normalized path.
+            render (callable): A function without arguments returning the response body as bytes.
+
+        Returns:
+            tuple: An (etag, body) pair.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] < self.max_age:
+                self._entries.move_to_end(key)
+                count('service_cache_hits')
+                return entry[1], entry[2]
+
+            call = self._calls.get(key)
+            owner = call is None
+            if owner:
+                call = self._calls[key] = Future()
+            generation = self._generation
+
+        if not owner:
+            count('service_cache_shared')
+            return call.result()
+
+        count('service_cache_misses')
+        try:
+            with timer('service_render'):
+                body = render()
+        except BaseException as e:
+            with self._lock:
+                del self._calls[key]
+            call.set_exception(e)
+            raise
+
+        etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        with self._lock:
+            del self._calls[key]
+            if generation == self._generation:
+                self._entries[key] = (time.monotonic(), etag, body)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        call.set_result((etag, body))
+        return etag, body
+
+    def invalidate(self):
+        """
+        Drops every response, after the data changed.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+        count('service_cache_invalidations')
+
+
+def listen_for_changes(cache, stop):
+    """
+    Invalidates the cache whenever a job notifies DATA_CHANGED_CHANNEL, until stopped.
+
+    The listener keeps a dedicated connection. Notifications sent while it is disconnected are
+    lost, so the cache is also invalidated every time it (re)connects.
+
+    Args:
+        cache (RenderCache): The cache.
+        stop (threading.Event): An event that stops the listener when set.
+    """
+    while not stop.is_set():
+        conn = None
+        try:
+            conn = connect()
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                cur.execute(f'LISTEN {DATA_CHANGED_CHANNEL};')
+            cache.invalidate()
+
+            while not stop.is_set():
+                if select.select([conn], [], [], LISTEN_TIMEOUT) == ([], [], []):
+                    continue
+                conn.poll()
+                if conn.notifies:
+                    sources = {notify.payload for notify in conn.notifies}
+                    conn.notifies.clear()
+                    print(f"Data changed ({', '.join(sorted(sources))}), clearing the cache.")
+                    cache.invalidate()
+        except (psycopg2.Error, OSError) as e:
+            print(f"Error listening for data changes: {e}")
+            stop.wait(RECONNECT_DELAY)
+        finally:
+            if conn is not None:
+                conn.close()
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def to_json(document):
+    return json.dumps(document, default=_json_default, separators=(',', ':')).encode('utf-8')
+
+
+def _stats(row, names):
+    """
+    Returns the named stats of a row as a dictionary, or None if the player has no such stats.
+    """
+    stats = dict(zip(names, row))
+    return stats if any(value is not None for value in stats.values()) else None
+
+
+def render_leaderboard(category, limit):
+    if category not in CONTEST_DESCENDING:
+        raise NotFound(f"unknown contest {category!r}")
+    with transaction() as cur:
+        rows = get_leaderboard(cur, category, limit)
+    return to_json({
+        'contest': category,
+        'standings': [{'rank': rank, 'mbr_id': user_id, 'name': name, 'score': score, 'tiebreak': tiebreak}
+                      for rank, user_id, name, score, tiebreak in rows],
+    })
+
+
+def render_leaderboards(limit):
+    with transaction() as cur:
+        contests = {category: get_leaderboard(cur, category, limit) for category in CONTEST_DESCENDING}
+    return to_json({
+        category: [{'rank': rank, 'mbr_id': user_id, 'name': name, 'score': score, 'tiebreak': tiebreak}
+                   for rank, user_id, name, score, tiebreak in rows]
+        for category, rows in contests.items()
+    })
+
+
+def render_member(mbr_id):
+    with transaction() as cur:
+        cur.execute("SELECT name FROM users WHERE mbr_id = %s;", (mbr_id,))
+        user = cur.fetchone()
+        if user is None:
+            raise NotFound(f"unknown member {mbr_id}")
+
+        standings = get_member_standings(cur, mbr_id)
+        cur.execute(MEMBER_PICKS_QUERY, (mbr_id,))
+        picks = cur.fetchall()
+
+    return to_json({
+        'mbr_id': mbr_id,
+        'name': user[0],
+        'standings': [{'contest': category, 'rank': rank, 'score': score, 'tiebreak': tiebreak}
+                      for category, rank, score, tiebreak in standings],
+        'picks': [{
+            'contest': row[0],
+            'pick_order': row[1],
+            'player_name': row[2],
+            'is_alternate': row[3],
+            'pick_value': row[4],
+            'player_id': row[5],
+            'hitting': _stats(row[6:6 + len(HITTING_STATS)], HITTING_STATS),
+            'pitching': _stats(row[6 + len(HITTING_STATS):], PITCHING_STATS),
+        } for row in picks],
+    })
+
+
+def render_player(player_id):
+    with transaction() as cur:
+        cur.execute(f"""
+            SELECT p.player_name, p.player_type, p.api_player_id,
+                   {', '.join(f'h.{stat}' for stat in HITTING_STATS)},
+                   {', '.join(f'pt.{stat}' for stat in PITCHING_STATS)}
+            FROM players p
+            LEFT JOIN hitters h ON h.player_id = p.id
+            LEFT JOIN pitchers pt ON pt.player_id = p.id
+            WHERE p.id = %s;
+        """, (player_id,))
+        row = cur.fetchone()
+    if row is None:
+        raise NotFound(f"unknown player {player_id}")
+
+    return to_json({
+        'player_id': player_id,
+        'player_name': row[0],
+        'player_type': row[1],
+        'api_player_id': row[2],
+        'hitting': _stats(row[3:3 + len(HITTING_STATS)], HITTING_STATS),
+        'pitching': _stats(row[3 + len(HITTING_STATS):], PITCHING_STATS),
+    })
+
+
+def route(path, query):
+    """
+    Maps a request to its cache key and renderer.
+
+    Args:
+        path (str): The request's path.
+        query (dict): The request's query parameters, as parsed by parse_qs.
+
+    Returns:
+        tuple: A (key, render) pair, where render returns the response body.
+
+    Raises:
+        NotFound: If no resource has this path.
+        ValueError: If a path segment or parameter is invalid.
+    """
+    parts = [part for part in path.split('/') if part]
+    limit = int(query.get('limit', [DEFAULT_LEADERBOARD_LIMIT])[0])
+    if not 1 <= limit <= MAX_LEADERBOARD_LIMIT:
+        raise ValueError(f"limit must be between 1 and {MAX_LEADERBOARD_LIMIT}")
+
+    if parts == ['leaderboards']:
+        return f'/leaderboards?limit={limit}', lambda: render_leaderboards(limit)
+    if len(parts) == 2 and parts[0] == 'leaderboards':
+        return f'/leaderboards/{parts[1]}?limit={limit}', lambda: render_leaderboard(parts[1], limit)
+    if len(parts) == 2 and parts[0] == 'members':
+        mbr_id = int(parts[1])
+        return f'/members/{mbr_id}', lambda: render_member(mbr_id)
+    if len(parts) == 2 and parts[0] == 'players':
+        player_id = int(parts[1])
+        return f'/players/{player_id}', lambda: render_player(player_id)
+    raise NotFound(f"no resource at {path}")
+
+
+class LeaderboardHandler(BaseHTTPRequestHandler):
+    """
+    Serves the JSON resources of route() from the server's RenderCache, with ETags.
+
+    Responses carry 'Cache-Control: no-cache', so clients revalidate every time and get a 304
+    without a body while the data has not changed.
+    """
+
+    server_version = 'ClubLeaderboards/1.0'
+
+    def do_GET(self):
+        count('service_requests')
+        url = urlsplit(self.path)
+        if url.path == '/health':
+            self._send(200, to_json({'status': 'ok'}))
+            return
+
+        try:
+            key, render = route(url.path, parse_qs(url.query))
+            etag, body = self.server.cache.get(key, render)
+        except NotFound as e:
+            self._send(404, to_json({'error': str(e)}))
+            return
+        except ValueError as e:
+            self._send(400, to_json({'error': str(e)}))
+            return
+        except Exception as e:
+            print(f"Error rendering {self.path}: {e}")
+            self._send(500, to_json({'error': 'internal error'}))
+            return
+
+        if etag in [tag.strip() for tag in self.headers.get('If-None-Match', '').split(',')]:
+            count('service_not_modified')
+            self._send(304, None, etag)
+        else:
+            self._send(200, body, etag)
+
+    def _send(self, status, body, etag=None):
+        self.send_response(status)
+        if etag is not None:
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+        if body is not None:
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if body is not None:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def create_server(host=DEFAULT_HOST, port=DEFAULT_PORT, cache=None, verbose=False):
+    """
+    Creates the leaderboard HTTP server. Requests are handled on one thread each.
+
+    Args:
+        host (str): The address to listen on.
+        port (int): The port to listen on, or 0 for any free port.
+        cache (RenderCache, optional): The response cache. Defaults to a new one.
+        verbose (bool): Whether to log every request.
+
+    Returns:
+        http.server.ThreadingHTTPServer: The server, with its cache as its 'cache' attribute.
+    """
+    server = ThreadingHTTPServer((host, port), LeaderboardHandler)
+    server.daemon_threads = True
+    server.cache = cache if cache is not None else RenderCache()
+    server.verbose = verbose
+    return server
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Serves the leaderboards, member picks and player stats as JSON, from an in-memory cache '
+                    'cleared whenever the jobs commit new data.')
+    parser.add_argument('--host', default=DEFAULT_HOST, help='address to listen on')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='port to listen on')
+    parser.add_argument('--db-connections', type=int, default=4,
+                        help='maximum number of database connections used to render responses')
+    parser.add_argument('--verbose', action='store_true', help='log every request')
+    args = parser.parse_args()
+
+    configure_pool(maxconn=args.db_connections)
+    server = create_server(args.host, args.port, verbose=args.verbose)
+    stop = threading.Event()
+    threading.Thread(target=listen_for_changes, args=(server.cache, stop), daemon=True).start()
+
+    print(f"Serving leaderboards on http://{args.host}:{server.server_port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        server.server_close()
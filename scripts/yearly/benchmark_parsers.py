@@ -0,0 +1,114 @@
+import argparse
+import sys
+import os
+import time
+from urllib.parse import parse_qs, urlsplit
+
+from bs4 import BeautifulSoup
+
+# Add the project root directory to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+from scripts.common.disk_cache import DiskCache
+from scripts.common.http_cache import DEFAULT_HTTP_CACHE_DIR, DEFAULT_HTTP_CACHE_MAX_BYTES
+from scripts.yearly.user_selections_scraper import CONTEST_TABLES, extract_table_rows
+
+def extract_table_rows_bs4(page, table_index, start, stop):
+    """
+    Extracts the cell texts of some rows of one table with a full BeautifulSoup html.parser tree,
+    the way the scraper used to.
+
+    Args:
+        page (str): The page's HTML.
+        table_index (int): The index of the table among all tables in the page.
+        start (int): The index of the first row to extract.
+        stop (int): The index of the row after the last one to extract.
+
+    Returns:
+        list: A list with one list of stripped cell texts per row.
+    """
+    soup = BeautifulSoup(page, 'html.parser')
+    table = soup.find_all('table')[table_index]
+    return [[column.text.strip() for column in row.find_all('td')] for row in table.find_all('tr')[start:stop]]
+
+def load_saved_pages(directory):
+    """
+    Loads the RankingPerMember.asp pages saved in the scraper's response cache.
+
+    Args:
+        directory (str): The response cache directory.
+
+    Returns:
+        list: A list of (url, contest_id, page) tuples.
+    """
+    store = DiskCache(directory, DEFAULT_HTTP_CACHE_MAX_BYTES)
+    pages = []
+    for url in store.keys():
+        query = parse_qs(urlsplit(url).query)
+        if 'RankingPerMember.asp' not in url or 'contest_id' not in query:
+            continue
+        contest_id = int(query['contest_id'][0])
+        if contest_id not in CONTEST_TABLES:
+            continue
+        entry = store.get(url)
+        if entry is not None:
+            body, meta = entry
+            pages.append((url, contest_id, body.decode(meta.get('encoding') or 'utf-8', errors='replace')))
+    return pages
+
+def time_parser(parser, pages, repeat):
+    """
+    Times a parser over every page.
+
+    Returns:
+        float: The best total time in seconds over the repeats.
+    """
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _, contest_id, page in pages:
+            parser(page, *CONTEST_TABLES[contest_id])
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def benchmark_parsers(directory=DEFAULT_HTTP_CACHE_DIR, repeat=3):
+    """
+    Checks that the lxml extraction matches the BeautifulSoup one on saved pages and compares their speed.
+
+    Args:
+        directory (str): The response cache directory holding the saved pages.
+        repeat (int): The number of timed passes over all pages; the best one is reported.
+
+    Returns:
+        bool: True if both parsers returned the same rows for every page.
+    """
+    pages = load_saved_pages(directory)
+    if not pages:
+        print(f"No saved RankingPerMember.asp pages found in {directory}. Run the scraper first.")
+        return False
+
+    mismatches = 0
+    for url, contest_id, page in pages:
+        expected = extract_table_rows_bs4(page, *CONTEST_TABLES[contest_id])
+        actual = extract_table_rows(page, *CONTEST_TABLES[contest_id])
+        if actual != expected:
+            mismatches += 1
+            print(f"Mismatch on {url}:\n  html.parser: {expected}\n  lxml:        {actual}")
+
+    bs4_time = time_parser(extract_table_rows_bs4, pages, repeat)
+    lxml_time = time_parser(extract_table_rows, pages, repeat)
+
+    print(f"Pages: {len(pages)}, mismatches: {mismatches}")
+    print(f"BeautifulSoup html.parser: {bs4_time:.3f}s ({bs4_time / len(pages) * 1000:.2f} ms/page)")
+    print(f"lxml streaming:            {lxml_time:.3f}s ({lxml_time / len(pages) * 1000:.2f} ms/page)")
+    print(f"Speedup: {bs4_time / lxml_time:.1f}x")
+    return mismatches == 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmarks the scraper table extraction on saved pages.')
+    parser.add_argument('--cache-dir', default=DEFAULT_HTTP_CACHE_DIR,
+                        help='response cache directory holding the saved pages')
+    parser.add_argument('--repeat', type=int, default=3, help='number of timed passes over all pages')
+    args = parser.parse_args()
+
+    sys.exit(0 if benchmark_parsers(args.cache_dir, args.repeat) else 1)
@@ -0,0 +1,297 @@
+import argparse
+import difflib
+import json
+import os
+import re
+import sys
+import time
+import unicodedata
+from collections import Counter
+from datetime import date
+from typing import NamedTuple
+
+# Add the project root directory to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+from scripts.common.disk_cache import CACHE_ROOT
+from scripts.common.upstream import statsapi_get
+
+# Rebuild a persisted index from a fresh roster once it is older than this many seconds
+INDEX_MAX_AGE = 7 * 24 * 60 * 60
+
+# Fuzzy matches below this confidence are treated as not found
+MIN_MATCH_CONFIDENCE = 0.85
+
+# Number of trigram candidates scored with the edit-distance ratio
+FUZZY_CANDIDATES = 10
+
+# Name tokens that do not identify a player
+NAME_SUFFIXES = {'jr', 'sr', 'ii', 'iii', 'iv'}
+
+# Roster fields holding other spellings of a player's name
+ALIAS_FIELDS = ('fullName', 'nameFirstLast', 'firstLastName', 'fullFMLName')
+
+# Primary position types of the roster that tell pitchers from hitters; two-way players are both
+PITCHER_POSITION = 'Pitcher'
+TWO_WAY_POSITION = 'Two-Way Player'
+
+
+class NameMatch(NamedTuple):
+    """
+    The result of resolving a name against the roster.
+
+    Attributes:
+        api_player_id (int): The player's ID in the MLB Stats API.
+        matched_name (str): The player's full name in the roster.
+        confidence (float): 1.0 for an unambiguous exact match, lower for ambiguous or fuzzy matches.
+                            Players sharing a name count as one when only one of them plays the position
+                            asked for.
+    """
+    api_player_id: int
+    matched_name: str
+    confidence: float
+
+
+def normalize_name(name):
+    """
+    Normalizes a player name for lookups.
+
+    Accents, case, punctuation and suffixes such as "Jr." are dropped, and consecutive
+    initials are joined, so "Ronald Acuña Jr." becomes "ronald acuna" and "A. J. Minter"
+    becomes "aj minter".
+
+    Args:
+        name (str): The name as written on a ballot or in the roster.
+
+    Returns:
+        str: The normalized name.
+    """
+    name = unicodedata.normalize('NFKD', name)
+    name = ''.join(c for c in name if not unicodedata.combining(c)).lower()
+    name = re.sub(r"['’`]", '', name)
+    name = re.sub(r'[^a-z0-9]+', ' ', name)
+
+    tokens = []
+    initials = False
+    for token in name.split():
+        if token in NAME_SUFFIXES:
+            continue
+        if len(token) == 1 and initials:
+            tokens[-1] += token
+        else:
+            tokens.append(token)
+            initials = len(token) == 1
+    return ' '.join(tokens)
+
+
+def trigrams(key):
+    """
+    Returns the set of character trigrams of a normalized name, padded at word boundaries.
+    """
+    padded = f'  {key} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class PlayerNameIndex:
+    """
+    A lookup of MLB Stats API player ids by player name.
+
+    Every roster player is stored under the normalized form of each of its name fields, and every
+    normalized name is indexed by its trigrams. Exact lookups are a single dictionary access, and
+    names with no exact hit are matched against the few keys sharing the most trigrams.
+
+    Args:
+        players (dict): A dictionary mapping each api_player_id to its full name.
+        keys (dict): A dictionary mapping each normalized name to the api_player_ids known by it.
+        built_at (float): When the index was built, as a Unix timestamp.
+        positions (dict, optional): A dictionary mapping each api_player_id to its primary position type,
+                                    such as 'Pitcher' or 'Outfielder'.
+    """
+
+    def __init__(self, players, keys, built_at, positions=None):
+        self.players = players
+        self.keys = keys
+        self.built_at = built_at
+        self.positions = positions or {}
+        self.trigram_index = {}
+        for key in keys:
+            for trigram in trigrams(key):
+                self.trigram_index.setdefault(trigram, []).append(key)
+
+    @classmethod
+    def from_roster(cls, roster):
+        """
+        Builds an index from roster entries of the MLB Stats API 'sports_players' endpoint.
+
+        Args:
+            roster (list): The 'people' list, as in scripts/daily/players.json.
+
+        Returns:
+            PlayerNameIndex: The index.
+        """
+        players = {}
+        keys = {}
+        positions = {}
+        for person in roster:
+            players[person['id']] = person['fullName']
+            if person.get('primaryPosition'):
+                positions[person['id']] = person['primaryPosition']['type']
+
+            aliases = {person.get(field) for field in ALIAS_FIELDS}
+            aliases.add(f"{person.get('useName', person.get('firstName', ''))} {person.get('useLastName', person.get('lastName', ''))}")
+            aliases.add(f"{person.get('firstName', '')} {person.get('lastName', '')}")
+            for alias in aliases:
+                key = normalize_name(alias) if alias else ''
+                if key and person['id'] not in keys.setdefault(key, []):
+                    keys[key].append(person['id'])
+
+        return cls(players, keys, time.time(), positions)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Loads an index saved with save().
+
+        Args:
+            path (str): The index file.
+
+        Returns:
+            PlayerNameIndex: The index.
+        """
+        with open(path, 'r') as f:
+            data = json.load(f)
+        players = {int(api_player_id): name for api_player_id, name in data['players'].items()}
+        positions = {int(api_player_id): position for api_player_id, position in data.get('positions', {}).items()}
+        return cls(players, data['keys'], data['built_at'], positions)
+
+    def save(self, path):
+        """
+        Saves the index as JSON. The trigram index is rebuilt on load.
+
+        Args:
+            path (str): The index file.
+        """
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump({'built_at': self.built_at, 'players': self.players, 'keys': self.keys,
+                       'positions': self.positions}, f)
+
+    def candidates(self, key, player_type=None):
+        """
+        Returns the players known by a normalized name, narrowed to those who play the position asked for.
+
+        Args:
+            key (str): The normalized name.
+            player_type (str, optional): 'hitter' or 'pitcher'. Players sharing the name are only
+                                         narrowed down when it leaves at least one of them.
+
+        Returns:
+            list: The api_player_ids.
+        """
+        api_player_ids = self.keys[key]
+        if player_type is None or len(api_player_ids) < 2:
+            return api_player_ids
+
+        fitting = []
+        for api_player_id in api_player_ids:
+            position = self.positions.get(api_player_id)
+            if position in (None, TWO_WAY_POSITION) or (position == PITCHER_POSITION) == (player_type == 'pitcher'):
+                fitting.append(api_player_id)
+        return fitting or api_player_ids
+
+    def resolve(self, name, player_type=None, min_confidence=MIN_MATCH_CONFIDENCE):
+        """
+        Finds the player a name refers to.
+
+        Players sharing a name, such as a catcher and a pitcher both named Will Smith, are told apart
+        by their roster primary position when player_type is given.
+
+        Args:
+            name (str): The name to resolve.
+            player_type (str, optional): 'hitter' or 'pitcher', as the category the name was picked in.
+            min_confidence (float): The lowest confidence accepted for a match.
+
+        Returns:
+            NameMatch: The best match, or None if no player matches with enough confidence.
+        """
+        key = normalize_name(name)
+        if not key:
+            return None
+
+        if key in self.keys:
+            # Two players sharing a name and a position cannot be told apart
+            api_player_ids = self.candidates(key, player_type)
+            confidence = 1.0 / len(api_player_ids)
+            match = NameMatch(api_player_ids[0], self.players[api_player_ids[0]], confidence)
+            return match if confidence >= min_confidence else None
+
+        shared = Counter()
+        for trigram in trigrams(key):
+            shared.update(self.trigram_index.get(trigram, ()))
+
+        best = None
+        for candidate, _ in shared.most_common(FUZZY_CANDIDATES):
+            ratio = difflib.SequenceMatcher(None, key, candidate).ratio() / len(self.candidates(candidate, player_type))
+            if best is None or ratio > best[1]:
+                best = (candidate, ratio)
+
+        if best is None or best[1] < min_confidence:
+            return None
+        api_player_id = self.candidates(best[0], player_type)[0]
+        return NameMatch(api_player_id, self.players[api_player_id], best[1])
+
+
+def default_index_path(season):
+    """
+    Returns where the index of a season's roster is persisted.
+    """
+    return os.path.join(CACHE_ROOT, f'player_name_index_{season}.json')
+
+
+def load_player_name_index(season=None, path=None, max_age=INDEX_MAX_AGE):
+    """
+    Loads the persisted name index of a season, building it from the MLB Stats API roster if it is missing or stale.
+
+    Args:
+        season (int, optional): The season whose roster is indexed. Defaults to the current year.
+        path (str, optional): The index file. Defaults to one per season in the cache directory.
+        max_age (float): The age in seconds after which the index is rebuilt.
+
+    Returns:
+        PlayerNameIndex: The index.
+    """
+    season = season or date.today().year
+    path = path or default_index_path(season)
+
+    if os.path.exists(path):
+        index = PlayerNameIndex.load(path)
+        # Indexes saved without positions cannot tell players sharing a name apart
+        if time.time() - index.built_at < max_age and index.positions:
+            return index
+
+    roster = statsapi_get('sports_players', {'season': season})['people']
+    index = PlayerNameIndex.from_roster(roster)
+    index.save(path)
+    return index
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Builds the player name index and resolves names against it.')
+    parser.add_argument('names', nargs='*', help='names to resolve')
+    parser.add_argument('--season', type=int, help='season whose roster is indexed (default: current year)')
+    parser.add_argument('--player-type', choices=('hitter', 'pitcher'),
+                        help='position the names were picked for, to tell players sharing a name apart')
+    parser.add_argument('--roster', help='build the index from a saved roster JSON file such as scripts/daily/players.json')
+    args = parser.parse_args()
+
+    season = args.season or date.today().year
+    if args.roster:
+        with open(args.roster, 'r') as f:
+            index = PlayerNameIndex.from_roster(json.load(f))
+        index.save(default_index_path(season))
+    else:
+        index = load_player_name_index(season)
+
+    print(f"Indexed {len(index.players)} players under {len(index.keys)} names.")
+    for name in args.names:
+        match = index.resolve(name, args.player_type, min_confidence=0)
+        print(f"{name}: {match}")
@@ -1,116 +1,104 @@
-import json
-import psycopg2
-import statsapi
+import argparse
+import csv
+import io
 import sys
 import os
 
 # Add the project root directory to the Python path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
-from config.config import DATABASE
+from scripts.common.db import server_cursor, transaction
+from scripts.common.schema import ensure_schema
+from scripts.yearly.player_name_index import load_player_name_index
 
-def populate_player_tables():
+# Inserts every picked player into the players table, typed by the first category it was picked in
+INSERT_PICKED_PLAYERS_QUERY = """
+    INSERT INTO players (player_name, player_type)
+    SELECT DISTINCT ON (p.player_name)
+        p.player_name,
+        CASE WHEN c.name = 'pitchers' THEN 'pitcher' ELSE 'hitter' END
+    FROM picks p
+    JOIN categories c ON c.id = p.category_id
+    WHERE p.player_name IS NOT NULL
+    ORDER BY p.player_name, c.id
+    ON CONFLICT (player_name) DO NOTHING;
+"""
+
+def populate_player_tables(season=None):
     """
     Populates the players, pitchers, and hitters tables in the three_hundred_club database.
     This script is run once to populate the tables and does not need to be run again.
-    """
-    conn = psycopg2.connect(
-        dbname=DATABASE['dbname'],
-        user=DATABASE['user'],
-        password=DATABASE['password'],
-        host=DATABASE['host']
-    )
-    cur = conn.cursor()
-
-    # Step 1: Extract unique players from the picks table
-    cur.execute("""
-        SELECT DISTINCT player_name, category_id
-        FROM picks
-        WHERE player_name IS NOT NULL;
-    """)
-    unique_players = cur.fetchall()
-    
-    # Step 2: Insert unique players into the players table with player_type
-    for player_name, category_id in unique_players:
-        # Determine player type based on category_id
-        if category_id in (1, 2, 4, 5, 6, 7):  # Assuming these are hitter-related categories
-            player_type = 'hitter'
-        elif category_id == 3:  # Assuming this is the pitcher-related category
-            player_type = 'pitcher'
-        
-        print (player_name, player_type)
-        # Step 3: Insert player into the players table
-        cur.execute("""
-            INSERT INTO players (player_name, player_type)
-            VALUES (%s, %s)
-            ON CONFLICT (player_name) DO NOTHING;
-        """, (player_name, player_type))
-    
-    # Step 3.5: Get api_player_id for each player, write to json, insert into player table
-    player_id_map = {}
-    all_players = fetch_players_ids()
 
-    for player in unique_players:
-        if player[0] in all_players:
-            print(f"Success! Player {player} found in MLB API")
-            player_id = all_players[player[0]]
-            player_id_map[player[0]] = player_id
-            # Code to add player_id to players table
-        else:
-            print(f"Failure. Player {player[0]} NOT found in MLB API")
-            player_id_map[player[0]] = "NOT_FOUND"
-    # Write the player_id_map to a JSON file
-    with open('player_ids.json', 'w') as f:
-        json.dump(player_id_map, f)
+    Everything runs as a handful of set-based statements in one transaction. Player names from
+    the picks are resolved to MLB Stats API ids with the season's persisted name index, which
+    tolerates accents, suffixes and small spelling differences and tells players sharing a name
+    apart by whether they were picked as hitters or pitchers. Names that cannot be resolved
+    keep a NULL api_player_id, so they are skipped by the daily job and retried on the next run.
 
-    # Load the JSON file containing player names and api_player_ids
-    with open('player_ids.json', 'r') as f:
-        player_api_ids = json.load(f)
-    
-    for player_name, api_id in player_api_ids.items():
-        # Update the api_player_id for each player
-        cur.execute("""
-            UPDATE players
-            SET api_player_id = %s
-            WHERE player_name = %s;
-        """, (api_id, player_name))
+    Args:
+        season (int, optional): The season whose roster the names are resolved against. Defaults to the current year.
+    """
+    name_index = load_player_name_index(season)
 
-    
-    # Step 4: Insert players into hitters or pitchers table based on player_type
-    cur.execute("""
-        SELECT id, player_name, player_type
-        FROM players;
-    """)
-    players = cur.fetchall()
+    with transaction() as cur:
+        ensure_schema(cur)
 
-    for player_id, player_name, player_type in players:
-        if player_type == 'hitter':
-            cur.execute("""
-                INSERT INTO hitters (player_id)
-                VALUES (%s)
-                ON CONFLICT (player_id) DO NOTHING;
-            """, (player_id,))
-        elif player_type == 'pitcher':
-            cur.execute("""
-                INSERT INTO pitchers (player_id)
-                VALUES (%s)
-                ON CONFLICT (player_id) DO NOTHING;
-            """, (player_id,))
+        # Step 1: Insert every picked player into the players table, typed by the category it was picked in
+        cur.execute(INSERT_PICKED_PLAYERS_QUERY)
+        print(f"Inserted {cur.rowcount} new players.")
 
-    conn.commit()
-    cur.close()
-    conn.close()
+        # Step 2: Resolve the api_player_id of every player
+        resolved = io.StringIO()
+        writer = csv.writer(resolved)
+        unresolved = []
 
+        with server_cursor(cur) as players:
+            players.execute("SELECT player_name, player_type FROM players;")
+            for player_name, player_type in players:
+                match = name_index.resolve(player_name, player_type)
+                if match:
+                    if match.confidence < 1:
+                        print(f"Matched {player_name} to {match.matched_name} (confidence {match.confidence:.2f})")
+                    writer.writerow((player_name, match.api_player_id))
+                else:
+                    unresolved.append(player_name)
 
-def fetch_players_ids():
-    players = statsapi.get('sports_players',{'season':2024})
+        for player_name in unresolved:
+            print(f"Failure. Player {player_name} NOT found in MLB API")
 
-    # map player name to player_id
-    player_ids = {}
-    for player in players["people"]:
-        player_ids[player['fullName']] = player['id']
+        # Step 3: Load the resolved ids and apply them with one update
+        cur.execute("""
+            CREATE TEMP TABLE resolved_player_ids ON COMMIT DROP AS
+            SELECT player_name, api_player_id FROM players WITH NO DATA;
+        """)
+        resolved.seek(0)
+        cur.copy_expert("COPY resolved_player_ids (player_name, api_player_id) FROM STDIN WITH (FORMAT csv)", resolved)
+        cur.execute("""
+            UPDATE players p
+            SET api_player_id = r.api_player_id
+            FROM resolved_player_ids r
+            WHERE p.player_name = r.player_name
+              AND p.api_player_id IS DISTINCT FROM r.api_player_id;
+        """)
+        print(f"Updated the api_player_id of {cur.rowcount} players, {len(unresolved)} not found.")
 
-    return player_ids
+        # Step 4: Insert players into hitters or pitchers table based on player_type
+        cur.execute("""
+            INSERT INTO hitters (player_id)
+            SELECT id FROM players WHERE player_type = 'hitter'
+            ON CONFLICT (player_id) DO NOTHING;
+        """)
+        hitters_added = cur.rowcount
+        cur.execute("""
+            INSERT INTO pitchers (player_id)
+            SELECT id FROM players WHERE player_type = 'pitcher'
+            ON CONFLICT (player_id) DO NOTHING;
+        """)
+        print(f"Added {hitters_added} hitters and {cur.rowcount} pitchers.")
 
 
 if __name__ == "__main__":
-    populate_player_tables()
+    parser = argparse.ArgumentParser(description='Populates the players, pitchers, and hitters tables.')
+    parser.add_argument('--season', type=int, help='season whose roster player names are resolved against (default: current year)')
+    args = parser.parse_args()
+
+    populate_player_tables(args.season)
@@ -1,209 +1,389 @@
-import requests
-from bs4 import BeautifulSoup
-import psycopg2
-from config.config import DATABASE
+from lxml import etree, html as lxml_html
+from psycopg2.extras import execute_values
+import argparse
+import sys
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import date
+from typing import NamedTuple
+
+# Add the project root directory to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+from scripts.common.db import notify_data_changed, transaction
+from scripts.common.http_cache import DEFAULT_HTTP_CACHE_TTL, ResponseCache, create_session
+from scripts.common.metrics import DEFAULT_METRICS_DIR, count, timer, write_run_metrics
+from scripts.common.run_journal import finish_run, record_units, start_run
+from scripts.common.schema import ensure_schema
+from scripts.common.upstream import Upstream
+
+# Root of the 300 Club site every page is scraped from
+BASE_URL = 'https://www.300club.org/'
+
+# Number of pages scraped at once, and the politeness limit towards 300club.org
+DEFAULT_SCRAPE_WORKERS = 8
+MAX_REQUESTS_IN_FLIGHT_PER_HOST = 4
+MAX_REQUESTS_PER_SECOND_PER_HOST = 5
+
+# Number of users written to the database per transaction
+DEFAULT_STORE_BATCH_SIZE = 25
+
+# Run journal job name; each run is identified by the season and its units are '<mbr_id>:<contest>' pages
+SCRAPE_JOURNAL = 'user_selections'
+
+
+class Contest(NamedTuple):
+    """
+    Where a contest's selections are on its RankingPerMember.asp page, and how its rows become picks.
+
+    Attributes:
+        name (str): The contest's category name.
+        contest_id (int): The contest's ID on 300club.org.
+        url_name (str): The contest's name as passed in page URLs.
+        table_index (int): The index of the selections table among all tables in the page.
+        start (int): The index of the first selection row.
+        stop (int): The index of the row after the last selection row.
+        columns (dict): The column each Pick field is read from: 'player_name', 'pick_order' and
+                        'pick_value', when the page has them. Without a 'pick_order' column,
+                        selections are numbered from 1 in row order.
+        width (int): The number of cells in a selection row. A shorter row ends the selections.
+        is_alternate (bool): Whether the contest's picks are alternates.
+    """
+    name: str
+    contest_id: int
+    url_name: str
+    table_index: int
+    start: int
+    stop: int
+    columns: dict
+    width: int
+    is_alternate: bool = False
+
+
+class Pick(NamedTuple):
+    """
+    One selection of a member in a contest, as stored in the picks table.
+
+    Attributes:
+        user_id (str): The member's mbr_id.
+        player_name (str): The selected player, or None for contests without one (DiMaggio Prize).
+        pick_order (int): The selection's number within the contest, 1 for single-selection contests.
+        pick_value (str): The number on the ballot, such as the RBI total, or None.
+        is_alternate (bool): Whether the selection is an alternate batter.
+    """
+    user_id: str
+    player_name: str
+    pick_order: int
+    pick_value: str
+    is_alternate: bool
+
+
+# Every contest scraped, in category order. A layout change on the site is fixed here.
+CONTESTS = (
+    # Rows: number, player, team, average, plate appearances, OPS, disqualified
+    Contest('batters', 2, 'Batters', 10, 3, 13, {'pick_order': 0, 'player_name': 1}, 7),
+    # Rows: player, team, average, plate appearances, OPS, disqualified
+    Contest('alternate_batters', 5, 'Alternates', 11, 1, 6, {'player_name': 0}, 6, is_alternate=True),
+    # Rows: player, team, wins
+    Contest('pitchers', 3, 'Pitchers', 11, 1, 5, {'player_name': 0}, 3),
+    # Rows: player, team, home runs
+    Contest('home_run_hitters', 6, 'Home+Run+Hitters', 11, 1, 5, {'player_name': 0}, 3),
+    # Row: player, team, actual RBIs, ballot RBIs
+    Contest('rbi_champion', 7, 'RBI+Champion', 11, 1, 2, {'player_name': 0, 'pick_value': 3}, 4),
+    # Row: player, team, actual stolen bases, ballot stolen bases
+    Contest('stolen_base_champion', 8, 'Stolen+Base+Champion', 11, 1, 2, {'player_name': 0, 'pick_value': 3}, 4),
+    # Row: actual longest hitting streak, ballot longest hitting streak
+    Contest('dimaggio', 9, 'DiMaggio+Prize', 11, 1, 2, {'pick_value': 1}, 2),
+)
+
+# Position of the selections table in each contest's RankingPerMember.asp page:
+# contest_id -> (index among all tables, first row, row after the last)
+CONTEST_TABLES = {contest.contest_id: (contest.table_index, contest.start, contest.stop) for contest in CONTESTS}
+
+# Size of the pieces a page is fed to the parser in while looking for a table
+PARSE_CHUNK_SIZE = 16 * 1024
+
+_page_cache = None
+
+def configure_page_cache(workers=DEFAULT_SCRAPE_WORKERS, requests_per_second=MAX_REQUESTS_PER_SECOND_PER_HOST,
+                         **kwargs):
+    """
+    Replaces the response cache used for 300 Club pages.
+
+    The cache sends its requests on one keep-alive session shared by all scraping threads. Requests
+    are retried on timeouts, 429 and 5xx responses, and their concurrency and rate adapt below the
+    politeness limit towards 300club.org, backing off while the site struggles.
+
+    Args:
+        workers (int): The number of threads that will fetch pages, used to size the connection pool.
+        requests_per_second (float): The maximum number of requests started per second to 300club.org.
+                                     None or 0 disables the rate limit.
+        **kwargs: Keyword arguments for ResponseCache, such as ttl or directory.
+    """
+    global _page_cache
+    _page_cache = ResponseCache(
+        session=create_session(workers),
+        upstream=Upstream('http_fetch', MAX_REQUESTS_IN_FLIGHT_PER_HOST, requests_per_second),
+        **kwargs
+    )
+
+def fetch_page(url):
+    """
+    Fetches a 300 Club page through the on-disk response cache.
+
+    Args:
+        url (str): The page's URL.
+
+    Returns:
+        str: The page's HTML.
+    """
+    if _page_cache is None:
+        configure_page_cache()
+    return _page_cache.get_text(url)
+
+def extract_table_rows(page, table_index, start, stop):
+    """
+    Extracts the cell texts of some rows of one table in an HTML page.
+
+    Tables and rows are counted in document order, nested ones included, like BeautifulSoup's find_all.
+    The page is fed to lxml's C parser in chunks and parsing stops as soon as the target table is closed,
+    so the rest of the page is never parsed.
+
+    Args:
+        page (str): The page's HTML.
+        table_index (int): The index of the table among all tables in the page.
+        start (int): The index of the first row to extract.
+        stop (int): The index of the row after the last one to extract.
+
+    Returns:
+        list: A list with one list of stripped cell texts per row.
+    """
+    parser = etree.HTMLPullParser(events=('start', 'end'), tag='table')
+
+    def table_events():
+        for offset in range(0, len(page), PARSE_CHUNK_SIZE):
+            parser.feed(page[offset:offset + PARSE_CHUNK_SIZE])
+            yield from parser.read_events()
+        # Tables still open at the end of the document are closed by close()
+        parser.close()
+        yield from parser.read_events()
+
+    tables_seen = 0
+    target = None
+    with timer('html_parse'):
+        for event, element in table_events():
+            if event == 'start':
+                if tables_seen == table_index:
+                    target = element
+                tables_seen += 1
+            elif element is target:
+                return _row_texts(target, start, stop)
+
+        raise IndexError(f"page has no table at index {table_index}")
+
+def _row_texts(table, start, stop):
+    rows = list(table.iter('tr'))[start:stop]
+    return [[''.join(cell.itertext()).strip() for cell in row.iter('td')] for row in rows]
+
+def iter_users_selections(users, workers=DEFAULT_SCRAPE_WORKERS, completed=frozenset()):
+    """
+    Scrapes every contest selection of every user concurrently, yielding each user as soon as it is complete.
+
+    Each (user, contest) page is a separate task on a pool of worker threads, and each contest's
+    picks are stored on the user dictionaries under the contest's name. Only a window of users
+    is in flight at once, so memory use does not grow with the number of users.
 
-def scrape_and_store_user_selections():
+    A page that fails to be fetched or parsed is reported and left out, so one broken page does not
+    stop the run; its contest key is missing from the user's dictionary.
+
+    Args:
+        users (iterable): Dictionaries as returned by scrape_mbr_ids.
+        workers (int): The maximum number of pages scraped at once.
+        completed (set): '<mbr_id>:<contest>' units not to scrape again. Users with every contest completed are skipped.
+
+    Yields:
+        dict: Each user dictionary, with the list of Picks of each scraped contest added, in order of completion.
+    """
+    # Enough users in flight to keep every worker busy while finished users are handed out
+    max_users_in_flight = 2 * workers
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {}
+        remaining = {}
+        users = iter(users)
+        exhausted = False
+
+        while futures or not exhausted:
+            while not exhausted and len(remaining) < max_users_in_flight:
+                user = next(users, None)
+                if user is None:
+                    exhausted = True
+                    break
+                contests = [contest for contest in CONTESTS if f"{user['mbr_id']}:{contest.name}" not in completed]
+                if not contests:
+                    continue
+                remaining[user['mbr_id']] = len(contests)
+                for contest in contests:
+                    futures[executor.submit(scrape_contest_picks, contest, user['mbr_id'])] = (user, contest)
+
+            if not futures:
+                break
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                user, contest = futures.pop(future)
+                try:
+                    user[contest.name] = future.result()
+                except Exception as e:
+                    print(f"Error scraping the {contest.name} selections of {user['user']}: {e}")
+                    count('pages_failed')
+
+                remaining[user['mbr_id']] -= 1
+                if remaining[user['mbr_id']] == 0:
+                    del remaining[user['mbr_id']]
+                    print(f"Scraped data for {user['user']}")
+                    count('users_scraped')
+                    yield user
+
+def scrape_and_store_user_selections(workers=DEFAULT_SCRAPE_WORKERS, batch_size=DEFAULT_STORE_BATCH_SIZE, store=True,
+                                     resume=False):
     """
     Scrapes and stores user selections by iterating through a list of users,
     scraping data for each user, and organizing the data into categories and picks.
 
+    Users flow through as a stream: each one's picks are built as soon as its pages are parsed, and
+    every batch_size users are written to the database in their own transaction. A failed run
+    therefore loses at most the batch in progress.
+
+    Each batch also records its member × contest pages in the run journal, in the same transaction.
+    With resume, the pages an interrupted or partly failed run of the same season already stored
+    are skipped, so only the rest is scraped again.
+
+    Args:
+        workers (int): The maximum number of pages scraped at once.
+        batch_size (int): The number of users written to the database per transaction.
+        store (bool): Whether to write the users and picks to the database.
+        resume (bool): Whether to skip the pages an earlier run of the season already stored. Requires store.
+
     Returns:
-        None
+        bool: True if every page was scraped, False if some failed and a resumed run is needed.
     """
-    users = scrape_mbr_ids()
-
-    for user in users:
-        print(f"Scraping data for {user['user']}")
-        mbr_id = user['mbr_id']
-
-        user['batters'] = scrape_selected_batters_data(mbr_id)
-        user['alternate_batters'] = scrape_selected_alternate_batters(mbr_id)
-        user['pitchers'] = scrape_selected_pitchers_data(mbr_id)
-        user['home_run_hitters'] = scrape_selected_home_run_data(mbr_id)
-        user['rbi_champion'] = scrape_selected_rbi_champion_data(mbr_id)
-        user['stolen_base_champion'] = scrape_selected_stolen_base_champion_data(mbr_id)
-        user['dimaggio'] = scrape_selected_dimaggio_data(mbr_id)
-
-    # create categories for each category: batters, alternate_batters, pitchers, home_run_hitters, rbi_champion, stolen_base_champion, dimaggio
-    categories = [{'name': 'batters'}, {'name': 'alternate_batters'}, {'name': 'pitchers'}, {'name': 'home_run_hitters'}, {'name': 'rbi_champion'}, {'name': 'stolen_base_champion'}, {'name': 'dimaggio'}]
-   
-    # create picks for each user matching the fields for picks: id, user_id, category_id, player_name, pick_order, pick_value, is_alternate
-    picks = {}
-    batter_picks = []
-    alternate_batter_picks = []
-    pitcher_picks = []
-    home_run_hitter_picks = []
-    rbi_champion_picks = []
-    stolen_base_champion_picks = []
-    dimaggio_picks = []
-
-    for user in users:
+    categories = [{'name': contest.name} for contest in CONTESTS]
+
+    batch_users = []
+    batch_picks = {category['name']: [] for category in categories}
+    batch_units = []
+    categories_to_insert = categories
+    stored_users = 0
+    run_id = str(date.today().year)
+
+    completed = {}
+    if store:
+        with transaction() as cur:
+            completed = start_run(cur, SCRAPE_JOURNAL, run_id, resume)
+        if completed:
+            count('pages_resumed', len(completed))
+            print(f"Resuming: {len(completed)} pages were already stored.")
+
+    def flush():
+        nonlocal categories_to_insert, stored_users
+        if store:
+            insert_stagnant_data(batch_users, categories_to_insert, batch_picks, (run_id, batch_units))
+            categories_to_insert = []
+        stored_users += len(batch_users)
+        batch_users.clear()
+        batch_units.clear()
+        for category_picks in batch_picks.values():
+            category_picks.clear()
+
+    failed_users = 0
+    for user in iter_users_selections(scrape_mbr_ids(), workers, completed):
         for category in categories:
-            if category['name'] == 'batters':
-                # print(user['batters'])
-                for selection in user['batters']:
-                    batter_picks.append({
-                        'user_id': user['mbr_id'],
-                        'category_id': category['name'],
-                        'player_name': selection['player'],
-                        'pick_order': selection['selection_number'],
-                        'is_alternate': False
-                    })
-            elif category['name'] == 'alternate_batters': 
-                for selection in user['alternate_batters']:
-                    alternate_batter_picks.append({
-                        'user_id': user['mbr_id'],
-                        'category_id': category['name'],
-                        'player_name': selection['player'],
-                        'pick_order': selection['selection_number'],
-                        'is_alternate': True
-                    })
-            elif category['name'] == 'pitchers':
-                for selection in user['pitchers']:
-                    pitcher_picks.append({
-                        'user_id': user['mbr_id'],
-                        'category_id': category['name'],
-                        'player_name': selection['player'],
-                        'pick_order': selection['selection_number'],
-                    })
-            elif category['name'] == 'home_run_hitters':
-                for selection in user['home_run_hitters']:
-                    home_run_hitter_picks.append({
-                        'user_id': user['mbr_id'],
-                        'category_id': category['name'],
-                        'player_name': selection['player'],
-                        'pick_order': selection['selection_number'],
-                    })
-            elif category['name'] == 'rbi_champion':
-                for selection in user['rbi_champion']:
-                    rbi_champion_picks.append({
-                        'user_id': user['mbr_id'],
-                        'category_id': category['name'],
-                        'player_name': selection['player'],
-                        'pick_value': selection['actual_rbi'],
-                    })
-            elif category['name'] == 'stolen_base_champion':
-                for selection in user['stolen_base_champion']:
-                    stolen_base_champion_picks.append({
-                        'user_id': user['mbr_id'],
-                        'category_id': category['name'],
-                        'player_name': selection['player'],
-                        'pick_value': selection['ballot_stolen_bases'],
-                    })
-            elif category['name'] == 'dimaggio':
-                for selection in user['dimaggio']:
-                    dimaggio_picks.append({
-                        'user_id': user['mbr_id'],
-                        'category_id': category['name'],
-                        'pick_value': selection['ballot_longest_hitting_streak'],
-                    })
-            
-    picks = {
-        'batters': batter_picks,
-        'alternate_batters': alternate_batter_picks,
-        'pitchers': pitcher_picks,
-        'home_run_hitters': home_run_hitter_picks,
-        'rbi_champion': rbi_champion_picks,
-        'stolen_base_champion': stolen_base_champion_picks,
-        'dimaggio': dimaggio_picks
-    }
+            # Missing if the contest's page failed or was completed by an earlier run
+            batch_picks[category['name']].extend(user.get(category['name'], ()))
+        batch_users.append({'user': user['user'], 'mbr_id': user['mbr_id']})
+        batch_units.extend(f"{user['mbr_id']}:{category['name']}" for category in categories if category['name'] in user)
+        if any(category['name'] not in user and f"{user['mbr_id']}:{category['name']}" not in completed
+               for category in categories):
+            failed_users += 1
+
+        if len(batch_users) >= batch_size:
+            flush()
+            print(f"Stored {stored_users} users.")
+
+    flush()
+    if failed_users:
+        print(f"Some pages of {failed_users} users failed; run again with --resume to scrape only those.")
+        return False
+
+    if store:
+        with transaction() as cur:
+            finish_run(cur, SCRAPE_JOURNAL)
     print("Scraping and storing user selections complete.")
+    if store:
+        print(f"Stagnant data (users, categories, picks) for {stored_users} users inserted into the database.")
+    return True
 
-    print("Inserting stagnant data into the database...")
-    # Uncomment the following line to insert stagnant data into the database
-    # insert_stagnant_data(users, categories, picks)
-    print("Stagnant data (users, categories, picks) inserted into the database.")
-
-def insert_stagnant_data(users, categories, picks):
+def insert_stagnant_data(users, categories, picks, journal=None):
     '''
     Insert stagnant data into the database. Stagnant data is data that does not change from week to week.
     This includes users, categories, and picks.
 
+    Each table is loaded with one multi-row insert, all in one transaction. Category ids are looked up
+    in the categories table by name, and existing rows are updated in place, so loading the same data
+    again does not create duplicates.
+
     Parameters:
     - users (list): A list of dictionaries representing the users to be inserted.
     - categories (list): A list of dictionaries representing the categories to be inserted.
-    - picks (dict): A dictionary containing the picks to be inserted, categorized by pick type.
+    - picks (dict): A dictionary mapping each category name to a list of the Picks to be inserted.
+    - journal (tuple, optional): A (run_id, units) pair of scraped pages to record in the run journal
+      in the same transaction.
 
     Returns:
     None
     '''
-    conn = psycopg2.connect(
-        dbname=DATABASE['dbname'],
-        user=DATABASE['user'],
-        password=DATABASE['password'],
-        host=DATABASE['host']
-    )
-    cur = conn.cursor()
-
-    # Insert users
-    for user in users:
-        cur.execute(
-            "INSERT INTO users (mbr_id, name) VALUES (%s, %s) RETURNING mbr_id",
-            (user['mbr_id'], user['user'])
-        )
-    conn.commit()
-
-    # Insert categories
-    for category in categories:
-        cur.execute(
-            "INSERT INTO categories (name) VALUES (%s) RETURNING id",
-            (category['name'],)
-        )
-    conn.commit()
-    
-    # Insert batter picks in picks
-    for pick in picks['batters']:
-        cur.execute(
-            "INSERT INTO picks (user_id, category_id, player_name, is_alternate, pick_order) VALUES (%s, %s, %s, %s, %s)",
-            (pick['user_id'], 1, pick['player_name'], pick['is_alternate'], pick['pick_order'])
-        )
-    
-    # Insert alternate batter picks in picks
-    for pick in picks['alternate_batters']:
-        cur.execute(
-            "INSERT INTO picks (user_id, category_id, player_name, is_alternate, pick_order) VALUES (%s, %s, %s, %s, %s)",
-            (pick['user_id'], 2, pick['player_name'], pick['is_alternate'], pick['pick_order'])
-        )
-    
-    # Insert pitcher picks in picks
-    for pick in picks['pitchers']:
-        cur.execute(
-            "INSERT INTO picks (user_id, category_id, player_name, pick_order) VALUES (%s, %s, %s, %s)",
-            (pick['user_id'], 3, pick['player_name'], pick['pick_order'])
-        )
-
-    # Insert home run hitter picks in picks
-    for pick in picks['home_run_hitters']:
-        cur.execute(
-            "INSERT INTO picks (user_id, category_id, player_name, pick_order) VALUES (%s, %s, %s, %s)",
-            (pick['user_id'], 4, pick['player_name'], pick['pick_order'])
-        )
-
-    # Insert rbi champion picks in picks
-    for pick in picks['rbi_champion']:
-        cur.execute(
-            "INSERT INTO picks (user_id, category_id, player_name, pick_value) VALUES (%s, %s, %s, %s)",
-            (pick['user_id'], 5, pick['player_name'], pick['pick_value'])
-        )
-
-    # Insert stolen base champion picks in picks
-    for pick in picks['stolen_base_champion']:
-        cur.execute(
-            "INSERT INTO picks (user_id, category_id, player_name, pick_value) VALUES (%s, %s, %s, %s)",
-            (pick['user_id'], 6, pick['player_name'], pick['pick_value'])
-        )
-
-    # Insert dimaggio picks in picks
-    for pick in picks['dimaggio']:
-        cur.execute(
-            "INSERT INTO picks (user_id, category_id, pick_value) VALUES (%s, %s, %s)",
-            (pick['user_id'], 7, pick['pick_value'])
-        )
-
-    conn.commit()
-    cur.close()
-    conn.close()
+    # Later duplicates win, so one statement never touches the same row twice
+    user_rows = {user['mbr_id']: (user['mbr_id'], user['user']) for user in users}
+
+    with transaction() as cur, timer('db_write'):
+        ensure_schema(cur)
+        execute_values(cur, '''
+            INSERT INTO users (mbr_id, name) VALUES %s
+            ON CONFLICT (mbr_id) DO UPDATE SET name = EXCLUDED.name
+        ''', list(user_rows.values()), page_size=max(len(user_rows), 1))
+
+        execute_values(cur, '''
+            INSERT INTO categories (name) VALUES %s
+            ON CONFLICT (name) DO NOTHING
+        ''', [(category['name'],) for category in categories], page_size=max(len(categories), 1))
+
+        cur.execute("SELECT name, id FROM categories;")
+        category_ids = dict(cur.fetchall())
+
+        pick_rows = {}
+        for category_name, category_picks in picks.items():
+            category_id = category_ids[category_name]
+            for pick in category_picks:
+                pick_rows[(pick.user_id, category_id, pick.pick_order)] = (
+                    pick.user_id,
+                    category_id,
+                    pick.player_name,
+                    pick.is_alternate,
+                    pick.pick_order,
+                    pick.pick_value,
+                )
+
+        execute_values(cur, '''
+            INSERT INTO picks (user_id, category_id, player_name, is_alternate, pick_order, pick_value) VALUES %s
+            ON CONFLICT (user_id, category_id, pick_order) DO UPDATE
+            SET player_name = EXCLUDED.player_name,
+                is_alternate = EXCLUDED.is_alternate,
+                pick_value = EXCLUDED.pick_value
+        ''', list(pick_rows.values()), page_size=max(len(pick_rows), 1))
+
+        if journal is not None:
+            run_id, units = journal
+            record_units(cur, SCRAPE_JOURNAL, run_id, units)
+        notify_data_changed(cur, 'picks')
 
 
 def scrape_mbr_ids():
@@ -214,296 +394,112 @@ def scrape_mbr_ids():
     Returns:
         list: A list of dictionaries, where each dictionary contains the 'user' and 'mbr_id' keys.
     """
-    url = 'https://www.300club.org/CntstRanking.asp?contest_id=2&contest_name=Batters'
-    response = requests.get(url)
-    soup = BeautifulSoup(response.text, 'html.parser')
+    url = f'{BASE_URL}CntstRanking.asp?contest_id=2&contest_name=Batters'
+    page = fetch_page(url)
+    with timer('html_parse'):
+        document = lxml_html.fromstring(page)
 
     # For each user, extract mbr_id from href of user name column
     users = []
-    tables = soup.find_all('table', {'id': 'ranking'})
+    tables = document.xpath('//table[@id="ranking"]')
     qualified_table = tables[0]
     disqualified_table = tables[1]
 
-    for row in qualified_table.find_all('tr')[1:]: # remove 2 to get all users
-        columns = row.find_all('td')
-        user = columns[1].text.strip()
-        mbr_id = columns[1].find('a')['href'].split('=')[1].split('&')[0]
+    for row in list(qualified_table.iter('tr'))[1:]: # remove 2 to get all users
+        columns = list(row.iter('td'))
+        user = columns[1].text_content().strip()
+        mbr_id = columns[1].xpath('.//a')[0].get('href').split('=')[1].split('&')[0]
         users.append({'user': user, 'mbr_id': mbr_id})
 
-    for row in disqualified_table.find_all('tr')[1:]:
-        columns = row.find_all('td')
-        user = columns[0].text.strip()
-        mbr_id = columns[0].find('a')['href'].split('=')[1].split('&')[0]
+    for row in list(disqualified_table.iter('tr'))[1:]:
+        columns = list(row.iter('td'))
+        user = columns[0].text_content().strip()
+        mbr_id = columns[0].xpath('.//a')[0].get('href').split('=')[1].split('&')[0]
         users.append({'user': user, 'mbr_id': mbr_id})
 
     return users
 
 
-def scrape_selected_batters_data(mbr_id):
+def parse_contest_picks(contest, mbr_id, rows):
     """
-    Scrapes the selected batters data for a given member ID.
-
-    Args:
-        mbr_id (int): The member ID.
-
-    Returns:
-        list: A list of dictionaries containing the selected batters data.
-            Each dictionary represents a selection and contains the following keys:
-            - 'selection_number': The selection number.
-            - 'player': The player's name.
-            - 'team': The player's team.
-            - 'average': The player's batting average.
-            - 'plate_appearances': The player's plate appearances.
-            - 'ops': The player's OPS (OBP Plus Slugging).
-            - 'disqualified': A boolean indicating if the player is disqualified or not (by not meeting plate appearance minimum).
-    """
-    url = f'https://www.300club.org/RankingPerMember.asp?mbr_id={mbr_id}&contest_id=2&contest_name=Batters'
-    response = requests.get(url)
-    soup = BeautifulSoup(response.text, 'html.parser')
-
-    selections = []
-    table = soup.find_all('table')
-
-    for row in table[10].find_all('tr')[3:13]:
-        try:
-            columns = row.find_all('td')
-            selection = {
-                'selection_number': columns[0].text.strip(),
-                'player': columns[1].text.strip(),
-                'team': columns[2].text.strip(),
-                'average': columns[3].text.strip(),
-                'plate_appearances': columns[4].text.strip(),
-                'ops': columns[5].text.strip(),
-                'disqualified': False if columns[6].text.strip() == '' else True,
-            }
-            selections.append(selection)
-        except IndexError:
-            break
-    return selections
-
+    Turns the selection rows of a member's contest page into picks, following the contest's column map.
 
-def scrape_selected_alternate_batters(mbr_id):
-    """
-    Scrapes the selected alternate batters for a given member ID.
+    Selections end at the first row shorter than the contest's width.
 
     Args:
-        mbr_id (int): The member ID.
+        contest (Contest): The contest.
+        mbr_id (str): The member's ID.
+        rows (list): The rows' cell texts, as returned by extract_table_rows.
 
     Returns:
-        list: A list of dictionaries representing the selected alternate batters. Each dictionary contains the following keys:
-            - 'selection_number': The selection number.
-            - 'player': The name of the player.
-            - 'team': The team of the player.
-            - 'average': The batting average of the player.
-            - 'plate_appearances': The number of plate appearances of the player.
-            - 'ops': The OPS (On-base Plus Slugging) of the player.
-            - 'disqualified': A boolean indicating if the player is disqualified or not.
-    """
-    url = f'https://www.300club.org/RankingPerMember.asp?mbr_id={mbr_id}&contest_id=5&contest_name=Alternates'
-    response = requests.get(url)
-    soup = BeautifulSoup(response.text, 'html.parser')
-
-    selections = []
-    table = soup.find_all('table')
-
-    selection_number = 1
-    for row in table[11].find_all('tr')[1:6]:
-        try:
-            columns = row.find_all('td')
-            selection = {
-                'selection_number': selection_number,
-                'player': columns[0].text.strip(),
-                'team': columns[1].text.strip(),
-                'average': columns[2].text.strip(),
-                'plate_appearances': columns[3].text.strip(),
-                'ops': columns[4].text.strip(),
-                'disqualified': False if columns[5].text.strip() == '' else True,
-            }
-            selection_number += 1
-            selections.append(selection)
-        except IndexError:
-            break
-    return selections
+        list: The member's Picks in the contest.
 
-
-def scrape_selected_pitchers_data(mbr_id):
+    Raises:
+        ValueError: If a selection's number is not an integer, or if the contest takes a single selection
+                    and its row is not a full selection row, as when the page's layout changed, rather
+                    than storing the member with no pick.
     """
-    Scrapes the selected pitchers data for a given member ID.
+    player_column = contest.columns.get('player_name')
+    order_column = contest.columns.get('pick_order')
+    value_column = contest.columns.get('pick_value')
 
-    Args:
-        mbr_id (int): The member ID.
-
-    Returns:
-        list: A list of dictionaries containing the selected pitchers data.
-            Each dictionary contains the following keys:
-            - selection_number (int): The selection number.
-            - player (str): The name of the player.
-            - team (str): The team of the player.
-            - wins (str): The number of wins for the player.
-    """
-    url = f'https://www.300club.org/RankingPerMember.asp?mbr_id={mbr_id}&contest_id=3&contest_name=Pitchers'
-    response = requests.get(url)
-    soup = BeautifulSoup(response.text, 'html.parser')
-
-    selections = []
-    table = soup.find_all('table')
-    selection_number = 1
-
-    for row in table[11].find_all('tr')[1:5]:
-        try:
-            columns = row.find_all('td')
-            selection = {
-                'selection_number': selection_number,
-                'player': columns[0].text.strip(),
-                'team': columns[1].text.strip(),
-                'wins': columns[2].text.strip(),
-            }
-            selection_number += 1
-            selections.append(selection)
-        except IndexError:
-            break  
-    return selections
-
-
-def scrape_selected_home_run_data(mbr_id):
-    """
-    Scrapes the selected home run data for a given member ID.
+    picks = []
+    for number, columns in enumerate(rows, 1):
+        if len(columns) < contest.width:
+            break
+        picks.append(Pick(
+            mbr_id,
+            None if player_column is None else columns[player_column],
+            number if order_column is None else int(columns[order_column]),
+            None if value_column is None else columns[value_column],
+            contest.is_alternate,
+        ))
 
-    Parameters:
-    mbr_id (int): The member ID.
+    if not picks and contest.stop - contest.start == 1:
+        raise ValueError(f"the {contest.name} page of member {mbr_id} has no selection row "
+                         f"of {contest.width} columns")
+    return picks
 
-    Returns:
-    list: A list of dictionaries containing the selected home run data.
-          Each dictionary contains the following keys:
-          - selection_number: The player's selection number by the user.
-          - player: The player's name.
-          - team: The player's team.
-          - home_runs: The number of home runs.
-    """
-    url = f'https://www.300club.org/RankingPerMember.asp?mbr_id={mbr_id}&contest_id=6&contest_name=Home+Run+Hitters'
-    response = requests.get(url)
-    soup = BeautifulSoup(response.text, 'html.parser')
-
-    selections = []
-    table = soup.find_all('table')
-    selection_number = 1
-
-    for row in table[11].find_all('tr')[1:5]:
-        columns = row.find_all('td')
-        selection = {
-            'selection_number': selection_number,
-            'player': columns[0].text.strip(),
-            'team': columns[1].text.strip(),
-            'home_runs': columns[2].text.strip(),
-        }
-        selection_number += 1
-        selections.append(selection)
-    return selections
-
-
-def scrape_selected_rbi_champion_data(mbr_id):
-    """
-    Scrapes the selected RBI champion data for a given member ID.
 
-    Args:
-        mbr_id (int): The member ID.
-
-    Returns:
-        list: A list of dictionaries containing the selected RBI champion data.
-            Each dictionary represents a selection and contains the following keys:
-            - 'selection_number': The selection number (always 1).
-            - 'player': The name of the player.
-            - 'team': The team of the player.
-            - 'actual_rbi': The actual RBI count.
-            - 'ballot_rbi': The RBI count from the ballot.
-    """
-    url = f'https://www.300club.org/RankingPerMember.asp?mbr_id={mbr_id}&contest_id=7&contest_name=RBI+Champion'
-    response = requests.get(url)
-    soup = BeautifulSoup(response.text, 'html.parser')
-
-    selections = []
-    table = soup.find_all('table')
-    row = table[11].find_all('tr')[1]
-    columns = row.find_all('td')
-
-    selection = {
-        'selection_number': 1,
-        'player': columns[0].text.strip(),
-        'team': columns[1].text.strip(),
-        'actual_rbi': columns[2].text.strip(),
-        'ballot_rbi': columns[3].text.strip(),
-    }
-    selections.append(selection)
-    return selections
-
-
-def scrape_selected_stolen_base_champion_data(mbr_id):
+def scrape_contest_picks(contest, mbr_id):
     """
-    Scrapes the selected stolen base champion data for a given member ID.
+    Scrapes a member's selections in one contest.
 
     Args:
-        mbr_id (int): The member ID.
+        contest (Contest): The contest.
+        mbr_id (str): The member's ID.
 
     Returns:
-        list: A list of dictionaries containing the selected stolen base champion data.
-            Each dictionary represents a selection and contains the following keys:
-            - 'selection_number': The selection number (always 1).
-            - 'player': The name of the player.
-            - 'team': The team of the player.
-            - 'actual_stolen_bases': The actual stolen bases of the player.
-            - 'ballot_stolen_bases': The ballot stolen bases of the player.
+        list: The member's Picks in the contest.
     """
-    url = f'https://www.300club.org/RankingPerMember.asp?mbr_id={mbr_id}&contest_id=8&contest_name=Stolen+Base+Champion'
-    response = requests.get(url)
-    soup = BeautifulSoup(response.text, 'html.parser')
-
-    selections = []
-    table = soup.find_all('table')
-    row = table[11].find_all('tr')[1]
-    columns = row.find_all('td')
-
-    selection = {
-        'selection_number': 1,
-        'player': columns[0].text.strip(),
-        'team': columns[1].text.strip(),
-        'actual_stolen_bases': columns[2].text.strip(),
-        'ballot_stolen_bases': columns[3].text.strip(),
-    }
-    selections.append(selection)
-    return selections
-
-
-def scrape_selected_dimaggio_data(mbr_id):
-    """
-    Scrapes the selected DiMaggio Prize data for a given member ID.
-
-    Args:
-        mbr_id (int): The member ID.
-
-    Returns:
-        list: A list of dictionaries containing the selected data.
-            Each dictionary represents a selection and contains the following keys:
-            - 'selection_number': The selection number (always 1).
-            - 'actual_longest_hitting_streak': The actual longest hitting streak.
-            - 'ballot_longest_hitting_streak': The ballot longest hitting streak.
-    """
-    url = f'https://www.300club.org/RankingPerMember.asp?mbr_id={mbr_id}&contest_id=9&contest_name=DiMaggio+Prize'
-    response = requests.get(url)
-    soup = BeautifulSoup(response.text, 'html.parser')
-
-    selections = []
-    table = soup.find_all('table')
-    row = table[11].find_all('tr')[1]
-    columns = row.find_all('td')
-
-    selection = {
-        'selection_number': 1,
-        'actual_longest_hitting_streak': columns[0].text.strip(),
-        'ballot_longest_hitting_streak': columns[1].text.strip(),
-    }
-    selections.append(selection)
-    return selections
+    url = (f'{BASE_URL}RankingPerMember.asp?mbr_id={mbr_id}'
+           f'&contest_id={contest.contest_id}&contest_name={contest.url_name}')
+    rows = extract_table_rows(fetch_page(url), contest.table_index, contest.start, contest.stop)
+    return parse_contest_picks(contest, mbr_id, rows)
 
 
 if __name__ == "__main__":
-    scrape_and_store_user_selections()
+    parser = argparse.ArgumentParser(description='Scrapes and stores user selections from 300 Club.')
+    parser.add_argument('--cache-ttl', type=float, default=DEFAULT_HTTP_CACHE_TTL,
+                        help='seconds a cached page is reused before it is revalidated (0 to always revalidate)')
+    parser.add_argument('--workers', type=int, default=DEFAULT_SCRAPE_WORKERS,
+                        help='maximum number of pages scraped at once')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_STORE_BATCH_SIZE,
+                        help='number of users written to the database per transaction')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='scrape and build the picks without writing to the database')
+    parser.add_argument('--resume', action='store_true',
+                        help='skip the member and contest pages an interrupted run of the season already stored')
+    parser.add_argument('--metrics-dir', default=DEFAULT_METRICS_DIR,
+                        help='directory the run summary (JSON) and Prometheus textfile are written to')
+    args = parser.parse_args()
+    if args.dry_run and args.resume:
+        parser.error('--resume reads the run journal of stored pages, which --dry-run does not write')
+
+    configure_page_cache(args.workers, ttl=args.cache_ttl)
+    succeeded = False
+    try:
+        succeeded = scrape_and_store_user_selections(args.workers, args.batch_size, store=not args.dry_run,
+                                                     resume=args.resume)
+    finally:
+        write_run_metrics('user_selections_scraper', args.metrics_dir, succeeded)
@@ -0,0 +1,40 @@
+import os
+import uuid
+
+import psycopg2
+import pytest
+from psycopg2.extensions import make_dsn, parse_dsn
+
+from scripts.common.schema import migrate
+
+# Connection string to a PostgreSQL server the tests may create throwaway databases on.
+# Tests that need a database are skipped without it.
+TEST_DSN = os.environ.get('CLUB_TEST_DSN')
+
+
+@pytest.fixture
+def cur():
+    """
+    Yields a cursor on an empty database at the latest schema version, dropped after the test.
+    """
+    if not TEST_DSN:
+        pytest.skip('CLUB_TEST_DSN is not set')
+
+    name = f'club_test_{uuid.uuid4().hex[:12]}'
+    admin = psycopg2.connect(TEST_DSN)
+    admin.autocommit = True
+    try:
+        with admin.cursor() as admin_cur:
+            admin_cur.execute(f'CREATE DATABASE {name};')
+
+        conn = psycopg2.connect(make_dsn(**dict(parse_dsn(TEST_DSN), dbname=name)))
+        try:
+            with conn.cursor() as cursor:
+                migrate(cursor)
+                yield cursor
+        finally:
+            conn.close()
+    finally:
+        with admin.cursor() as admin_cur:
+            admin_cur.execute(f'DROP DATABASE IF EXISTS {name} WITH (FORCE);')
+        admin.close()
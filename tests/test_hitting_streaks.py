@@ -0,0 +1,33 @@
+from scripts.daily.hitting_streaks import advance_streak
+
+
+def play(games, streak=None):
+    streak = streak or [0, 0]
+    for hits, at_bats, sac_flies in games:
+        advance_streak(streak, hits, at_bats, sac_flies)
+    return streak
+
+
+def test_hits_extend_the_streak():
+    assert play([(1, 4, 0), (2, 3, 0), (1, 1, 0)]) == [3, 3]
+
+
+def test_hitless_game_ends_the_streak_but_keeps_the_longest():
+    assert play([(1, 4, 0), (1, 4, 0), (0, 4, 0), (1, 3, 0)]) == [1, 2]
+
+
+def test_game_without_at_bat_neither_extends_nor_ends_it():
+    # Only walks, hit by pitches or sacrifice bunts
+    assert play([(1, 4, 0), (0, 0, 0), (1, 4, 0)]) == [2, 2]
+
+
+def test_sacrifice_fly_without_hit_ends_it():
+    assert play([(1, 4, 0), (0, 0, 1)]) == [0, 1]
+
+
+def test_hit_with_sacrifice_fly_extends_it():
+    assert play([(1, 4, 0), (1, 2, 1)]) == [2, 2]
+
+
+def test_longest_streak_is_kept_from_earlier_games():
+    assert play([(1, 4, 0)], streak=[0, 12]) == [1, 12]
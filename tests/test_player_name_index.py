@@ -0,0 +1,66 @@
+import json
+import os
+
+import pytest
+
+from scripts.yearly.player_name_index import PlayerNameIndex, normalize_name
+
+ROSTER_PATH = os.path.join(os.path.dirname(__file__), '../scripts/daily/players.json')
+
+
+@pytest.fixture(scope='module')
+def index():
+    with open(ROSTER_PATH, 'r') as f:
+        roster = json.load(f)
+    return PlayerNameIndex.from_roster(roster)
+
+
+@pytest.mark.parametrize('name, expected', [
+    ('Ronald Acuña Jr.', 'ronald acuna'),
+    ('A. J. Minter', 'aj minter'),
+    ('A.J. Minter', 'aj minter'),
+    ('  SHOHEI   OHTANI ', 'shohei ohtani'),
+    ("Travis d'Arnaud", 'travis darnaud'),
+    ('Ken Griffey III', 'ken griffey'),
+    ('', ''),
+])
+def test_normalize_name(name, expected):
+    assert normalize_name(name) == expected
+
+
+def test_resolve_exact_name(index):
+    match = index.resolve('Ronald Acuna Jr')
+    assert (match.api_player_id, match.confidence) == (660670, 1.0)
+    assert index.resolve('AJ Minter').api_player_id == 621345
+
+
+def test_resolve_misspelled_name(index):
+    match = index.resolve('Shohei Otani')
+    assert match.api_player_id == 660271
+    assert 0.85 <= match.confidence < 1.0
+
+
+def test_resolve_unknown_name(index):
+    assert index.resolve('Nobody Atall') is None
+    assert index.resolve('...') is None
+
+
+def test_resolve_shared_name_by_position(index):
+    assert index.resolve('Will Smith', 'hitter').api_player_id == 669257
+    assert index.resolve('Will Smith', 'pitcher').api_player_id == 519293
+
+
+def test_resolve_shared_name_without_position(index):
+    assert index.resolve('Will Smith') is None
+    assert index.resolve('Will Smith', min_confidence=0.5).confidence == 0.5
+
+
+def test_resolve_shared_name_and_position(index):
+    # Both Logan Allens are pitchers, so the position cannot tell them apart
+    assert index.resolve('Logan Allen', 'pitcher') is None
+    assert index.resolve('Logan Allen', 'pitcher', min_confidence=0.5).api_player_id in (663531, 671106)
+
+
+def test_resolve_two_way_player_as_either(index):
+    assert index.resolve('Shohei Ohtani', 'hitter').api_player_id == 660271
+    assert index.resolve('Shohei Ohtani', 'pitcher').api_player_id == 660271
@@ -0,0 +1,109 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from scripts.service.leaderboard_service import RenderCache
+
+
+class Renderer:
+    """
+    Renders numbered bodies, counting its calls.
+    """
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return f'body {self.calls}'.encode()
+
+
+def test_hit_reuses_the_rendered_response():
+    cache = RenderCache()
+    render = Renderer()
+    first = cache.get('/leaderboards', render)
+    assert cache.get('/leaderboards', render) == first
+    assert render.calls == 1
+    assert first[1] == b'body 1'
+
+
+def test_etag_follows_the_body():
+    cache = RenderCache()
+    etag, _ = cache.get('/a', lambda: b'same')
+    assert cache.get('/b', lambda: b'same')[0] == etag
+    assert cache.get('/c', lambda: b'other')[0] != etag
+
+
+def test_invalidate_renders_again():
+    cache = RenderCache()
+    render = Renderer()
+    cache.get('/leaderboards', render)
+    cache.invalidate()
+    assert cache.get('/leaderboards', render)[1] == b'body 2'
+
+
+def test_expired_response_renders_again():
+    cache = RenderCache(max_age=0)
+    render = Renderer()
+    cache.get('/leaderboards', render)
+    assert cache.get('/leaderboards', render)[1] == b'body 2'
+
+
+def test_least_recently_used_response_is_dropped():
+    cache = RenderCache(max_entries=2)
+    renders = {key: Renderer() for key in ('/a', '/b', '/c')}
+    cache.get('/a', renders['/a'])
+    cache.get('/b', renders['/b'])
+    cache.get('/a', renders['/a'])
+    cache.get('/c', renders['/c'])
+
+    cache.get('/a', renders['/a'])
+    cache.get('/b', renders['/b'])
+    assert (renders['/a'].calls, renders['/b'].calls) == (1, 2)
+
+
+def test_concurrent_misses_render_once():
+    cache = RenderCache()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def render():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return b'body'
+
+    with ThreadPoolExecutor(8) as executor:
+        owner = executor.submit(cache.get, '/leaderboards', render)
+        assert started.wait(5)
+        waiters = [executor.submit(cache.get, '/leaderboards', render) for _ in range(7)]
+        release.set()
+        results = [owner.result()] + [waiter.result() for waiter in waiters]
+
+    assert len(calls) == 1
+    assert len(set(results)) == 1
+
+
+def test_response_rendered_across_an_invalidation_is_not_kept():
+    cache = RenderCache()
+    render = Renderer()
+
+    def stale_render():
+        cache.invalidate()
+        return b'stale'
+
+    assert cache.get('/leaderboards', stale_render)[1] == b'stale'
+    assert cache.get('/leaderboards', render)[1] == b'body 1'
+
+
+def test_failed_render_is_not_kept():
+    cache = RenderCache()
+
+    def fail():
+        raise RuntimeError('database unavailable')
+
+    with pytest.raises(RuntimeError):
+        cache.get('/leaderboards', fail)
+    assert cache.get('/leaderboards', lambda: b'body')[1] == b'body'
@@ -0,0 +1,40 @@
+from scripts.common.run_journal import changed_units, finish_run, record_units, start_run
+
+
+def test_new_run_starts_empty(cur):
+    assert start_run(cur, 'scrape', '2024', resume=True) == {}
+
+
+def test_resume_skips_completed_units(cur):
+    start_run(cur, 'scrape', '2024')
+    record_units(cur, 'scrape', '2024', ['1', '2', '3'], changed=['2'])
+    assert start_run(cur, 'scrape', '2024', resume=True) == {'1': False, '2': True, '3': False}
+
+
+def test_restart_keeps_only_changed_units(cur):
+    start_run(cur, 'scrape', '2024')
+    record_units(cur, 'scrape', '2024', ['1', '2'], changed=['2'])
+    assert start_run(cur, 'scrape', '2024') == {}
+    assert changed_units(cur, 'scrape', '2024') == ['2']
+
+    # Redoing a unit that changed data before keeps it changed
+    record_units(cur, 'scrape', '2024', ['1', '2'])
+    assert start_run(cur, 'scrape', '2024', resume=True) == {'1': False, '2': True}
+
+
+def test_other_runs_of_the_job_are_discarded(cur):
+    start_run(cur, 'stats', '2024-06-01')
+    record_units(cur, 'stats', '2024-06-01', ['1'], changed=['1'])
+    start_run(cur, 'scrape', '2024')
+    record_units(cur, 'scrape', '2024', ['1'])
+
+    assert start_run(cur, 'stats', '2024-06-02', resume=True) == {}
+    assert changed_units(cur, 'stats', '2024-06-01') == []
+    assert start_run(cur, 'scrape', '2024', resume=True) == {'1': False}
+
+
+def test_finish_run_clears_the_job(cur):
+    start_run(cur, 'scrape', '2024')
+    record_units(cur, 'scrape', '2024', ['1'], changed=['1'])
+    finish_run(cur, 'scrape')
+    assert start_run(cur, 'scrape', '2024', resume=True) == {}
@@ -0,0 +1,79 @@
+import random
+
+import pytest
+
+from scripts.daily.scoring import RankedLeaderboard, sort_key
+
+# The ORDER BY of the rank() in LEADERBOARD_QUERY, for a single contest
+SQL_RANK_QUERY = """
+    SELECT s.user_id,
+           rank() OVER (
+               ORDER BY CASE WHEN %s THEN -s.score ELSE s.score END ASC NULLS LAST,
+                        s.tiebreak DESC NULLS LAST
+           )
+    FROM unnest(%s::text[], %s::numeric[], %s::numeric[]) AS s(user_id, score, tiebreak);
+"""
+
+
+def random_entries(rng, members):
+    """
+    Returns member -> (score, tiebreak) with many ties and some NULLs, as in real standings.
+    """
+    return {
+        f'member{i}': (rng.choice([None, rng.randint(0, 5)]), rng.choice([None, rng.randint(0, 3)]))
+        for i in range(members)
+    }
+
+
+def reference_ranks(entries, descending):
+    """
+    Ranks members like SQL's rank(): one plus the number of members ordered strictly before them.
+    """
+    keys = {user_id: sort_key(score, tiebreak, descending) for user_id, (score, tiebreak) in entries.items()}
+    return {user_id: 1 + sum(other < key for other in keys.values()) for user_id, key in keys.items()}
+
+
+def leaderboard_ranks(leaderboard):
+    return {user_id: leaderboard.rank(user_id) for user_id in leaderboard.entries}
+
+
+@pytest.mark.parametrize('descending', [False, True])
+def test_ranks_match_reference(descending):
+    rng = random.Random(300)
+    for _ in range(50):
+        entries = random_entries(rng, rng.randint(1, 40))
+        leaderboard = RankedLeaderboard(descending)
+        for user_id, (score, tiebreak) in entries.items():
+            leaderboard.set_score(user_id, score, tiebreak)
+        assert leaderboard_ranks(leaderboard) == reference_ranks(entries, descending)
+
+
+@pytest.mark.parametrize('descending', [False, True])
+def test_incremental_ranks_match_reference(descending):
+    rng = random.Random(301)
+    entries = random_entries(rng, 60)
+    leaderboard = RankedLeaderboard(descending)
+    for user_id, (score, tiebreak) in entries.items():
+        leaderboard.set_score(user_id, score, tiebreak)
+
+    for _ in range(500):
+        user_id = rng.choice(list(entries))
+        entry = (rng.choice([None, rng.randint(0, 5)]), rng.choice([None, rng.randint(0, 3)]))
+        assert leaderboard.set_score(user_id, *entry) == (entry != entries[user_id])
+        entries[user_id] = entry
+        assert leaderboard_ranks(leaderboard) == reference_ranks(entries, descending)
+
+
+@pytest.mark.parametrize('descending', [False, True])
+def test_ranks_match_sql_rank(cur, descending):
+    rng = random.Random(302)
+    for _ in range(20):
+        entries = random_entries(rng, rng.randint(1, 40))
+        leaderboard = RankedLeaderboard(descending)
+        for user_id, (score, tiebreak) in entries.items():
+            leaderboard.set_score(user_id, score, tiebreak)
+
+        user_ids = list(entries)
+        cur.execute(SQL_RANK_QUERY, (descending, user_ids, [entries[u][0] for u in user_ids],
+                                     [entries[u][1] for u in user_ids]))
+        assert leaderboard_ranks(leaderboard) == dict(cur.fetchall())
@@ -0,0 +1,61 @@
+import pytest
+
+from scripts.yearly.user_selections_scraper import CONTESTS, Pick, parse_contest_picks
+
+CONTESTS_BY_NAME = {contest.name: contest for contest in CONTESTS}
+
+
+def parse(contest_name, rows):
+    return parse_contest_picks(CONTESTS_BY_NAME[contest_name], '1234', rows)
+
+
+def test_batters_keep_their_ballot_numbers():
+    rows = [
+        ['1', 'Aaron Judge', 'NYY', '.322', '704', '1.159', ''],
+        ['2', 'Juan Soto', 'NYY', '.288', '713', '.989', ''],
+    ]
+    assert parse('batters', rows) == [
+        Pick('1234', 'Aaron Judge', 1, None, False),
+        Pick('1234', 'Juan Soto', 2, None, False),
+    ]
+
+
+def test_selections_end_at_the_first_short_row():
+    rows = [
+        ['Tarik Skubal', 'DET', '18'],
+        ['Chris Sale', 'ATL', '18'],
+        ['Total', '36'],
+        ['Zack Wheeler', 'PHI', '16'],
+    ]
+    assert parse('pitchers', rows) == [
+        Pick('1234', 'Tarik Skubal', 1, None, False),
+        Pick('1234', 'Chris Sale', 2, None, False),
+    ]
+
+
+def test_alternates_are_numbered_in_page_order():
+    rows = [['Bobby Witt Jr.', 'KC', '.332', '709', '.977', '']]
+    assert parse('alternate_batters', rows) == [Pick('1234', 'Bobby Witt Jr.', 1, None, True)]
+
+
+def test_ballot_values():
+    assert parse('rbi_champion', [['Aaron Judge', 'NYY', '144', '140']]) == [
+        Pick('1234', 'Aaron Judge', 1, '140', False)]
+    assert parse('dimaggio', [['24', '31']]) == [Pick('1234', None, 1, '31', False)]
+
+
+def test_batters_pick_order_must_be_an_integer():
+    with pytest.raises(ValueError):
+        parse('batters', [['#1', 'Aaron Judge', 'NYY', '.322', '704', '1.159', '']])
+
+
+@pytest.mark.parametrize('contest_name', ['rbi_champion', 'stolen_base_champion', 'dimaggio'])
+def test_single_selection_contest_without_selection_row_fails(contest_name):
+    with pytest.raises(ValueError):
+        parse(contest_name, [['No selection']])
+    with pytest.raises(ValueError):
+        parse(contest_name, [])
+
+
+def test_multiple_selection_contest_may_be_empty():
+    assert parse('home_run_hitters', []) == []